@@ -1,17 +1,21 @@
 #!/usr/bin/env python3
 """Unified AI Assistant combining research and textbook capabilities."""
 import argparse
+import sys
 from pathlib import Path
 from typing import List, Optional
 
 from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn
 from rich.prompt import Prompt, Confirm
 from rich.table import Table
 
+from src.core.ollama_client import OllamaClient
 from src.core.research_assistant import ResearchAssistant
 from src.agents.textbook_agent import TextbookAgent
+from src.utils.http import create_session
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -22,8 +26,16 @@ class AIAssistant:
     
     def __init__(self):
         """Initialize the AI Assistant."""
-        self.research_assistant = ResearchAssistant()
-        self.textbook_agent = TextbookAgent()
+        # One pooled session and LLM client shared by both agents
+        self.session = create_session()
+        self.llm_client = OllamaClient.from_config(session=self.session)
+        # Without a terminal the live display is skipped, so log progress instead
+        self.research_assistant = ResearchAssistant(session=self.session, llm_client=self.llm_client,
+                                                    log_progress=not sys.stdout.isatty())
+        self.textbook_agent = TextbookAgent(llm_client=self.llm_client)
+        
+        # Load the model while the user types the first command
+        self.llm_client.start_warm_up()
         
     def load_books(self, file_paths: List[str]) -> None:
         """Load books into the textbook agent.
@@ -118,12 +130,131 @@ Example Usage:
     """
     console.print(Panel(help_text, title="AI Assistant Help", border_style="green"))
 
+def load_topics(topics_file: str) -> List[str]:
+    """Read research topics from a file.
+    
+    Args:
+        topics_file: Text file with one topic per line (blank lines and # comments are ignored)
+        
+    Returns:
+        List of topics in file order
+    """
+    with open(topics_file, 'r', encoding='utf-8') as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+def research_batch(topics_file: str, workers: int = 4, iterations: int = 3, queue_size: int = 2,
+                   headless: Optional[bool] = None, resume: bool = False, refresh: bool = False) -> None:
+    """Research every topic in a file with the staged research pipeline.
+    
+    Args:
+        topics_file: Text file with one topic per line
+        workers: Number of topics analyzed by the LLM at the same time
+        iterations: Research iterations per topic
+        queue_size: Capacity of the queue in front of each pipeline stage
+        headless: Report progress as log lines instead of Rich output
+            (defaults to True when stdout is not a terminal)
+        resume: Continue topics from their checkpoints and skip completed ones
+        refresh: Only analyze papers added since each topic's previous run
+    """
+    if headless is None:
+        headless = not sys.stdout.isatty()
+    topics = load_topics(topics_file)
+    if not topics:
+        console.print(f"[warning]No topics found in {topics_file}[/warning]")
+        return
+    
+    # Size the connection pool so concurrent workers do not discard connections
+    session = create_session(pool_size=max(10, workers))
+    llm_client = OllamaClient.from_config(session=session)
+    research_assistant = ResearchAssistant(session=session, llm_client=llm_client, headless=True,
+                                           log_progress=headless)
+    llm_client.start_warm_up()
+    
+    if headless:
+        def log_completion(topic: str, findings: str) -> None:
+            status = "failed" if findings.startswith("Error during research") else "done"
+            logger.info(f"Topic {status}: {topic}")
+        
+        # Pipeline throughput is logged by research_topics
+        research_assistant.research_topics(
+            topics,
+            max_workers=workers,
+            max_iterations=iterations,
+            queue_size=queue_size,
+            resume=resume,
+            refresh=refresh,
+            on_complete=log_completion
+        )
+        logger.info(f"Results saved in {research_assistant.data_dir}")
+        return
+    
+    with Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TimeElapsedColumn(),
+        console=console
+    ) as progress:
+        task = progress.add_task("Researching topics...", total=len(topics))
+        results = research_assistant.research_topics(
+            topics,
+            max_workers=workers,
+            max_iterations=iterations,
+            queue_size=queue_size,
+            resume=resume,
+            refresh=refresh,
+            on_complete=lambda topic, findings: progress.advance(task)
+        )
+    
+    table = Table(title="Batch Research", show_header=True, header_style="bold magenta")
+    table.add_column("Topic")
+    table.add_column("Status")
+    for topic, findings in results.items():
+        failed = findings.startswith("Error during research")
+        table.add_row(topic, "[red]failed[/red]" if failed else "[green]done[/green]")
+    console.print(table)
+    
+    # Stages with high output wait are held up by the next stage; size queues accordingly
+    stages = Table(title="Pipeline Throughput", show_header=True, header_style="bold magenta")
+    for column in ("Stage", "Workers", "Items", "Items/s", "Utilization", "Input Wait", "Output Wait"):
+        stages.add_column(column, justify="left" if column == "Stage" else "right")
+    for stats in research_assistant.pipeline_stats:
+        stages.add_row(
+            stats.name, str(stats.workers), str(stats.items), f"{stats.throughput:.2f}",
+            f"{stats.utilization:.0%}", f"{stats.input_wait:.1f}s", f"{stats.output_wait:.1f}s"
+        )
+    console.print(stages)
+    console.print(f"Results saved in {research_assistant.data_dir}")
+
 def main():
     """Main CLI interface."""
     parser = argparse.ArgumentParser(description="AI Assistant - Your Research and Learning Companion")
     parser.add_argument("--books", nargs="*", help="Paths to textbooks to load")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    research_parser = subparsers.add_parser("research", help="Research a batch of topics without the REPL")
+    research_parser.add_argument("--topics-file", required=True, help="File with one topic per line")
+    research_parser.add_argument("--workers", type=int, default=4, help="Topics analyzed concurrently")
+    research_parser.add_argument("--iterations", type=int, default=3, help="Research iterations per topic")
+    research_parser.add_argument("--queue-size", type=int, default=2, help="Topics buffered between pipeline stages")
+    checkpoints = research_parser.add_mutually_exclusive_group()
+    checkpoints.add_argument("--resume", dest="resume", action="store_true",
+                             help="Continue from the checkpoints of previous runs and skip completed topics")
+    checkpoints.add_argument("--force", dest="resume", action="store_false",
+                             help="Discard previous results and research every topic again (default)")
+    checkpoints.add_argument("--refresh", action="store_true",
+                             help="Only analyze papers added since each topic's previous run")
+    research_parser.add_argument("--headless", action="store_true", default=None,
+                                 help="Log progress instead of rendering it (automatic without a terminal)")
     args = parser.parse_args()
     
+    if args.command == "research":
+        research_batch(args.topics_file, workers=args.workers, iterations=args.iterations,
+                       queue_size=args.queue_size, headless=args.headless, resume=args.resume,
+                       refresh=args.refresh)
+        return
+    
     # Initialize assistant
     assistant = AIAssistant()
     
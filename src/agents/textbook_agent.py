@@ -1,43 +1,70 @@
 """TextbookAgent for reading and explaining textbook content."""
+import math
 import os
+import uuid
 import warnings
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 from datetime import datetime
 
-import PyPDF2
-from rich.progress import Progress, SpinnerColumn, TextColumn
+import chromadb
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, SpinnerColumn, TextColumn
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import Chroma
 
+from src.core.ollama_client import OllamaClient
+from src.utils.book_ingest import ingest_stream
+from src.utils.embedding_cache import CachedEmbeddings, EmbeddingCache
 from src.utils.logger import get_logger
+from src.utils.pdf_extract import iter_pdf_pages
 
 # Filter out LangChain deprecation warnings
 warnings.filterwarnings('ignore', category=DeprecationWarning, module='langchain.*')
 
 logger = get_logger(__name__)
 
+EMBEDDING_MODEL = "sentence-transformers/all-mpnet-base-v2"
+
+# Chroma collection holding the book chunks (LangChain's default name)
+VECTOR_COLLECTION = "langchain"
+
+# Characters of a text file read at once, counted as one page
+TEXT_BLOCK_CHARS = 64 * 1024
+
 class TextbookAgent:
     """Agent for processing and explaining textbook content."""
     
-    def __init__(self, storage_dir: str = "textbook_knowledge"):
+    def __init__(self, storage_dir: str = "textbook_knowledge",
+                 llm_client: Optional[OllamaClient] = None, pdf_workers: Optional[int] = None,
+                 embed_batch_size: int = 64):
         """Initialize the TextbookAgent.
         
         Args:
             storage_dir: Directory to store vector embeddings
+            llm_client: Shared Ollama client (created from the configuration if None)
+            pdf_workers: Processes extracting PDF pages in parallel (CPU count if None)
+            embed_batch_size: Chunks embedded and inserted together while loading a book
         """
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(exist_ok=True)
+        self.llm_client = llm_client if llm_client is not None else OllamaClient.from_config()
+        self.pdf_workers = pdf_workers
+        self.embed_batch_size = embed_batch_size
         
-        # Initialize embeddings
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-mpnet-base-v2"
+        # Initialize embeddings, reusing vectors of chunks embedded before
+        self.embeddings = CachedEmbeddings(
+            HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL),
+            EmbeddingCache(str(self.storage_dir / "embedding_cache")),
+            EMBEDDING_MODEL
         )
         
         # Initialize vector store
+        self.vector_client = chromadb.PersistentClient(path=str(self.storage_dir / "vectors"))
         self.vector_store = Chroma(
-            persist_directory=str(self.storage_dir / "vectors"),
+            client=self.vector_client,
+            collection_name=VECTOR_COLLECTION,
             embedding_function=self.embeddings
         )
         
@@ -62,25 +89,65 @@ class TextbookAgent:
         """Save list of processed books."""
         self.books_file.write_text("\n".join(self.loaded_books))
         
-    def _extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract text content from PDF file.
+    def _iter_book_pages(self, file_path: str, total_callback: Callable[[int], None]) -> Iterator[str]:
+        """Stream the text of a book page by page.
+        
+        PDF pages are extracted in parallel processes; text files are read in
+        fixed-size blocks that stand in for pages.
         
         Args:
-            pdf_path: Path to PDF file
+            file_path: Path to PDF or text file
+            total_callback: Called with the number of pages once it is known
             
         Returns:
-            Extracted text content
+            Iterator over page texts
         """
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-        return text
+        if file_path.lower().endswith('.pdf'):
+            # The page count comes from the extraction itself, so the PDF is parsed once
+            pages = iter_pdf_pages(
+                file_path,
+                workers=self.pdf_workers,
+                progress_callback=lambda done, total: total_callback(total) if done == 0 else None
+            )
+            return (text + "\n" for text in pages)
+        
+        def read_blocks() -> Iterator[str]:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                while True:
+                    block = f.read(TEXT_BLOCK_CHARS)
+                    if not block:
+                        return
+                    yield block
+        
+        total_callback(max(1, math.ceil(os.path.getsize(file_path) / TEXT_BLOCK_CHARS)))
+        return read_blocks()
+        
+    def _insert_chunks(self, texts: List[str], metadatas: List[Dict], vectors: List[List[float]]):
+        """Insert a batch of embedded chunks into the vector store.
+        
+        The vectors from the embedding step are written to the collection
+        directly, so chunks are never embedded twice.
+        
+        Args:
+            texts: Chunk texts
+            metadatas: Metadata of each chunk
+            vectors: Embedding of each chunk
+        """
+        collection = self.vector_client.get_or_create_collection(VECTOR_COLLECTION, embedding_function=None)
+        collection.upsert(
+            ids=[str(uuid.uuid4()) for _ in texts],
+            embeddings=vectors,
+            documents=texts,
+            metadatas=metadatas
+        )
         
     def load_book(self, file_path: str, with_progress: bool = True) -> bool:
         """Load and process a textbook.
         
+        Pages are extracted, split, embedded in batches of embed_batch_size
+        chunks and inserted as a stream, so memory use does not grow with
+        the size of the book.
+        
         Args:
             file_path: Path to PDF or text file
             with_progress: Show progress bar
@@ -96,35 +163,30 @@ class TextbookAgent:
                 logger.info(f"Book already loaded: {file_path}")
                 return True
                 
-            # Extract text based on file type
-            if file_path.lower().endswith('.pdf'):
-                text = self._extract_text_from_pdf(file_path)
-            else:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    text = f.read()
-                    
-            # Split text into chunks
-            chunks = self.text_splitter.split_text(text)
+            ingest = partial(
+                ingest_stream,
+                split_text=self.text_splitter.split_text,
+                embed=self.embeddings.embed_documents,
+                insert=self._insert_chunks,
+                source=file_path,
+                batch_size=self.embed_batch_size
+            )
             
-            # Add progress bar if requested
             if with_progress:
                 with Progress(
                     SpinnerColumn(),
                     TextColumn("[progress.description]{task.description}"),
+                    BarColumn(),
+                    MofNCompleteColumn(),
                     transient=True,
                 ) as progress:
-                    progress.add_task(description="Processing book...", total=None)
-                    # Add chunks to vector store with metadata
-                    self.vector_store.add_texts(
-                        texts=chunks,
-                        metadatas=[{"source": file_path, "chunk": i} for i in range(len(chunks))]
+                    task = progress.add_task(description="Processing book...", total=None)
+                    ingest(
+                        self._iter_book_pages(file_path, lambda total: progress.update(task, total=total)),
+                        progress_callback=lambda done: progress.update(task, completed=done)
                     )
             else:
-                # Add chunks without progress bar
-                self.vector_store.add_texts(
-                    texts=chunks,
-                    metadatas=[{"source": file_path, "chunk": i} for i in range(len(chunks))]
-                )
+                ingest(self._iter_book_pages(file_path, lambda total: None))
                 
             # Update loaded books list
             self.loaded_books.append(file_path)
@@ -204,31 +266,8 @@ Please provide a comprehensive explanation that includes:
             Incremental parts of LLM response
         """
         try:
-            import requests
-            import json
-            
-            response = requests.post(
-                "http://localhost:11434/api/generate",
-                json={
-                    "model": "llama3.2:3b",
-                    "prompt": prompt,
-                    "stream": True,  # Enable streaming
-                    "options": {
-                        "temperature": 0.7,
-                        "num_predict": 2048
-                    }
-                },
-                stream=True  # Enable streaming in the request
-            )
-            response.raise_for_status()
+            yield from self.llm_client.generate_stream(prompt, num_predict=2048)
             
-            # Stream response data
-            for line in response.iter_lines():
-                if line:
-                    # Parse JSON and extract the response field
-                    data = json.loads(line)
-                    yield data.get('response', '')
-                    
         except Exception as e:
             logger.error(f"Error getting LLM response: {str(e)}")
             yield f"Error: {str(e)}"
@@ -246,7 +285,8 @@ Please provide a comprehensive explanation that includes:
         try:
             # Clear vector store
             self.vector_store = Chroma(
-                persist_directory=str(self.storage_dir / "vectors"),
+                client=self.vector_client,
+                collection_name=VECTOR_COLLECTION,
                 embedding_function=self.embeddings
             )
             # Clear book list
@@ -12,6 +12,10 @@ class OllamaConfig:
     """Configuration for Ollama LLM."""
     base_url: str
     model_name: str
+    connect_timeout: float
+    read_timeout: float
+    keep_alive: str
+    num_ctx: int
 
 @dataclass
 class AgentConfig:
@@ -19,17 +23,49 @@ class AgentConfig:
     temperature: float
     max_iterations: int
 
+@dataclass
+class PubMedConfig:
+    """Configuration for PubMed E-utilities access."""
+    api_key: Optional[str]
+    cache_ttl_hours: float
+    cache_max_entries: int
+    mirror_path: Optional[str]
+
+@dataclass
+class LLMCacheConfig:
+    """Configuration for the LLM response cache."""
+    enabled: bool
+    path: str
+    max_mb: float
+    force: bool
+
 class Config:
     """Main configuration class."""
     def __init__(self):
         self.ollama = OllamaConfig(
             base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
-            model_name=os.getenv("MODEL_NAME", "llama3.2:3b")
+            model_name=os.getenv("MODEL_NAME", "llama3.2:3b"),
+            connect_timeout=float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.getenv("OLLAMA_READ_TIMEOUT", "300")),
+            keep_alive=os.getenv("OLLAMA_KEEP_ALIVE", "30m"),
+            num_ctx=int(os.getenv("OLLAMA_NUM_CTX", "8192"))
         )
         self.agent = AgentConfig(
             temperature=float(os.getenv("TEMPERATURE", "0.7")),
             max_iterations=int(os.getenv("MAX_ITERATIONS", "3"))
         )
+        self.llm_cache = LLMCacheConfig(
+            enabled=os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true",
+            path=os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3"),
+            max_mb=float(os.getenv("LLM_CACHE_MAX_MB", "256")),
+            force=os.getenv("LLM_CACHE_FORCE", "false").lower() == "true"
+        )
+        self.pubmed = PubMedConfig(
+            api_key=os.getenv("NCBI_API_KEY") or None,
+            cache_ttl_hours=float(os.getenv("PUBMED_CACHE_TTL_HOURS", "168")),
+            cache_max_entries=int(os.getenv("PUBMED_CACHE_MAX_ENTRIES", "10000")),
+            mirror_path=os.getenv("PUBMED_MIRROR_PATH") or None
+        )
 
     @classmethod
     def get_config(cls) -> 'Config':
@@ -0,0 +1,97 @@
+"""Content-addressed on-disk cache for LLM generations."""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+class LLMCache:
+    """SQLite-backed response cache with a size limit and LRU eviction.
+    
+    Responses are keyed by a hash of everything that determines the output
+    (endpoint, model, prompt or messages and sampling options), so replaying
+    the same request returns the stored generation without calling the model.
+    """
+    
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        """Initialize the cache.
+        
+        Args:
+            path: SQLite database file (created if missing)
+            max_bytes: Maximum total size of stored responses
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+        """)
+        
+    @staticmethod
+    def make_key(request: Dict[str, Any]) -> str:
+        """Hash a request description into a cache key.
+        
+        Args:
+            request: JSON-serializable description of the request
+            
+        Returns:
+            Hex SHA-256 digest of the canonical JSON encoding
+        """
+        encoded = json.dumps(request, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+        
+    def get(self, key: str) -> Optional[str]:
+        """Look up a cached response.
+        
+        Args:
+            key: Cache key from make_key
+            
+        Returns:
+            Cached response text, or None on a miss
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+        
+    def put(self, key: str, response: str) -> None:
+        """Store a response and evict least recently used entries over the size limit.
+        
+        Args:
+            key: Cache key from make_key
+            response: Generated text
+        """
+        size = len(response.encode("utf-8"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, response, size, time.time())
+            )
+            self._conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY accessed DESC, rowid DESC) AS running
+                        FROM responses
+                    ) WHERE running > ?
+                )
+            """, (self.max_bytes,))
+            
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+            
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
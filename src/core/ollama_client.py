@@ -0,0 +1,303 @@
+"""Shared client for the Ollama generate and chat APIs, with streaming and model warm-up."""
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+import requests
+
+from src.core.config import Config
+from src.core.llm_cache import LLMCache
+from src.utils.http import create_session
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class OllamaClient:
+    """Ollama API client with a pooled session and timeouts."""
+    
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3.2:3b",
+                 temperature: float = 0.7, num_predict: int = 1024, num_ctx: Optional[int] = None,
+                 session: Optional[requests.Session] = None,
+                 connect_timeout: float = 5.0, read_timeout: float = 300.0,
+                 keep_alive: Optional[str] = "30m", cache: Optional[LLMCache] = None,
+                 force_cache: bool = False):
+        """Initialize the Ollama client.
+        
+        Args:
+            base_url: Base URL for Ollama API
+            model: Name of the model to use
+            temperature: Sampling temperature
+            num_predict: Default maximum number of tokens to generate
+            num_ctx: Context window size requested from Ollama (model default if None)
+            session: Shared HTTP session (a pooled keep-alive session is created if None)
+            connect_timeout: Seconds to wait for a connection to Ollama
+            read_timeout: Seconds to wait between response bytes from Ollama
+            keep_alive: How long Ollama keeps the model loaded after a request
+                (e.g. "30m", "-1" for forever; server default if None)
+            cache: Response cache for replaying identical requests
+            force_cache: Use the cache even when sampling with temperature > 0
+        """
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.temperature = temperature
+        self.num_predict = num_predict
+        self.num_ctx = num_ctx
+        self.session = session if session is not None else create_session()
+        self.timeout = (connect_timeout, read_timeout)
+        self.keep_alive = keep_alive
+        self.cache = cache
+        self.force_cache = force_cache
+        self._local = threading.local()
+        
+    @property
+    def last_stats(self) -> Dict[str, float]:
+        """Timing statistics of the last generation made by the calling thread."""
+        return getattr(self._local, "stats", {})
+        
+    @classmethod
+    def from_config(cls, config: Optional[Config] = None,
+                    session: Optional[requests.Session] = None) -> 'OllamaClient':
+        """Create a client from the application configuration.
+        
+        Args:
+            config: Configuration to use (loaded from the environment if None)
+            session: Shared HTTP session
+            
+        Returns:
+            Configured Ollama client
+        """
+        config = config or Config.get_config()
+        cache = None
+        if config.llm_cache.enabled:
+            cache = LLMCache(config.llm_cache.path, max_bytes=int(config.llm_cache.max_mb * 1024 * 1024))
+        return cls(
+            base_url=config.ollama.base_url,
+            model=config.ollama.model_name,
+            temperature=config.agent.temperature,
+            num_ctx=config.ollama.num_ctx,
+            session=session,
+            connect_timeout=config.ollama.connect_timeout,
+            read_timeout=config.ollama.read_timeout,
+            keep_alive=config.ollama.keep_alive,
+            cache=cache,
+            force_cache=config.llm_cache.force
+        )
+        
+    def generate(self, prompt: str, num_predict: Optional[int] = None) -> str:
+        """Generate a complete response.
+        
+        Args:
+            prompt: Prompt for the LLM
+            num_predict: Maximum number of tokens to generate (client default if None)
+            
+        Returns:
+            LLM response
+            
+        Raises:
+            requests.exceptions.RequestException: If the request fails
+        """
+        payload = self._payload(prompt, num_predict, stream=False)
+        cache_key = self._cache_key("/api/generate", payload)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._local.stats = {"cached": True}
+                return cached
+                
+        response = self.session.post(
+            f"{self.base_url}/api/generate",
+            json=payload,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        
+        result = response.json()
+        self._record_stats(result, first_token_time=None)
+        if cache_key is not None:
+            self.cache.put(cache_key, result.get("response", ""))
+        return result.get("response", "")
+        
+    def generate_stream(self, prompt: str, num_predict: Optional[int] = None) -> Iterator[str]:
+        """Generate a response as a stream of chunks.
+        
+        Args:
+            prompt: Prompt for the LLM
+            num_predict: Maximum number of tokens to generate (client default if None)
+            
+        Yields:
+            Chunks of the LLM response
+            
+        Raises:
+            requests.exceptions.RequestException: If the request fails
+        """
+        yield from self._stream(
+            "/api/generate",
+            self._payload(prompt, num_predict, stream=True),
+            lambda chunk_data: chunk_data.get("response", "")
+        )
+        
+    def chat_stream(self, messages: List[Dict[str, str]],
+                    num_predict: Optional[int] = None) -> Iterator[str]:
+        """Continue a conversation and stream the assistant reply.
+        
+        Ollama keeps the evaluated conversation in its KV cache, so when the
+        messages extend a previous request only the new turns are evaluated.
+        
+        Args:
+            messages: Conversation so far as {"role", "content"} dictionaries
+            num_predict: Maximum number of tokens to generate (client default if None)
+            
+        Yields:
+            Chunks of the assistant reply
+            
+        Raises:
+            requests.exceptions.RequestException: If the request fails
+        """
+        payload = self._payload(None, num_predict, stream=True)
+        payload["messages"] = messages
+        yield from self._stream(
+            "/api/chat",
+            payload,
+            lambda chunk_data: chunk_data.get("message", {}).get("content", "")
+        )
+        
+    def warm_up(self) -> Optional[float]:
+        """Load the model into memory without generating anything.
+        
+        Returns:
+            Model load time in seconds as reported by Ollama, or None on failure
+        """
+        try:
+            payload = {"model": self.model}
+            if self.keep_alive is not None:
+                payload["keep_alive"] = self.keep_alive
+            response = self.session.post(
+                f"{self.base_url}/api/generate", json=payload, timeout=self.timeout
+            )
+            response.raise_for_status()
+            
+            load_time = response.json().get("load_duration", 0) / 1e9
+            logger.debug(f"Model {self.model} warmed up in {load_time:.2f}s")
+            return load_time
+            
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Could not warm up model {self.model}: {str(e)}")
+            return None
+            
+    def start_warm_up(self) -> threading.Thread:
+        """Warm up the model in a background thread.
+        
+        Returns:
+            The started daemon thread
+        """
+        thread = threading.Thread(target=self.warm_up, name="ollama-warm-up", daemon=True)
+        thread.start()
+        return thread
+                    
+    def _stream(self, path: str, payload: Dict,
+                extract_text: Callable[[Dict], str]) -> Iterator[str]:
+        """Run a streaming request and yield the text of each response line.
+        
+        Args:
+            path: API endpoint path
+            payload: Request body
+            extract_text: Returns the generated text contained in a response line
+            
+        Yields:
+            Non-empty chunks of generated text
+        """
+        cache_key = self._cache_key(path, payload)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._local.stats = {"cached": True}
+                if cached:
+                    yield cached
+                return
+                
+        self._local.stats = {}
+        started = time.perf_counter()
+        first_token_time = None
+        chunks = []
+        
+        with self.session.post(
+            f"{self.base_url}{path}",
+            json=payload,
+            stream=True,
+            timeout=self.timeout
+        ) as response:
+            response.raise_for_status()
+            
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                try:
+                    chunk_data = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                text = extract_text(chunk_data)
+                if text:
+                    if first_token_time is None:
+                        first_token_time = time.perf_counter() - started
+                    chunks.append(text)
+                    yield text
+                if chunk_data.get("done"):
+                    self._record_stats(chunk_data, first_token_time)
+                    # Only complete generations are cached
+                    if cache_key is not None:
+                        self.cache.put(cache_key, "".join(chunks))
+                    
+    def _cache_key(self, path: str, payload: Dict) -> Optional[str]:
+        """Get the cache key for a request, or None if the cache does not apply.
+        
+        Sampled generations (temperature > 0) are not deterministic, so they
+        bypass the cache unless force_cache is set.
+        """
+        if self.cache is None or (self.temperature > 0 and not self.force_cache):
+            return None
+        request = {key: value for key, value in payload.items() if key not in ("stream", "keep_alive")}
+        return LLMCache.make_key({"path": path, **request})
+        
+    def _payload(self, prompt: Optional[str], num_predict: Optional[int], stream: bool) -> Dict:
+        """Build the request body for /api/generate or /api/chat."""
+        payload = {
+            "model": self.model,
+            "stream": stream,
+            "options": {
+                "temperature": self.temperature,
+                "num_predict": num_predict if num_predict is not None else self.num_predict
+            }
+        }
+        if self.num_ctx is not None:
+            payload["options"]["num_ctx"] = self.num_ctx
+        if prompt is not None:
+            payload["prompt"] = prompt
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+        
+    def _record_stats(self, result: Dict, first_token_time: Optional[float]) -> None:
+        """Keep timing statistics of the last generation, separating model load time.
+        
+        Args:
+            result: Final response object from Ollama (durations in nanoseconds)
+            first_token_time: Seconds until the first streamed token arrived
+        """
+        stats = {
+            "load_time": result.get("load_duration", 0) / 1e9,
+            "prompt_eval_time": result.get("prompt_eval_duration", 0) / 1e9,
+            "generation_time": result.get("eval_duration", 0) / 1e9,
+            "total_time": result.get("total_duration", 0) / 1e9,
+            "prompt_tokens": result.get("prompt_eval_count", 0),
+            "generated_tokens": result.get("eval_count", 0)
+        }
+        if first_token_time is not None:
+            stats["time_to_first_token"] = first_token_time
+        self._local.stats = stats
+        
+        logger.debug(
+            f"Ollama timings: load {stats['load_time']:.2f}s, "
+            f"prompt eval {stats['prompt_eval_time']:.2f}s, "
+            f"generation {stats['generation_time']:.2f}s"
+        )
@@ -0,0 +1,190 @@
+"""Token-budget-aware construction of research prompts."""
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Rough characters-per-token ratio used when no tiktoken encoding is available
+CHARS_PER_TOKEN = 4
+
+# Tokens added per article for field labels and separators in the formatted block
+ARTICLE_OVERHEAD_TOKENS = 16
+
+TRUNCATION_MARKER = " [...]"
+
+# Smallest literature block worth running an analysis on
+MIN_LITERATURE_TOKENS = 512
+
+
+@lru_cache(maxsize=None)
+def _load_encoding(encoding_name: str):
+    """Load a tiktoken encoding once, falling back to a character estimate."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding {encoding_name} unavailable, estimating tokens: {str(e)}")
+        return None
+
+
+class PromptBuilder:
+    """Fits PubMed literature into the model context window.
+    
+    The budget for the literature block is what is left of the context after
+    the prompt template, the follow-up turns and the tokens reserved for the
+    model's answers. Articles are ranked by overlap with the topic; every
+    selected article keeps its citation header while abstracts share the
+    remaining budget evenly and are truncated only as far as needed.
+    """
+    
+    def __init__(self, context_tokens: int = 8192, num_predict: int = 1024,
+                 encoding_name: str = "cl100k_base", encoding=None):
+        """Initialize the prompt builder.
+        
+        Args:
+            context_tokens: Model context window in tokens (Ollama num_ctx)
+            num_predict: Tokens reserved for each generated answer
+            encoding_name: tiktoken encoding used to count tokens
+            encoding: Pre-loaded encoding with encode/decode (overrides encoding_name)
+        """
+        self.context_tokens = context_tokens
+        self.num_predict = num_predict
+        self.encoding = encoding if encoding is not None else _load_encoding(encoding_name)
+    
+    def count_tokens(self, text: str) -> int:
+        """Count the tokens in a text.
+        
+        Args:
+            text: Text to measure
+        
+        Returns:
+            Number of tokens
+        """
+        if self.encoding is None:
+            return -(-len(text) // CHARS_PER_TOKEN)
+        return len(self.encoding.encode(text))
+    
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut a text down to a token limit.
+        
+        Args:
+            text: Text to truncate
+            max_tokens: Maximum number of tokens to keep
+        
+        Returns:
+            The text itself if it fits, otherwise its prefix followed by a marker
+        """
+        if self.count_tokens(text) <= max_tokens:
+            return text
+        keep = max(0, max_tokens - self.count_tokens(TRUNCATION_MARKER))
+        if self.encoding is None:
+            prefix = text[:keep * CHARS_PER_TOKEN]
+        else:
+            prefix = self.encoding.decode(self.encoding.encode(text)[:keep])
+        return prefix.rstrip() + TRUNCATION_MARKER
+    
+    def literature_budget(self, template: str, followup: str, iterations: int) -> int:
+        """Compute how many tokens the literature block may use.
+        
+        Args:
+            template: Initial prompt rendered without literature
+            followup: Follow-up prompt appended for every further iteration
+            iterations: Total number of analysis rounds in the conversation
+        
+        Returns:
+            Token budget for the formatted literature
+            
+        Raises:
+            ValueError: If less than MIN_LITERATURE_TOKENS are left for the literature
+        """
+        reserved = (
+            self.count_tokens(template)
+            + (iterations - 1) * self.count_tokens(followup)
+            + iterations * self.num_predict
+        )
+        budget = self.context_tokens - reserved
+        if budget < MIN_LITERATURE_TOKENS:
+            raise ValueError(
+                f"A {self.context_tokens}-token context leaves {max(0, budget)} tokens for the literature "
+                f"after {iterations} iterations of {self.num_predict} tokens; use fewer iterations "
+                f"or a larger context (OLLAMA_NUM_CTX)"
+            )
+        return budget
+    
+    def rank_articles(self, articles: List[Dict], query: str) -> List[Dict]:
+        """Order articles by how many query terms their title and abstract contain.
+        
+        Args:
+            articles: Article metadata dictionaries in search order
+            query: Research topic
+        
+        Returns:
+            Articles sorted by relevance (search order breaks ties)
+        """
+        terms = set(re.findall(r"\w+", query.lower()))
+        
+        def score(article: Dict) -> int:
+            words = re.findall(r"\w+", f"{article.get('title', '')} {article.get('abstract', '')}".lower())
+            return sum(1 for word in words if word in terms)
+        
+        return sorted(articles, key=score, reverse=True)
+    
+    def fit_articles(self, articles: List[Dict], budget: int,
+                     query: Optional[str] = None) -> List[Dict]:
+        """Select and truncate articles so the formatted literature fits a token budget.
+        
+        Args:
+            articles: Article metadata dictionaries
+            budget: Token budget for the literature block
+            query: Research topic used to rank articles (search order if None)
+        
+        Returns:
+            Copies of the selected articles, most relevant first, with abstracts
+            truncated to their share of the budget
+            
+        Raises:
+            ValueError: If not even the most relevant article fits the budget
+        """
+        ranked = self.rank_articles(articles, query) if query else list(articles)
+        
+        # Keep citation headers for as many articles as fit, most relevant first
+        selected = []
+        headers = 0
+        for article in ranked:
+            header = self._header_tokens(article)
+            if headers + header > budget:
+                if not selected:
+                    raise ValueError(f"No article fits a literature budget of {budget} tokens")
+                logger.info(f"Dropping {len(ranked) - len(selected)} least relevant articles to fit the context")
+                break
+            selected.append(article)
+            headers += header
+        
+        # Share the rest evenly; short abstracts hand their unused share to longer ones
+        remaining = budget - headers
+        needs = [self.count_tokens(article.get("abstract", "")) for article in selected]
+        allocation = [0] * len(selected)
+        pending = sorted(range(len(selected)), key=lambda i: needs[i])
+        while pending:
+            share = remaining // len(pending)
+            index = pending.pop(0)
+            allocation[index] = min(needs[index], share)
+            remaining -= allocation[index]
+        
+        fitted = []
+        for article, need, tokens in zip(selected, needs, allocation):
+            if tokens < need:
+                article = {**article, "abstract": self.truncate(article.get("abstract", ""), tokens)}
+            fitted.append(article)
+        return fitted
+    
+    def _header_tokens(self, article: Dict) -> int:
+        """Count the tokens of an article's formatted citation without its abstract."""
+        authors = article.get("authors", [])
+        if isinstance(authors, list):
+            authors = ", ".join(authors)
+        fields = [article.get(key, "") for key in ("title", "journal", "year", "url")]
+        return self.count_tokens(" ".join(str(field) for field in [*fields, authors])) + ARTICLE_OVERHEAD_TOKENS
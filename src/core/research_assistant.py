@@ -1,8 +1,14 @@
 """AI Research Assistant with PubMed integration."""
 import os
+import sys
 import json
+import re
+import shutil
+import time
 import requests
-from typing import Dict, List, Optional, Generator, Callable
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Generator, Callable, Set
 from datetime import datetime
 
 from rich.console import Console
@@ -13,16 +19,64 @@ from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.markdown import Markdown
 
+from src.core.config import Config
+from src.core.ollama_client import OllamaClient
+from src.core.prompt_builder import PromptBuilder
+from src.core.research_pipeline import Stage, StagedPipeline
+from src.core.research_store import ResearchStore
+from src.utils.http import create_session
 from src.utils.logger import get_logger
+from src.utils.pubmed_cache import PubMedCache
+from src.utils.pubmed_mirror import LocalPubMedSearcher, PubMedMirror
+from src.utils.stream_log import StreamLog
 from src.utils.web_search import PubMedSearcher
 
 logger = get_logger(__name__)
 
+# Subdirectory of a topic holding the stage checkpoints of an unfinished run
+CHECKPOINT_DIR = "checkpoint"
+
+# Results of a completed run that the next completed run replaces
+STALE_RESULT_PATTERN = r"(findings_\d+|update_\d{8}_\d{6})\.txt|.*\.tmp"
+
+# Characters of the streamed answer kept for the live display
+STREAM_TAIL_CHARS = 2000
+
+@dataclass
+class ResearchJob:
+    """State of one topic as it moves through the research stages."""
+    topic: str
+    max_iterations: int = 3
+    topic_dir: str = ""
+    checkpoint_dir: str = ""
+    search_results: List[Dict] = field(default_factory=list)
+    formatted_results: str = ""
+    findings: List[str] = field(default_factory=list)
+    llm_timings: List[Dict] = field(default_factory=list)
+    result: Optional[str] = None
+    failed: bool = False
+    stream_log: Optional[StreamLog] = None
+    resume: bool = False
+    resumed_stages: Set[str] = field(default_factory=set)
+    refresh: bool = False
+    previous_metadata: Dict = field(default_factory=dict)
+    previous_results: List[Dict] = field(default_factory=list)
+    previous_findings: str = ""
+
 class ResearchDisplay:
-    """Handles the CLI display of research progress."""
+    """Handles the CLI display of research progress.
+    
+    Updates only mark the display dirty; the layout is rebuilt at most
+    refresh_per_second times, matching how often Live repaints it.
+    """
     
-    def __init__(self):
-        """Initialize the research display."""
+    def __init__(self, refresh_per_second: float = 4, clock: Callable[[], float] = time.monotonic):
+        """Initialize the research display.
+        
+        Args:
+            refresh_per_second: Maximum number of layout rebuilds per second
+            clock: Monotonic time source used for throttling
+        """
         self.console = Console()
         self.layout = Layout()
         self.current_stage = ""
@@ -30,6 +84,11 @@ class ResearchDisplay:
         self.current_iteration = 0
         self.max_iterations = 0
         self.stream_content = []
+        self.refresh_per_second = refresh_per_second
+        self._clock = clock
+        self._dirty = False
+        self._last_render = None
+        self._streaming = False
         
     def create_layout(self) -> Layout:
         """Create the layout for the research display."""
@@ -40,9 +99,23 @@ class ResearchDisplay:
         )
         return self.layout
         
-    def update_display(self, stage: str, content: str) -> None:
-        """Update the display with new content."""
+    def update_display(self, stage: str, content: str, append: bool = False) -> None:
+        """Update the display with new content.
+        
+        Args:
+            stage: Research stage the update belongs to
+            content: Status message or streamed text
+            append: Merge streamed text into the current line of the same stage
+        """
         self.current_stage = stage
+        self._dirty = True
+        
+        if append and self._streaming and self.stream_content[-1][0] == stage:
+            # Keep only the tail of a long streamed answer
+            text = (self.stream_content[-1][1] + content)[-STREAM_TAIL_CHARS:]
+            self.stream_content[-1] = (stage, text)
+            return
+        self._streaming = append
         
         if stage == "PUBMED" and "Found" in content:
             self.papers_found = int(content.split()[1])
@@ -72,8 +145,20 @@ class ResearchDisplay:
         content = "\n".join([f"[cyan]{stage}:[/cyan] {msg}" for stage, msg in self.stream_content])
         return Panel(content, title="Research Stream", border_style="blue")
     
-    def render(self) -> None:
-        """Render the current state."""
+    def render(self, force: bool = False) -> None:
+        """Rebuild the layout if it changed and the refresh interval has passed.
+        
+        Args:
+            force: Rebuild now regardless of the refresh interval
+        """
+        if not self._dirty:
+            return
+        now = self._clock()
+        if not force and self._last_render is not None and now - self._last_render < 1 / self.refresh_per_second:
+            return
+        self._dirty = False
+        self._last_render = now
+        
         self.layout["header"].update(
             Panel("Research Assistant", style="bold blue", border_style="blue")
         )
@@ -92,170 +177,592 @@ class ResearchDisplay:
 class ResearchAssistant:
     """AI-powered research assistant with PubMed integration."""
     
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3.2:3b", 
-                 data_dir: str = "research_data"):
+    def __init__(self, base_url: Optional[str] = None, model: Optional[str] = None,
+                 data_dir: str = "research_data", session: Optional[requests.Session] = None,
+                 llm_client: Optional[OllamaClient] = None, pubmed_searcher=None,
+                 headless: Optional[bool] = None,
+                 progress_callback: Optional[Callable[[str, str, str], None]] = None,
+                 store: Optional[ResearchStore] = None, log_progress: bool = False):
         """Initialize the research assistant.
         
         Args:
-            base_url: Base URL for Ollama API
-            model: Name of the model to use
+            base_url: Base URL for Ollama API (overrides the configured URL; not
+                allowed together with llm_client)
+            model: Name of the model to use (overrides the configured model; not
+                allowed together with llm_client)
             data_dir: Directory to store research data and papers
+            session: Shared HTTP session for outgoing requests (created if None)
+            llm_client: Shared Ollama client (created from the configuration if None)
+            pubmed_searcher: Shared PubMed searcher (created from the configuration if None)
+            headless: Skip the full-screen live display and all rendering work
+                (defaults to True when stdout is not a terminal)
+            progress_callback: Called with (topic, stage, content) for every progress update
+            store: Research store recording every run (data_dir/research.sqlite3 if None)
+            log_progress: Log every status update (not the streamed analysis text),
+                for runs without a display
+            
+        Raises:
+            ValueError: If base_url or model is given together with llm_client
         """
-        self.base_url = base_url
-        self.model = model
-        self.pubmed_searcher = PubMedSearcher()
+        config = Config.get_config()
+        self.session = session if session is not None else create_session()
+        if llm_client is None:
+            llm_client = OllamaClient.from_config(config, session=self.session)
+            if base_url is not None:
+                llm_client.base_url = base_url.rstrip("/")
+            if model is not None:
+                llm_client.model = model
+        elif base_url is not None or model is not None:
+            # A shared client is used by other holders; changing it here would affect them too
+            raise ValueError("base_url and model cannot be overridden on a shared llm_client")
+        self.llm_client = llm_client
+        self.prompt_builder = PromptBuilder(
+            context_tokens=llm_client.num_ctx or config.ollama.num_ctx,
+            num_predict=llm_client.num_predict
+        )
         self.data_dir = os.path.abspath(data_dir)
         os.makedirs(self.data_dir, exist_ok=True)
+        self.store = store if store is not None else ResearchStore(
+            os.path.join(self.data_dir, "research.sqlite3")
+        )
+        
+        self.headless = not sys.stdout.isatty() if headless is None else headless
+        self.progress_callback = progress_callback
+        self.log_progress = log_progress
+        self._rendering = False
+        self.pipeline_stats = []
+        
+        pubmed_config = config.pubmed
+        if pubmed_searcher is not None:
+            self.pubmed_searcher = pubmed_searcher
+        elif pubmed_config.mirror_path:
+            # Answer searches offline from a local baseline mirror
+            self.pubmed_searcher = LocalPubMedSearcher(PubMedMirror(pubmed_config.mirror_path))
+        else:
+            self.pubmed_searcher = PubMedSearcher(
+                session=self.session,
+                api_key=pubmed_config.api_key,
+                cache=PubMedCache(
+                    os.path.join(self.data_dir, "pubmed_cache.sqlite3"),
+                    ttl=pubmed_config.cache_ttl_hours * 3600,
+                    max_entries=pubmed_config.cache_max_entries
+                )
+            )
         self.display = ResearchDisplay()
         
-    def research_topic(self, topic: str, max_iterations: int = 3) -> str:
+    def research_topic(self, topic: str, max_iterations: int = 3, resume: bool = False,
+                       refresh: bool = False) -> str:
         """Research a topic using PubMed and LLM.
         
         Args:
             topic: Topic to research
             max_iterations: Maximum number of research iterations
+            resume: Continue from the checkpoints of a previous run of the topic
+                instead of discarding them and starting over
+            refresh: Only analyze papers added since the previous completed run
+                and merge the result into its findings (full run if there is none)
             
         Returns:
             Research findings as a string
         """
         logger.info(f"Starting research on topic: {topic}")
-        self.display.max_iterations = max_iterations
         
-        # Create live display
-        layout = self.display.create_layout()
+        if self.headless:
+            live = nullcontext()
+        else:
+            # Create live display
+            self.display.max_iterations = max_iterations
+            layout = self.display.create_layout()
+            live = Live(layout, refresh_per_second=self.display.refresh_per_second, screen=True)
         
-        with Live(layout, refresh_per_second=4, screen=True):
+        with live:
+            self._rendering = not self.headless
+            job = ResearchJob(topic=topic, max_iterations=max_iterations, resume=resume, refresh=refresh)
             try:
-                # Create topic-specific directory
-                topic_dir = os.path.join(self.data_dir, self._sanitize_filename(topic))
-                os.makedirs(topic_dir, exist_ok=True)
-                
-                # Create stream log file
-                stream_log_path = os.path.join(topic_dir, "research_stream.log")
-                
-                def log_stream(stage: str, content: str):
-                    """Log stream updates to file and display."""
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    log_entry = f"[{timestamp}] {stage}: {content}\n"
-                    
-                    # Write to stream log
-                    with open(stream_log_path, 'a', encoding='utf-8') as f:
-                        f.write(log_entry)
-                    
-                    # Update display
-                    self.display.update_display(stage, content)
-                    self.display.render()
-                
-                log_stream("START", f"Beginning research on topic: {topic}")
-                
-                # Search PubMed for relevant scientific literature
-                log_stream("PUBMED", "Searching PubMed for relevant papers...")
-                search_results = self.pubmed_searcher.search(topic)
-                log_stream("PUBMED", f"Found {len(search_results)} relevant papers")
-                
-                formatted_results = self.pubmed_searcher.format_results(search_results)
-                
-                # Save PubMed results
-                self._save_json(os.path.join(topic_dir, "pubmed_results.json"), search_results)
-                self._save_text(os.path.join(topic_dir, "formatted_results.txt"), formatted_results)
-                
-                # Create initial research prompt
-                log_stream("ANALYSIS", "Starting initial analysis...")
-                prompt = self._create_research_prompt(topic, formatted_results)
-                
-                # Get initial findings with streaming
-                findings = []
-                for chunk in self._get_llm_response_stream(prompt):
-                    log_stream("ANALYSIS", chunk)
-                current_findings = self._get_llm_response(prompt)
-                findings.append(current_findings)
-                
-                # Save initial findings
-                self._save_text(os.path.join(topic_dir, "findings_0.txt"), current_findings)
-                
-                # Iteratively improve findings
-                for i in range(max_iterations - 1):
-                    log_stream("ITERATION", f"Starting iteration {i+1}/{max_iterations-1}")
-                    
-                    # Create follow-up prompt
-                    prompt = self._create_followup_prompt(topic, current_findings, formatted_results)
-                    
-                    # Get additional findings with streaming
-                    for chunk in self._get_llm_response_stream(prompt):
-                        log_stream("ANALYSIS", chunk)
-                    current_findings = self._get_llm_response(prompt)
-                    findings.append(current_findings)
-                    
-                    # Save iteration findings
-                    self._save_text(os.path.join(topic_dir, f"findings_{i+1}.txt"), current_findings)
-                
-                # Combine and format all findings
-                log_stream("FINALIZING", "Combining all findings...")
-                final_response = self._format_findings(findings)
-                
-                # Save final response
-                self._save_text(os.path.join(topic_dir, "final_findings.txt"), final_response)
-                
-                # Save research metadata
-                metadata = {
-                    "topic": topic,
-                    "timestamp": str(datetime.now()),
-                    "model": self.model,
-                    "iterations": max_iterations,
-                    "num_papers": len(search_results)
-                }
-                self._save_json(os.path.join(topic_dir, "metadata.json"), metadata)
-                
-                log_stream("COMPLETE", "Research completed successfully")
+                self.start_job(job)
+                self.run_search(job)
+                self.run_format(job)
+                self.run_analysis(job)
+                self.run_persist(job)
                 logger.info("Research completed successfully")
-                return final_response
+                return job.result
                 
             except Exception as e:
-                error_msg = f"Error during research: {str(e)}"
-                if 'log_stream' in locals():
-                    log_stream("ERROR", error_msg)
-                logger.error(error_msg)
-                return error_msg
+                return self.fail_job(job, e)
+            
+            finally:
+                if self._rendering:
+                    self.display.render(force=True)
+                self._rendering = False
+    
+    def research_topics(self, topics: List[str], max_workers: int = 4, max_iterations: int = 3,
+                        on_complete: Optional[Callable[[str, str], None]] = None,
+                        queue_size: int = 2, search_workers: int = 2,
+                        resume: bool = False, refresh: bool = False) -> Dict[str, str]:
+        """Research several topics as a staged pipeline.
+        
+        Topics flow through search, format, analysis and persist stages
+        connected by bounded queues, so PubMed searches for upcoming topics
+        run while the LLM analyzes earlier ones. Nothing is rendered because
+        several topics are in flight at once; use progress_callback or
+        on_complete to report progress.
+        
+        Args:
+            topics: Topics to research (duplicates are researched once)
+            max_workers: Maximum number of topics analyzed by the LLM at the same time
+            max_iterations: Maximum number of research iterations per topic
+            on_complete: Called with (topic, findings) as each topic finishes
+            queue_size: Capacity of the queue in front of each stage
+            search_workers: Number of PubMed searches running at the same time
+            resume: Continue every topic from its checkpoints; completed topics are not redone
+            refresh: Only analyze papers added since each topic's previous run
+            
+        Returns:
+            Dictionary mapping each topic to its findings or error message
+        """
+        topics = list(dict.fromkeys(topics))
+        logger.info(f"Researching {len(topics)} topics with {max_workers} analysis workers")
+        
+        def search(job: ResearchJob) -> None:
+            self.start_job(job)
+            self.run_search(job)
+        
+        pipeline = StagedPipeline(
+            [
+                Stage("search", search, workers=search_workers),
+                Stage("format", self.run_format),
+                Stage("analyze", self.run_analysis, workers=max_workers),
+                Stage("persist", self.run_persist)
+            ],
+            queue_size=queue_size,
+            on_error=self.fail_job
+        )
+        jobs = pipeline.run(
+            [ResearchJob(topic=topic, max_iterations=max_iterations, resume=resume, refresh=refresh)
+             for topic in topics],
+            on_complete=lambda job: on_complete(job.topic, job.result) if on_complete else None
+        )
+        self.pipeline_stats = pipeline.stats
+        logger.info(f"Pipeline throughput:\n{pipeline.report()}")
+        
+        return {job.topic: job.result for job in jobs}
+    
+    def start_job(self, job: ResearchJob) -> None:
+        """Create the topic directory and open the stream log for a job.
+        
+        A refresh job loads the previous completed run, a resumed job loads
+        the checkpoints left by a previous run, and any other job removes
+        them so stale findings cannot leak into a later resume. Checkpoints
+        live in their own directory, so the results of the last completed
+        run stay in place until the new run completes.
+        
+        Args:
+            job: Research job to start
+        """
+        topic_dir = os.path.join(self.data_dir, self._sanitize_filename(job.topic))
+        os.makedirs(topic_dir, exist_ok=True)
+        job.topic_dir = topic_dir
+        job.checkpoint_dir = os.path.join(topic_dir, CHECKPOINT_DIR)
+        job.stream_log = StreamLog(os.path.join(topic_dir, "research_stream.jsonl"))
+        self._log_stream(job, "START", f"Beginning research on topic: {job.topic}")
+        
+        if job.refresh and not self._load_previous_run(job):
+            self._log_stream(job, "REFRESH", "No completed run to refresh, researching from scratch")
+            job.refresh = False
+        
+        if job.refresh:
+            return
+        if job.resume:
+            self._load_checkpoints(job)
+        else:
+            self._clear_checkpoints(job)
+        if "persist" not in job.resumed_stages:
+            os.makedirs(job.checkpoint_dir, exist_ok=True)
+    
+    def run_search(self, job: ResearchJob) -> None:
+        """Search PubMed for relevant scientific literature.
+        
+        Args:
+            job: Research job to update with the search results
+        """
+        if job.refresh:
+            self._search_new_papers(job)
+            return
+        if "search" in job.resumed_stages:
+            self._log_stream(job, "PUBMED", f"Resumed {len(job.search_results)} papers from checkpoint")
+            return
+        self._log_stream(job, "PUBMED", "Searching PubMed for relevant papers...")
+        job.search_results = self.pubmed_searcher.search(job.topic)
+        self._log_stream(job, "PUBMED", f"Found {len(job.search_results)} relevant papers")
+        
+        # Checkpoint the search so a resumed run does not fetch again
+        self._save_json(os.path.join(job.checkpoint_dir, "pubmed_results.json"), job.search_results)
+    
+    def run_format(self, job: ResearchJob) -> None:
+        """Fit the literature into the prompt budget, format and save it.
+        
+        Args:
+            job: Research job with search results
+        """
+        # A resumed conversation must see exactly the literature it started with
+        if "format" in job.resumed_stages:
+            return
+        
+        # Fit the literature into the context left after prompts and answers
+        if job.refresh:
+            budget = self.prompt_builder.literature_budget(
+                template=self._create_update_prompt(job.topic, self._previous_findings_excerpt(job), ""),
+                followup="",
+                iterations=1
+            )
+        else:
+            budget = self.prompt_builder.literature_budget(
+                template=self._create_research_prompt(job.topic, ""),
+                followup=self._create_followup_prompt(job.topic),
+                iterations=job.max_iterations
+            )
+        selected_results = self.prompt_builder.fit_articles(job.search_results, budget, query=job.topic)
+        self._log_stream(job, "FORMAT", f"Selected {len(selected_results)} of {len(job.search_results)} "
+                                        f"papers for a {budget}-token literature budget")
+        job.formatted_results = self.pubmed_searcher.format_results(selected_results)
+        
+        # A refresh keeps the original literature; new papers are merged on persist
+        if job.refresh:
+            return
+        
+        # Save formatted results
+        self._save_text(os.path.join(job.checkpoint_dir, "formatted_results.txt"), job.formatted_results)
+    
+    def run_analysis(self, job: ResearchJob) -> None:
+        """Analyze the literature with the LLM over several iterations.
+        
+        Args:
+            job: Research job with formatted literature
+        """
+        if job.refresh:
+            self._analyze_new_papers(job)
+            return
+        if "analysis" in job.resumed_stages:
+            return
+        log_stream = lambda stage, content, append=False: self._log_stream(job, stage, content, append)
+        
+        # Keep the conversation so the literature is only evaluated once;
+        # follow-up turns extend the cached prefix instead of resending it
+        prompt = self._create_research_prompt(job.topic, job.formatted_results)
+        messages = [{"role": "user", "content": prompt}]
+        
+        for i in range(job.max_iterations):
+            if i > 0:
+                # Continue the conversation with a follow-up request
+                messages.append({"role": "user", "content": self._create_followup_prompt(job.topic)})
+            
+            # Replay checkpointed answers to rebuild the conversation
+            if i < len(job.findings):
+                messages.append({"role": "assistant", "content": job.findings[i]})
+                continue
+            
+            if i == 0:
+                log_stream("ANALYSIS", "Starting initial analysis...")
+            else:
+                log_stream("ITERATION", f"Starting iteration {i}/{job.max_iterations-1}")
+            
+            # Get findings with streaming
+            current_findings = self._generate_findings(messages, log_stream)
+            job.findings.append(current_findings)
+            job.llm_timings.append(self.llm_client.last_stats)
+            messages.append({"role": "assistant", "content": current_findings})
+            
+            # Save iteration findings
+            self._save_text(os.path.join(job.checkpoint_dir, f"findings_{i}.txt"), current_findings)
+    
+    def run_persist(self, job: ResearchJob) -> None:
+        """Combine the findings and save them with the research metadata.
+        
+        Args:
+            job: Research job with analysis findings
+        """
+        if job.refresh:
+            self._persist_refresh(job)
+            return
+        if "persist" in job.resumed_stages:
+            self._log_stream(job, "COMPLETE", "Research already completed")
+            job.stream_log.close()
+            return
+        
+        # Combine and format all findings
+        self._log_stream(job, "FINALIZING", "Combining all findings...")
+        job.result = self._format_findings(job.findings)
+        
+        # Save final response
+        self._save_text(os.path.join(job.topic_dir, "final_findings.txt"), job.result)
+        
+        # Save research metadata
+        metadata = {
+            "topic": job.topic,
+            "timestamp": str(datetime.now()),
+            "model": self.llm_client.model,
+            "iterations": job.max_iterations,
+            "num_papers": len(job.search_results),
+            "llm_timings": job.llm_timings
+        }
+        self._save_json(os.path.join(job.topic_dir, "metadata.json"), metadata)
+        self._publish_checkpoints(job)
+        self._record_run(job, metadata["timestamp"])
+        
+        self._log_stream(job, "COMPLETE", "Research completed successfully")
+        job.stream_log.close()
+    
+    def fail_job(self, job: ResearchJob, error: Exception) -> str:
+        """Record a failed job.
+        
+        Args:
+            job: Research job that failed
+            error: Exception raised by the failing stage
+            
+        Returns:
+            Error message stored as the job result
+        """
+        error_msg = f"Error during research: {str(error)}"
+        if job.stream_log is not None:
+            self._log_stream(job, "ERROR", error_msg)
+            job.stream_log.close()
+        logger.error(error_msg)
+        job.result = error_msg
+        job.failed = True
+        if job.topic_dir:
+            try:
+                self._record_run(job, str(datetime.now()))
+            except Exception as e:
+                logger.error(f"Error recording failed run: {str(e)}")
+        return error_msg
+    
+    def _load_previous_run(self, job: ResearchJob) -> bool:
+        """Load the metadata, literature and findings of the topic's last completed run.
+        
+        Returns:
+            True if a completed run was found
+        """
+        metadata_path = os.path.join(job.topic_dir, "metadata.json")
+        final_path = os.path.join(job.topic_dir, "final_findings.txt")
+        if not (os.path.exists(metadata_path) and os.path.exists(final_path)):
+            return False
+        
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            job.previous_metadata = json.load(f)
+        with open(final_path, 'r', encoding='utf-8') as f:
+            job.previous_findings = f.read()
+        papers_path = os.path.join(job.topic_dir, "pubmed_results.json")
+        if os.path.exists(papers_path):
+            with open(papers_path, 'r', encoding='utf-8') as f:
+                job.previous_results = json.load(f)
+        return True
+    
+    def _search_new_papers(self, job: ResearchJob) -> None:
+        """Search PubMed for papers added since the previous run of a refresh job."""
+        since = datetime.fromisoformat(job.previous_metadata["timestamp"])
+        mindate = since.strftime("%Y/%m/%d")
+        self._log_stream(job, "PUBMED", f"Searching PubMed for papers added since {mindate}...")
+        
+        # Entrez dates have day granularity, so papers seen on the last run's day are dropped here
+        known = {article.get("id") for article in job.previous_results}
+        results = self.pubmed_searcher.search(job.topic, mindate=mindate,
+                                              maxdate=datetime.now().strftime("%Y/%m/%d"))
+        job.search_results = [article for article in results if article.get("id") not in known]
+        self._log_stream(job, "PUBMED", f"Found {len(job.search_results)} new papers")
+    
+    def _analyze_new_papers(self, job: ResearchJob) -> None:
+        """Analyze the new papers of a refresh job against the previous findings."""
+        if not job.search_results:
+            self._log_stream(job, "ANALYSIS", "No new papers, skipping analysis")
+            return
+        
+        log_stream = lambda stage, content, append=False: self._log_stream(job, stage, content, append)
+        log_stream("ANALYSIS", f"Analyzing {len(job.search_results)} new papers...")
+        prompt = self._create_update_prompt(job.topic, self._previous_findings_excerpt(job), job.formatted_results)
+        
+        update = self._generate_findings([{"role": "user", "content": prompt}], log_stream)
+        job.findings.append(update)
+        job.llm_timings.append(self.llm_client.last_stats)
+    
+    def _persist_refresh(self, job: ResearchJob) -> None:
+        """Merge the update of a refresh job into the topic's files."""
+        now = datetime.now()
+        metadata = dict(job.previous_metadata)
+        metadata["timestamp"] = str(now)
+        metadata["refreshes"] = metadata.get("refreshes", []) + [{
+            "timestamp": str(now),
+            "since": job.previous_metadata["timestamp"],
+            "new_papers": len(job.search_results)
+        }]
+        
+        if job.findings:
+            self._log_stream(job, "FINALIZING", "Merging the update into the previous findings...")
+            job.result = (
+                f"{job.previous_findings.rstrip()}\n\n"
+                f"Update {now.strftime('%Y-%m-%d')} ({len(job.search_results)} new papers):\n"
+                f"{job.findings[0]}\n"
+            )
+            all_results = job.previous_results + job.search_results
+            metadata["num_papers"] = len(all_results)
+            metadata["llm_timings"] = metadata.get("llm_timings", []) + job.llm_timings
+            
+            self._save_text(os.path.join(job.topic_dir, f"update_{now.strftime('%Y%m%d_%H%M%S')}.txt"),
+                            job.findings[0])
+            self._save_json(os.path.join(job.topic_dir, "pubmed_results.json"), all_results)
+            self._save_text(os.path.join(job.topic_dir, "final_findings.txt"), job.result)
+            self._record_run(job, metadata["timestamp"], papers=all_results)
+        else:
+            job.result = job.previous_findings
+        
+        # The next refresh searches from this run on, even when nothing was new
+        self._save_json(os.path.join(job.topic_dir, "metadata.json"), metadata)
+        self._log_stream(job, "COMPLETE", "Refresh completed successfully")
+        job.stream_log.close()
+    
+    def _previous_findings_excerpt(self, job: ResearchJob) -> str:
+        """Cut a refresh job's previous findings to at most a quarter of the context."""
+        return self.prompt_builder.truncate(job.previous_findings, self.prompt_builder.context_tokens // 4)
+    
+    def _load_checkpoints(self, job: ResearchJob) -> None:
+        """Load the results of the stages a previous run of the job completed."""
+        checkpoint_dir = job.checkpoint_dir
+        
+        # Without checkpoints, the topic is either completed or was never started
+        if not os.path.isdir(checkpoint_dir):
+            final_path = os.path.join(job.topic_dir, "final_findings.txt")
+            if os.path.exists(final_path) and os.path.exists(os.path.join(job.topic_dir, "metadata.json")):
+                with open(final_path, 'r', encoding='utf-8') as f:
+                    job.result = f.read()
+                job.resumed_stages.update({"search", "format", "analysis", "persist"})
+                self._log_stream(job, "RESUME", "Research already completed, nothing to do")
+            return
+        
+        papers_path = os.path.join(checkpoint_dir, "pubmed_results.json")
+        if not os.path.exists(papers_path):
+            return
+        with open(papers_path, 'r', encoding='utf-8') as f:
+            job.search_results = json.load(f)
+        job.resumed_stages.add("search")
+        
+        formatted_path = os.path.join(checkpoint_dir, "formatted_results.txt")
+        if os.path.exists(formatted_path):
+            with open(formatted_path, 'r', encoding='utf-8') as f:
+                job.formatted_results = f.read()
+            job.resumed_stages.add("format")
+            
+            # Findings are only valid for the literature they were generated from
+            for i in range(job.max_iterations):
+                findings_path = os.path.join(checkpoint_dir, f"findings_{i}.txt")
+                if not os.path.exists(findings_path):
+                    break
+                with open(findings_path, 'r', encoding='utf-8') as f:
+                    job.findings.append(f.read())
+                job.llm_timings.append({})
+        
+        self._log_stream(job, "RESUME", f"Resuming after {', '.join(sorted(job.resumed_stages))} "
+                                        f"with {len(job.findings)} of {job.max_iterations} iterations done")
+    
+    def _clear_checkpoints(self, job: ResearchJob) -> None:
+        """Remove the checkpoints of an unfinished previous run of the job."""
+        if os.path.isdir(job.checkpoint_dir):
+            shutil.rmtree(job.checkpoint_dir)
+    
+    def _publish_checkpoints(self, job: ResearchJob) -> None:
+        """Replace the previous results of the topic with the checkpoints of the completed job.
+        
+        Runs after the final findings are written; until the checkpoint
+        directory is gone, a resumed run persists the job again.
+        """
+        for name in os.listdir(job.topic_dir):
+            # Leftover .tmp files come from writes interrupted by a crash
+            if re.fullmatch(STALE_RESULT_PATTERN, name):
+                os.remove(os.path.join(job.topic_dir, name))
+        for name in os.listdir(job.checkpoint_dir):
+            path = os.path.join(job.checkpoint_dir, name)
+            if name.endswith(".tmp"):
+                os.remove(path)
+            else:
+                os.replace(path, os.path.join(job.topic_dir, name))
+        os.rmdir(job.checkpoint_dir)
+    
+    def _record_run(self, job: ResearchJob, timestamp: str, papers: Optional[List[Dict]] = None) -> None:
+        """Record a finished or failed job in the research store.
+        
+        A refresh passes the merged papers, so the run matches the topic's
+        metadata.json and pubmed_results.json; its findings are the update.
+        """
+        self.store.record_run(
+            topic=job.topic,
+            timestamp=timestamp,
+            model=self.llm_client.model,
+            iterations=job.max_iterations,
+            papers=job.search_results if papers is None else papers,
+            findings=job.findings,
+            final_findings=None if job.failed else job.result,
+            timings=job.llm_timings,
+            status="failed" if job.failed else "complete",
+            topic_dir=job.topic_dir
+        )
+    
+    def _log_stream(self, job: ResearchJob, stage: str, content: str, append: bool = False) -> None:
+        """Log stream updates to the job's stream log and the display.
+        
+        Status messages are shown, flushed and (with log_progress) logged
+        immediately; streamed chunks (append=True) merge into the current
+        line and are written and rendered on an interval.
+        """
+        job.stream_log.write(stage, content, append=append)
+        if not append:
+            job.stream_log.flush()
+            if self.log_progress:
+                logger.info(f"[{job.topic}] {stage}: {content}")
+        
+        if self.progress_callback is not None:
+            self.progress_callback(job.topic, stage, content)
+        
+        # Only pay for layout work while a live display is showing it
+        if self._rendering:
+            self.display.update_display(stage, content, append=append)
+            self.display.render(force=not append)
+    
+    def _generate_findings(self, messages: List[Dict[str, str]],
+                           log_stream: Callable[..., None]) -> str:
+        """Generate findings with a single streaming LLM call.
+        
+        Every chunk is passed to the stream log as it arrives and accumulated,
+        so the returned text is exactly what was displayed.
+        
+        Args:
+            messages: Research conversation so far
+            log_stream: Callback receiving (stage, chunk, append=True) for display and logging
             
-    def _get_llm_response_stream(self, prompt: str) -> Generator[str, None, None]:
+        Returns:
+            Complete LLM response
+        """
+        chunks = []
+        for chunk in self._get_llm_response_stream(messages):
+            log_stream("ANALYSIS", chunk, append=True)
+            chunks.append(chunk)
+        return "".join(chunks)
+        
+    def _get_llm_response_stream(self, messages: List[Dict[str, str]]) -> Generator[str, None, None]:
         """Get a streaming response from the LLM.
         
         Args:
-            prompt: Prompt for the LLM
+            messages: Research conversation so far
             
         Yields:
             Chunks of the LLM response
+            
+        Raises:
+            requests.exceptions.RequestException: If the stream fails; the
+                partial answer is not checkpointed, so a resumed run retries it
         """
         try:
-            # Prepare the request
-            url = f"{self.base_url}/api/generate"
-            data = {
-                "model": self.model,
-                "prompt": prompt,
-                "stream": True,
-                "options": {
-                    "temperature": 0.7,
-                    "num_predict": 1024
-                }
-            }
-            
-            # Make the streaming request
-            with requests.post(url, json=data, stream=True) as response:
-                response.raise_for_status()
-                
-                for line in response.iter_lines():
-                    if line:
-                        try:
-                            chunk_data = json.loads(line)
-                            if 'response' in chunk_data:
-                                yield chunk_data['response']
-                        except json.JSONDecodeError:
-                            continue
-                    
+            yield from self.llm_client.chat_stream(messages)
         except requests.exceptions.RequestException as e:
-            error_msg = f"Error getting streaming LLM response: {str(e)}"
-            logger.error(error_msg)
-            yield error_msg
+            logger.error(f"Error getting streaming LLM response: {str(e)}")
+            raise
             
     def _create_research_prompt(self, topic: str, search_results: str) -> str:
         """Create the initial research prompt.
@@ -279,26 +786,20 @@ Based on these scientific sources, provide a comprehensive analysis that include
 
 Please cite specific papers when discussing their findings."""
         
-    def _create_followup_prompt(self, topic: str, current_findings: str, search_results: str) -> str:
+    def _create_followup_prompt(self, topic: str) -> str:
         """Create a follow-up research prompt.
         
+        The literature and previous analyses are already part of the
+        conversation, so they are not repeated here.
+        
         Args:
             topic: Research topic
-            current_findings: Current research findings
-            search_results: Formatted search results from PubMed
             
         Returns:
             Follow-up prompt for the LLM
         """
-        return f"""Based on the previous analysis and the available scientific literature about {topic}:
-
-Previous Analysis:
-{current_findings}
-
-Available Literature:
-{search_results}
-
-Please provide additional insights focusing on:
+        return f"""Based on your previous analysis and the scientific literature about {topic} above,
+please provide additional insights focusing on:
 1. Aspects not covered in the previous analysis
 2. Alternative interpretations of the findings
 3. Connections between different studies
@@ -306,41 +807,34 @@ Please provide additional insights focusing on:
 
 Continue to cite specific papers when discussing their findings."""
         
-    def _get_llm_response(self, prompt: str) -> str:
-        """Get a response from the LLM.
+    def _create_update_prompt(self, topic: str, previous_findings: str, search_results: str) -> str:
+        """Create the prompt analyzing newly published literature.
         
         Args:
-            prompt: Prompt for the LLM
+            topic: Research topic
+            previous_findings: Findings of the previous research on the topic
+            search_results: Formatted new search results from PubMed
             
         Returns:
-            LLM response
+            Update prompt for the LLM
         """
-        try:
-            # Prepare the request
-            url = f"{self.base_url}/api/generate"
-            data = {
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "num_predict": 1024
-                }
-            }
-            
-            # Make the request
-            response = requests.post(url, json=data)
-            response.raise_for_status()
-            
-            # Parse the response
-            result = response.json()
-            return result.get('response', '')
-            
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Error getting LLM response: {str(e)}"
-            logger.error(error_msg)
-            return error_msg
-            
+        return f"""Below is a previous analysis of the scientific literature about {topic},
+followed by papers published since that analysis.
+
+Previous analysis:
+{previous_findings}
+
+New literature:
+{search_results}
+
+Based on the new papers, describe only what has changed:
+1. New findings and how they relate to the previous analysis
+2. Results that confirm, extend or contradict earlier conclusions
+3. New methodologies or limitations
+4. Updated implications and research directions
+
+Please cite specific papers when discussing their findings."""
+        
     def _format_findings(self, findings: List[str]) -> str:
         """Format the research findings.
         
@@ -380,15 +874,21 @@ Continue to cite specific papers when discussing their findings."""
             filepath: Path to save the file
             data: Data to save
         """
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        self._save_text(filepath, json.dumps(data, indent=2, ensure_ascii=False))
 
     def _save_text(self, filepath: str, text: str) -> None:
-        """Save text to a file.
+        """Save text to a file atomically.
+        
+        The text is written to a temporary file that replaces the target only
+        once it is complete, so a crash never leaves a truncated checkpoint.
         
         Args:
             filepath: Path to save the file
             text: Text to save
         """
-        with open(filepath, 'w', encoding='utf-8') as f:
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
@@ -0,0 +1,207 @@
+"""Staged pipeline that overlaps network-bound and GPU-bound research work."""
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Marks the end of the input for a stage worker
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """A pipeline stage that processes items in place."""
+    name: str
+    func: Callable[[Any], None]
+    workers: int = 1
+
+
+@dataclass
+class StageStats:
+    """Throughput counters of one pipeline stage."""
+    name: str
+    workers: int
+    items: int = 0
+    busy_time: float = 0.0
+    input_wait: float = 0.0
+    output_wait: float = 0.0
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    
+    @property
+    def elapsed(self) -> float:
+        """Seconds between the first item taken and the last worker exiting."""
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+    
+    @property
+    def throughput(self) -> float:
+        """Items completed per second of stage wall time."""
+        return self.items / self.elapsed if self.elapsed > 0 else 0.0
+    
+    @property
+    def utilization(self) -> float:
+        """Fraction of worker time spent processing rather than waiting."""
+        capacity = self.elapsed * self.workers
+        return self.busy_time / capacity if capacity > 0 else 0.0
+
+
+def format_report(stats: List[StageStats]) -> str:
+    """Format stage statistics as a plain-text table.
+    
+    High input wait means a stage is starved by its upstream; high output
+    wait means its downstream queue is full and the next stage is the
+    bottleneck.
+    
+    Args:
+        stats: Statistics of each stage in pipeline order
+    
+    Returns:
+        One line per stage with items, throughput, utilization and waits
+    """
+    lines = [f"{'stage':<10}{'workers':>8}{'items':>7}{'items/s':>9}{'util':>7}{'wait in':>10}{'wait out':>10}"]
+    for stage in stats:
+        lines.append(
+            f"{stage.name:<10}{stage.workers:>8}{stage.items:>7}{stage.throughput:>9.2f}"
+            f"{stage.utilization:>7.0%}{stage.input_wait:>9.1f}s{stage.output_wait:>9.1f}s"
+        )
+    return "\n".join(lines)
+
+
+class StagedPipeline:
+    """Runs items through a chain of stages connected by bounded queues.
+    
+    Every stage has its own worker threads, so different items can be in
+    different stages at the same time. The queue in front of each stage
+    holds at most queue_size items, which keeps fast upstream stages from
+    running arbitrarily far ahead. An item whose stage raises is handed to
+    on_error and skips the remaining stages.
+    """
+    
+    def __init__(self, stages: List[Stage], queue_size: int = 2,
+                 on_error: Optional[Callable[[Any, Exception], None]] = None,
+                 clock: Callable[[], float] = time.perf_counter):
+        """Initialize the pipeline.
+        
+        Args:
+            stages: Stages in processing order
+            queue_size: Capacity of the queue in front of each stage
+            on_error: Called with (item, exception) when a stage fails
+            clock: Monotonic time source for the statistics
+        """
+        self.stages = stages
+        self.queue_size = queue_size
+        self.on_error = on_error
+        self._clock = clock
+        self.stats = [StageStats(name=stage.name, workers=stage.workers) for stage in stages]
+    
+    def run(self, items: List[Any], on_complete: Optional[Callable[[Any], None]] = None) -> List[Any]:
+        """Process items through all stages.
+        
+        Args:
+            items: Items to process
+            on_complete: Called in the calling thread as each item leaves the pipeline
+        
+        Returns:
+            The processed items in input order
+        """
+        self.stats = [StageStats(name=stage.name, workers=stage.workers) for stage in self.stages]
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        queues.append(queue.Queue())
+        
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0]), daemon=True)]
+        remaining = [stage.workers for stage in self.stages]
+        locks = [threading.Lock() for _ in self.stages]
+        
+        for index, stage in enumerate(self.stages):
+            next_workers = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(index, queues[index], queues[index + 1], remaining, locks[index], next_workers),
+                    name=f"pipeline-{stage.name}-{worker}",
+                    daemon=True
+                ))
+        
+        for thread in threads:
+            thread.start()
+        
+        results = [None] * len(items)
+        while True:
+            envelope = queues[-1].get()
+            if envelope is _DONE:
+                break
+            position, item, _ = envelope
+            results[position] = item
+            if on_complete is not None:
+                on_complete(item)
+        
+        for thread in threads:
+            thread.join()
+        return results
+    
+    def report(self) -> str:
+        """Format the statistics of the last run."""
+        return format_report(self.stats)
+    
+    def _feed(self, items: List[Any], output: queue.Queue) -> None:
+        """Put the input items and one end marker per first-stage worker."""
+        for position, item in enumerate(items):
+            output.put((position, item, False))
+        for _ in range(self.stages[0].workers):
+            output.put(_DONE)
+    
+    def _work(self, index: int, input_queue: queue.Queue, output_queue: queue.Queue,
+              remaining: List[int], lock: threading.Lock, next_workers: int) -> None:
+        """Process items of one stage until its input is exhausted."""
+        stage = self.stages[index]
+        stats = self.stats[index]
+        
+        while True:
+            waited = self._clock()
+            envelope = input_queue.get()
+            started = self._clock()
+            if envelope is _DONE:
+                with lock:
+                    stats.input_wait += started - waited
+                break
+            
+            position, item, failed = envelope
+            # Items that failed upstream pass through without counting as work
+            processed = not failed
+            if processed:
+                try:
+                    stage.func(item)
+                except Exception as e:
+                    logger.error(f"Stage {stage.name} failed: {str(e)}")
+                    failed = True
+                    if self.on_error is not None:
+                        try:
+                            self.on_error(item, e)
+                        except Exception as handler_error:
+                            logger.error(f"Error handler failed: {str(handler_error)}")
+            finished = self._clock()
+            
+            output_queue.put((position, item, failed))
+            with lock:
+                if processed:
+                    stats.started = started if stats.started is None else min(stats.started, started)
+                    stats.items += 1
+                    stats.busy_time += finished - started
+                stats.input_wait += started - waited
+                stats.output_wait += self._clock() - finished
+        
+        # The last worker of a stage releases the workers of the next one
+        with lock:
+            remaining[index] -= 1
+            stats.finished = self._clock()
+            last = remaining[index] == 0
+        if last:
+            for _ in range(next_workers):
+                output_queue.put(_DONE)
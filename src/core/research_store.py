@@ -0,0 +1,363 @@
+"""SQLite store indexing research runs, their papers, findings and timings."""
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# LLM timing fields kept as columns of the timings table
+TIMING_FIELDS = (
+    "load_time", "prompt_eval_time", "generation_time", "total_time",
+    "prompt_tokens", "generated_tokens", "time_to_first_token"
+)
+
+class ResearchStore:
+    """Queryable record of research runs.
+    
+    Papers are stored once per PMID and linked to every run that used them,
+    so questions such as "which topics cite PMID X" are answered from an
+    index instead of by walking the research_data tree.
+    """
+    
+    def __init__(self, path: str):
+        """Initialize the store.
+        
+        Args:
+            path: SQLite database file (created if missing)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            PRAGMA foreign_keys = ON;
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY,
+                topic TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                model TEXT,
+                iterations INTEGER,
+                num_papers INTEGER,
+                status TEXT NOT NULL,
+                final_findings TEXT,
+                topic_dir TEXT,
+                UNIQUE (topic, timestamp)
+            );
+            CREATE TABLE IF NOT EXISTS papers (
+                pmid TEXT PRIMARY KEY,
+                title TEXT,
+                abstract TEXT,
+                authors TEXT,
+                journal TEXT,
+                year TEXT,
+                url TEXT
+            );
+            CREATE TABLE IF NOT EXISTS run_papers (
+                run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+                pmid TEXT NOT NULL REFERENCES papers (pmid),
+                rank INTEGER NOT NULL,
+                PRIMARY KEY (run_id, pmid)
+            );
+            CREATE TABLE IF NOT EXISTS findings (
+                run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+                iteration INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                PRIMARY KEY (run_id, iteration)
+            );
+            CREATE TABLE IF NOT EXISTS timings (
+                run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+                iteration INTEGER NOT NULL,
+                load_time REAL,
+                prompt_eval_time REAL,
+                generation_time REAL,
+                total_time REAL,
+                prompt_tokens INTEGER,
+                generated_tokens INTEGER,
+                time_to_first_token REAL,
+                cached INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (run_id, iteration)
+            );
+            CREATE INDEX IF NOT EXISTS runs_topic ON runs (topic);
+            CREATE INDEX IF NOT EXISTS run_papers_pmid ON run_papers (pmid);
+        """)
+    
+    def record_run(self, topic: str, timestamp: str, model: Optional[str], iterations: int,
+                   papers: List[Dict], findings: List[str], final_findings: Optional[str],
+                   timings: Optional[List[Dict]] = None, status: str = "complete",
+                   topic_dir: Optional[str] = None) -> int:
+        """Store a research run with its papers, findings and timings.
+        
+        Recording a run with the same topic and timestamp again replaces it.
+        
+        Args:
+            topic: Research topic
+            timestamp: Time the run finished
+            model: LLM used for the analysis
+            iterations: Number of research iterations requested
+            papers: Article metadata dictionaries in search order
+            findings: Findings of each iteration
+            final_findings: Combined findings (None if the run failed)
+            timings: LLM timing statistics of each iteration
+            status: "complete" or "failed"
+            topic_dir: Directory holding the run's files
+        
+        Returns:
+            ID of the stored run
+        """
+        paper_rows = [
+            (str(paper["id"]), paper.get("title"), paper.get("abstract"),
+             json.dumps(paper.get("authors", []), ensure_ascii=False),
+             paper.get("journal"), paper.get("year"), paper.get("url"))
+            for paper in papers if paper.get("id")
+        ]
+        
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM runs WHERE topic = ? AND timestamp = ?", (topic, timestamp))
+            run_id = self._conn.execute("""
+                INSERT INTO runs (topic, timestamp, model, iterations, num_papers, status, final_findings, topic_dir)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (topic, timestamp, model, iterations, len(papers), status, final_findings, topic_dir)).lastrowid
+            
+            # Newer records of a paper replace older ones
+            self._conn.executemany("""
+                INSERT INTO papers (pmid, title, abstract, authors, journal, year, url)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (pmid) DO UPDATE SET
+                    title = excluded.title,
+                    abstract = excluded.abstract,
+                    authors = excluded.authors,
+                    journal = excluded.journal,
+                    year = excluded.year,
+                    url = excluded.url
+            """, paper_rows)
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO run_papers (run_id, pmid, rank) VALUES (?, ?, ?)",
+                [(run_id, row[0], rank) for rank, row in enumerate(paper_rows)]
+            )
+            self._conn.executemany(
+                "INSERT INTO findings (run_id, iteration, content) VALUES (?, ?, ?)",
+                [(run_id, iteration, content) for iteration, content in enumerate(findings)]
+            )
+            self._conn.executemany(f"""
+                INSERT INTO timings (run_id, iteration, {", ".join(TIMING_FIELDS)}, cached)
+                VALUES (?, ?, {", ".join("?" for _ in TIMING_FIELDS)}, ?)
+            """, [
+                (run_id, iteration, *(stats.get(name) for name in TIMING_FIELDS), int(bool(stats.get("cached"))))
+                for iteration, stats in enumerate(timings or []) if stats
+            ])
+        return run_id
+    
+    def import_topic_dir(self, topic_dir: str) -> Optional[int]:
+        """Import one research_data/<topic> directory.
+        
+        Args:
+            topic_dir: Directory containing metadata.json and the run's files
+        
+        Returns:
+            ID of the stored run, or None if the directory holds no metadata
+        """
+        metadata_path = os.path.join(topic_dir, "metadata.json")
+        if not os.path.exists(metadata_path):
+            return None
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        
+        papers = []
+        papers_path = os.path.join(topic_dir, "pubmed_results.json")
+        if os.path.exists(papers_path):
+            with open(papers_path, 'r', encoding='utf-8') as f:
+                papers = json.load(f)
+        
+        # findings_N.txt sorted by iteration number, not lexically
+        iterations = sorted(
+            int(match.group(1)) for match in
+            (re.fullmatch(r"findings_(\d+)\.txt", name) for name in os.listdir(topic_dir)) if match
+        )
+        findings = [_read_text(os.path.join(topic_dir, f"findings_{n}.txt")) for n in iterations]
+        
+        final_path = os.path.join(topic_dir, "final_findings.txt")
+        final_findings = _read_text(final_path) if os.path.exists(final_path) else None
+        
+        return self.record_run(
+            topic=metadata["topic"],
+            timestamp=metadata["timestamp"],
+            model=metadata.get("model"),
+            iterations=metadata.get("iterations", len(findings)),
+            papers=papers,
+            findings=findings,
+            final_findings=final_findings,
+            timings=metadata.get("llm_timings"),
+            status="complete" if final_findings is not None else "failed",
+            topic_dir=os.path.abspath(topic_dir)
+        )
+    
+    def import_tree(self, data_dir: str) -> int:
+        """Import every topic directory of a research_data tree.
+        
+        Importing the same tree again updates runs instead of duplicating them.
+        
+        Args:
+            data_dir: Directory containing one subdirectory per topic
+        
+        Returns:
+            Number of runs imported
+        """
+        imported = 0
+        for entry in sorted(os.scandir(data_dir), key=lambda entry: entry.name):
+            if not entry.is_dir():
+                continue
+            try:
+                if self.import_topic_dir(entry.path) is not None:
+                    imported += 1
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Skipping {entry.path}: {str(e)}")
+        logger.info(f"Imported {imported} research runs from {data_dir}")
+        return imported
+    
+    def topics_citing(self, pmid: str) -> List[str]:
+        """Find the topics whose runs used a paper.
+        
+        Args:
+            pmid: PubMed ID
+        
+        Returns:
+            Distinct topics in alphabetical order
+        """
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT DISTINCT r.topic
+                FROM run_papers rp
+                JOIN runs r ON r.id = rp.run_id
+                WHERE rp.pmid = ?
+                ORDER BY r.topic
+            """, (str(pmid),)).fetchall()
+        return [topic for topic, in rows]
+    
+    def latest_run(self, topic: str) -> Optional[Dict]:
+        """Get the most recent run of a topic.
+        
+        Args:
+            topic: Research topic
+        
+        Returns:
+            Run row as a dictionary, or None if the topic was never researched
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT * FROM runs WHERE topic = ? ORDER BY timestamp DESC LIMIT 1", (topic,)
+            )
+            row = cursor.fetchone()
+            columns = [column[0] for column in cursor.description]
+        if row is None:
+            return None
+        return dict(zip(columns, row))
+    
+    def list_topics(self) -> List[Dict]:
+        """Summarize the researched topics.
+        
+        Returns:
+            One dictionary per topic with its number of runs and latest timestamp
+        """
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT topic, COUNT(*), MAX(timestamp)
+                FROM runs
+                GROUP BY topic
+                ORDER BY topic
+            """).fetchall()
+        return [{"topic": topic, "runs": runs, "last_run": last_run} for topic, runs, last_run in rows]
+    
+    def run_papers(self, run_id: int) -> List[Dict]:
+        """Get the papers of a run in search order.
+        
+        Args:
+            run_id: ID of the run
+        
+        Returns:
+            Article metadata dictionaries
+        """
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT p.pmid, p.title, p.abstract, p.authors, p.journal, p.year, p.url
+                FROM run_papers rp
+                JOIN papers p ON p.pmid = rp.pmid
+                WHERE rp.run_id = ?
+                ORDER BY rp.rank
+            """, (run_id,)).fetchall()
+        return [
+            {
+                "id": pmid,
+                "title": title,
+                "abstract": abstract,
+                "authors": json.loads(authors),
+                "journal": journal,
+                "year": year,
+                "url": url
+            }
+            for pmid, title, abstract, authors, journal, year, url in rows
+        ]
+    
+    def run_findings(self, run_id: int) -> List[str]:
+        """Get the findings of each iteration of a run.
+        
+        Args:
+            run_id: ID of the run
+        
+        Returns:
+            Findings in iteration order
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT content FROM findings WHERE run_id = ? ORDER BY iteration", (run_id,)
+            ).fetchall()
+        return [content for content, in rows]
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def _read_text(path: str) -> str:
+    """Read a UTF-8 text file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def main():
+    """Command line interface for importing and querying the research store."""
+    parser = argparse.ArgumentParser(description="Research run store")
+    parser.add_argument("--db", default=os.path.join("research_data", "research.sqlite3"),
+                        help="Store database path")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    import_parser = subparsers.add_parser("import", help="Import an existing research_data tree")
+    import_parser.add_argument("data_dir", nargs="?", default="research_data", help="Research data directory")
+    
+    cites_parser = subparsers.add_parser("cites", help="List the topics that used a paper")
+    cites_parser.add_argument("pmid", help="PubMed ID")
+    
+    subparsers.add_parser("topics", help="List researched topics")
+    
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    
+    store = ResearchStore(args.db)
+    try:
+        if args.command == "import":
+            store.import_tree(args.data_dir)
+        elif args.command == "cites":
+            for topic in store.topics_citing(args.pmid):
+                print(topic)
+        else:
+            for entry in store.list_topics():
+                print(f"{entry['topic']}\t{entry['runs']} runs\tlast {entry['last_run']}")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
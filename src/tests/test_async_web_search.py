@@ -0,0 +1,121 @@
+"""Tests for the asynchronous PubMed search utility."""
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from src.tests.test_web_search import _efetch_xml
+from src.utils.async_web_search import AsyncPubMedSearcher
+
+# Fake ESearch index: query -> matching PMIDs
+FAKE_INDEX = {
+    "alpha": ["1", "2", "3"],
+    "beta": ["4", "5"],
+    "empty": [],
+}
+
+
+class FakeEutilsHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the NCBI E-utilities endpoints."""
+    
+    requests_seen = []
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self.requests_seen.append((url.path, params))
+        
+        ids = FAKE_INDEX.get(params["term"], [])[:int(params["retmax"])]
+        self._reply(json.dumps({"esearchresult": {"idlist": ids}}).encode(), "application/json")
+        
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        data = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+        self.requests_seen.append((self.path, data))
+        # EFetch does not keep the order of the requested IDs
+        self._reply(_efetch_xml(*reversed(data["id"].split(","))), "text/xml")
+        
+    def _reply(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def log_message(self, *args):
+        pass
+
+
+class TestAsyncPubMedSearcher(unittest.IsolatedAsyncioTestCase):
+    """Test cases for AsyncPubMedSearcher against a local fake eutils server."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Start the fake eutils server."""
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeEutilsHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the fake eutils server."""
+        cls.server.shutdown()
+        cls.server.server_close()
+        
+    async def asyncSetUp(self):
+        """Set up test environment."""
+        FakeEutilsHandler.requests_seen = []
+        self.searcher = AsyncPubMedSearcher(
+            fetch_batch_size=2, api_key="test-async", requests_per_second=100.0
+        )
+        self.searcher.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        
+    async def asyncTearDown(self):
+        """Close the HTTP client."""
+        await self.searcher.aclose()
+        
+    async def test_search(self):
+        """Test a single search with batched EFetch calls."""
+        results = await self.searcher.search("alpha")
+        
+        self.assertEqual([article['id'] for article in results], ['1', '2', '3'])
+        self.assertEqual(results[0]['title'], 'Article 1')
+        paths = [path for path, _ in FakeEutilsHandler.requests_seen]
+        self.assertEqual(paths.count("/efetch.fcgi"), 2)
+        self.assertTrue(all(params["api_key"] == "test-async" for _, params in FakeEutilsHandler.requests_seen))
+        
+    async def test_search_with_entrez_dates(self):
+        """Test that date bounds are sent as an Entrez date range."""
+        await self.searcher.search("alpha", mindate="2024/01/01")
+        
+        params = FakeEutilsHandler.requests_seen[0][1]
+        self.assertEqual(params["datetype"], "edat")
+        self.assertEqual(params["mindate"], "2024/01/01")
+        self.assertRegex(params["maxdate"], r"^\d{4}/\d{2}/\d{2}$")
+        
+    async def test_search_many(self):
+        """Test that results of concurrent searches keep the query order."""
+        results = await self.searcher.search_many(["beta", "alpha", "empty"])
+        
+        self.assertEqual([[article['id'] for article in articles] for articles in results],
+                         [['4', '5'], ['1', '2', '3'], []])
+        
+    async def test_format_results(self):
+        """Test that formatting matches the synchronous searcher."""
+        results = await self.searcher.search("beta")
+        formatted = self.searcher.format_results(results)
+        
+        self.assertIn('Title: Article 4', formatted)
+        self.assertIn('Journal: Journal 5 (2023)', formatted)
+        self.assertEqual(self.searcher.format_results([]), "No articles found.")
+        
+    async def test_search_server_unreachable(self):
+        """Test that connection errors produce an empty result list."""
+        self.searcher.base_url = "http://127.0.0.1:1"
+        self.searcher.retry_count = 1
+        
+        self.assertEqual(await self.searcher.search("alpha"), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+"""Tests for streaming book ingestion."""
+import threading
+import unittest
+
+from src.utils.book_ingest import ingest_stream, iter_batches, iter_chunks
+
+
+def split_words(text):
+    """Split text into one chunk per word."""
+    return text.split()
+
+
+def split_overlapping(text, chunk_size=40, chunk_overlap=15):
+    """Pack words into chunks with an overlap, like RecursiveCharacterTextSplitter."""
+    chunks, current = [], []
+    for word in text.split(" "):
+        if not word:
+            continue
+        if current and len(" ".join(current + [word])) > chunk_size:
+            chunks.append(" ".join(current))
+            while current and (len(" ".join(current)) > chunk_overlap
+                               or len(" ".join(current + [word])) > chunk_size):
+                current.pop(0)
+        current.append(word)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+class TestBookIngest(unittest.TestCase):
+    """Test cases for the book ingestion pipeline."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.pages = [f"page {n} has some words\n" for n in range(1, 21)]
+    
+    def test_chunks_match_splitting_the_whole_text(self):
+        """Test that windowed splitting yields the chunks of the joined text."""
+        chunks = [chunk for chunk, _ in iter_chunks(self.pages, split_words, window_chars=50)]
+        self.assertEqual(chunks, split_words("".join(self.pages)))
+    
+    def test_overlapping_chunks_cover_the_text_across_windows(self):
+        """Test that an overlapping splitter loses no text at window boundaries."""
+        pages = [" ".join(f"w{n}.{i}" for i in range(7)) + " " for n in range(30)]
+        words = "".join(pages).split()
+        text = " " + " ".join(words) + " "
+        
+        chunks = [chunk for chunk, _ in iter_chunks(pages, split_overlapping, window_chars=120)]
+        
+        self.assertTrue(all(len(chunk) <= 40 for chunk in chunks))
+        self.assertTrue(all(f" {chunk} " in text for chunk in chunks))
+        joined = [f" {chunk} " for chunk in chunks]
+        for first, second in zip(words, words[1:]):
+            self.assertTrue(any(f" {first} {second} " in chunk for chunk in joined), (first, second))
+        self.assertEqual(chunks[0], split_overlapping("".join(pages))[0])
+    
+    def test_chunks_report_pages_read(self):
+        """Test that the page count never decreases and ends at the last page."""
+        consumed = [pages for _, pages in iter_chunks(self.pages, split_words, window_chars=50)]
+        self.assertEqual(consumed, sorted(consumed))
+        self.assertEqual(consumed[-1], len(self.pages))
+    
+    def test_batches_are_bounded(self):
+        """Test that batches hold at most batch_size chunks."""
+        batches = list(iter_batches(((str(n), n) for n in range(10)), batch_size=4))
+        self.assertEqual([len(texts) for texts, _ in batches], [4, 4, 2])
+        self.assertEqual([pages for _, pages in batches], [3, 7, 9])
+    
+    def test_ingest_embeds_and_inserts_in_batches(self):
+        """Test that every chunk is embedded and inserted with its metadata."""
+        embedded, inserted, progress = [], [], []
+        
+        def embed(texts):
+            embedded.append(len(texts))
+            return [[float(len(text))] for text in texts]
+        
+        def insert(texts, metadatas, vectors):
+            inserted.extend(zip(texts, metadatas, vectors))
+        
+        stored = ingest_stream(self.pages, split_words, embed, insert, source="book.pdf",
+                               batch_size=8, window_chars=50, progress_callback=progress.append)
+        
+        words = split_words("".join(self.pages))
+        self.assertEqual(stored, len(words))
+        self.assertTrue(all(size <= 8 for size in embedded))
+        self.assertEqual([text for text, _, _ in inserted], words)
+        self.assertEqual([metadata for _, metadata, _ in inserted],
+                         [{"source": "book.pdf", "chunk": i} for i in range(len(words))])
+        self.assertEqual([vector for _, _, vector in inserted], [[float(len(word))] for word in words])
+        self.assertEqual(progress[-1], len(self.pages))
+    
+    def test_reading_stays_bounded_by_the_queues(self):
+        """Test that a slow insert keeps pages from being read far ahead."""
+        pages_read = []
+        release = threading.Event()
+        
+        def pages():
+            for n in range(1000):
+                pages_read.append(n)
+                yield f"word{n}\n"
+        
+        def insert(texts, metadatas, vectors):
+            release.wait(timeout=5)
+        
+        worker = threading.Thread(target=ingest_stream, args=(pages(), split_words, lambda texts: texts, insert),
+                                  kwargs={"source": "book.txt", "batch_size": 1, "queue_size": 2, "window_chars": 1})
+        worker.start()
+        try:
+            threading.Event().wait(0.3)
+            self.assertLess(len(pages_read), 20)
+        finally:
+            release.set()
+            worker.join(timeout=10)
+        self.assertEqual(len(pages_read), 1000)
+    
+    def test_errors_propagate_to_the_caller(self):
+        """Test that an embedding failure is raised by ingest_stream."""
+        def embed(texts):
+            raise RuntimeError("embedding model unavailable")
+        
+        with self.assertRaisesRegex(RuntimeError, "embedding model unavailable"):
+            ingest_stream(self.pages, split_words, embed, lambda *args: None, source="book.pdf")
+    
+    def test_insert_errors_stop_the_pipeline(self):
+        """Test that a failed insert stops the background steps."""
+        def insert(texts, metadatas, vectors):
+            raise OSError("disk full")
+        
+        with self.assertRaisesRegex(OSError, "disk full"):
+            ingest_stream((f"word{n}\n" for n in range(10000)), split_words, lambda texts: texts, insert,
+                          source="book.txt", batch_size=1, window_chars=1)
+        self.assertFalse(any(thread.name.startswith("ingest-") for thread in threading.enumerate()))
+
+
+if __name__ == '__main__':
+    unittest.main()
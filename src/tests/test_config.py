@@ -15,12 +15,29 @@ class TestConfig(TestCase):
         """Test default values for Ollama configuration."""
         self.assertEqual(self.config.ollama.base_url, "http://localhost:11434")
         self.assertEqual(self.config.ollama.model_name, "llama3.2:3b")
+        self.assertEqual(self.config.ollama.connect_timeout, 5.0)
+        self.assertEqual(self.config.ollama.read_timeout, 300.0)
+        self.assertEqual(self.config.ollama.keep_alive, "30m")
+        self.assertEqual(self.config.ollama.num_ctx, 8192)
     
     def test_agent_config_default_values(self):
         """Test default values for Agent configuration."""
         self.assertEqual(self.config.agent.temperature, 0.7)
         self.assertEqual(self.config.agent.max_iterations, 3)
     
+    def test_llm_cache_config_default_values(self):
+        """Test default values for LLM cache configuration."""
+        self.assertFalse(self.config.llm_cache.enabled)
+        self.assertEqual(self.config.llm_cache.max_mb, 256)
+        self.assertFalse(self.config.llm_cache.force)
+    
+    def test_pubmed_config_default_values(self):
+        """Test default values for PubMed configuration."""
+        self.assertIsNone(self.config.pubmed.api_key)
+        self.assertEqual(self.config.pubmed.cache_ttl_hours, 168)
+        self.assertEqual(self.config.pubmed.cache_max_entries, 10000)
+        self.assertIsNone(self.config.pubmed.mirror_path)
+    
     def test_custom_env_values(self):
         """Test configuration with custom environment values."""
         # Set custom environment variables
@@ -0,0 +1,99 @@
+"""Tests for the persistent embedding cache."""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.utils.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+
+class FakeEmbeddings:
+    """Embedding model that records the documents it embeds."""
+    
+    def __init__(self):
+        self.embedded = []
+    
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[len(text) / 10, text.count("a") / 3, 1.0] for text in texts]
+    
+    def embed_query(self, text):
+        return [0.0, 0.0, 1.0]
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    """Test cases for EmbeddingCache and CachedEmbeddings classes."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = EmbeddingCache(self.tmp_dir.name)
+        self.model = FakeEmbeddings()
+        self.embeddings = CachedEmbeddings(self.model, self.cache, "fake/model")
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        self.cache.close()
+        self.tmp_dir.cleanup()
+    
+    def test_only_unseen_chunks_are_embedded(self):
+        """Test that a second load embeds only the new chunks."""
+        first = self.embeddings.embed_documents(["alpha", "beta", "gamma"])
+        second = self.embeddings.embed_documents(["beta", "delta", "alpha", "delta"])
+        
+        self.assertEqual(self.model.embedded, ["alpha", "beta", "gamma", "delta"])
+        self.assertEqual(second[0], first[1])
+        self.assertEqual(second[2], first[0])
+        self.assertEqual(second[1], second[3])
+        self.assertEqual(self.cache.count("fake/model"), 4)
+    
+    def test_vectors_are_stored_as_float16(self):
+        """Test that cached and fresh vectors are identical at float16 precision."""
+        fresh = self.embeddings.embed_documents(["banana"])[0]
+        expected = np.asarray(self.model.embed_documents(["banana"])[0], dtype=np.float16).astype(np.float32)
+        
+        self.assertEqual(fresh, expected.tolist())
+        self.assertEqual(os.path.getsize(os.path.join(self.tmp_dir.name, "fake_model.f16")), 3 * 2)
+    
+    def test_cache_persists_across_instances(self):
+        """Test that vectors are reused after reopening the cache."""
+        vector = self.embeddings.embed_documents(["persisted chunk"])[0]
+        self.cache.close()
+        
+        self.cache = EmbeddingCache(self.tmp_dir.name)
+        model = FakeEmbeddings()
+        reopened = CachedEmbeddings(model, self.cache, "fake/model")
+        
+        self.assertEqual(reopened.embed_documents(["persisted chunk"]), [vector])
+        self.assertEqual(model.embedded, [])
+    
+    def test_models_are_cached_separately(self):
+        """Test that the model name is part of the cache key."""
+        self.embeddings.embed_documents(["shared text"])
+        other = FakeEmbeddings()
+        CachedEmbeddings(other, self.cache, "other/model").embed_documents(["shared text"])
+        
+        self.assertEqual(other.embedded, ["shared text"])
+        self.assertEqual(self.cache.get("missing/model", ["shared text"]), [None])
+    
+    def test_unindexed_tail_is_overwritten(self):
+        """Test that bytes left by an interrupted write are replaced by the next rows."""
+        self.embeddings.embed_documents(["first"])
+        with open(os.path.join(self.tmp_dir.name, "fake_model.f16"), 'ab') as f:
+            f.write(b"\x00" * 5)
+        
+        self.embeddings.embed_documents(["second"])
+        
+        self.assertEqual(os.path.getsize(os.path.join(self.tmp_dir.name, "fake_model.f16")), 2 * 3 * 2)
+        cached = self.cache.get("fake/model", ["second"])[0]
+        self.assertAlmostEqual(float(cached[0]), 0.6, places=2)
+    
+    def test_queries_are_not_cached(self):
+        """Test that queries go straight to the wrapped model."""
+        self.assertEqual(self.embeddings.embed_query("what is alpha?"), [0.0, 0.0, 1.0])
+        self.assertEqual(self.cache.count("fake/model"), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
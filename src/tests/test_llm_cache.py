@@ -0,0 +1,103 @@
+"""Tests for the LLM response cache."""
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from src.core.llm_cache import LLMCache
+from src.core.ollama_client import OllamaClient
+
+
+class TestLLMCache(unittest.TestCase):
+    """Test cases for LLMCache class."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = LLMCache(os.path.join(self.tmp_dir.name, "llm.sqlite3"), max_bytes=10)
+        
+    def tearDown(self):
+        """Clean up test environment."""
+        self.cache.close()
+        self.tmp_dir.cleanup()
+        
+    def test_key_is_order_independent(self):
+        """Test that keys only depend on request content."""
+        first = LLMCache.make_key({"model": "m", "options": {"a": 1, "b": 2}})
+        second = LLMCache.make_key({"options": {"b": 2, "a": 1}, "model": "m"})
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, LLMCache.make_key({"model": "other", "options": {"a": 1, "b": 2}}))
+        
+    def test_roundtrip(self):
+        """Test storing and retrieving a response."""
+        self.cache.put("key", "hello")
+        self.assertEqual(self.cache.get("key"), "hello")
+        self.assertIsNone(self.cache.get("missing"))
+        
+    def test_lru_eviction_by_size(self):
+        """Test that least recently used responses are evicted over the size limit."""
+        self.cache.put("a", "aaaa")
+        self.cache.put("b", "bbbb")
+        self.cache.get("a")
+        self.cache.put("c", "cccc")
+        
+        self.assertEqual(self.cache.get("a"), "aaaa")
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("c"), "cccc")
+
+
+class TestOllamaClientCache(unittest.TestCase):
+    """Test cases for cached generations in OllamaClient."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = LLMCache(os.path.join(self.tmp_dir.name, "llm.sqlite3"))
+        self.session = MagicMock()
+        response = self.session.post.return_value.__enter__.return_value
+        response.iter_lines.return_value = [b'{"message": {"content": "Hello"}}',
+                                            b'{"message": {"content": ""}, "done": true}']
+        
+    def tearDown(self):
+        """Clean up test environment."""
+        self.cache.close()
+        self.tmp_dir.cleanup()
+        
+    def _client(self, temperature, force_cache=False):
+        return OllamaClient(model="test-model", temperature=temperature, session=self.session,
+                            cache=self.cache, force_cache=force_cache)
+        
+    def test_deterministic_replay(self):
+        """Test that a repeated greedy request is answered from the cache."""
+        messages = [{"role": "user", "content": "Hi"}]
+        first = list(self._client(0.0).chat_stream(messages))
+        second = list(self._client(0.0).chat_stream(messages))
+        
+        self.assertEqual(first, ["Hello"])
+        self.assertEqual(second, ["Hello"])
+        self.assertEqual(self.session.post.call_count, 1)
+        
+    def test_sampled_requests_bypass_cache(self):
+        """Test that temperature > 0 bypasses the cache unless forced."""
+        messages = [{"role": "user", "content": "Hi"}]
+        list(self._client(0.7).chat_stream(messages))
+        list(self._client(0.7).chat_stream(messages))
+        self.assertEqual(self.session.post.call_count, 2)
+        
+        list(self._client(0.7, force_cache=True).chat_stream(messages))
+        list(self._client(0.7, force_cache=True).chat_stream(messages))
+        self.assertEqual(self.session.post.call_count, 3)
+        
+    def test_incomplete_stream_not_cached(self):
+        """Test that a stream without a final chunk is not stored."""
+        response = self.session.post.return_value.__enter__.return_value
+        response.iter_lines.return_value = [b'{"message": {"content": "Hel"}}']
+        messages = [{"role": "user", "content": "Hi"}]
+        
+        list(self._client(0.0).chat_stream(messages))
+        list(self._client(0.0).chat_stream(messages))
+        
+        self.assertEqual(self.session.post.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
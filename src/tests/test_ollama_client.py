@@ -0,0 +1,99 @@
+"""Tests for the shared Ollama client."""
+import os
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+
+from src.core.config import Config
+from src.core.ollama_client import OllamaClient
+
+
+class TestOllamaClient(unittest.TestCase):
+    """Test cases for OllamaClient class."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.session = MagicMock()
+        self.client = OllamaClient(base_url="http://gpu-box:11434/", model="test-model",
+                                   temperature=0.2, session=self.session,
+                                   connect_timeout=1.0, read_timeout=60.0)
+        
+    def test_generate(self):
+        """Test a non-streaming generation request."""
+        self.session.post.return_value.json.return_value = {'response': 'Hello'}
+        
+        self.assertEqual(self.client.generate("Hi", num_predict=16), "Hello")
+        
+        args, kwargs = self.session.post.call_args
+        self.assertEqual(args[0], "http://gpu-box:11434/api/generate")
+        self.assertEqual(kwargs['timeout'], (1.0, 60.0))
+        self.assertEqual(kwargs['json']['model'], "test-model")
+        self.assertFalse(kwargs['json']['stream'])
+        self.assertEqual(kwargs['json']['options'], {'temperature': 0.2, 'num_predict': 16})
+        
+    def test_generate_stream(self):
+        """Test that streamed chunks are yielded and malformed lines skipped."""
+        response = self.session.post.return_value.__enter__.return_value
+        response.iter_lines.return_value = [b'{"response": "Hel"}', b'', b'not json',
+                                            b'{"response": "lo", "done": true}']
+        
+        self.assertEqual(list(self.client.generate_stream("Hi")), ["Hel", "lo"])
+        
+        kwargs = self.session.post.call_args.kwargs
+        self.assertTrue(kwargs['stream'])
+        self.assertEqual(kwargs['json']['options']['num_predict'], 1024)
+        
+    def test_keep_alive_and_stats(self):
+        """Test that keep_alive is sent and load time is reported separately."""
+        response = self.session.post.return_value.__enter__.return_value
+        response.iter_lines.return_value = [
+            b'{"response": "Hi"}',
+            b'{"response": "", "done": true, "load_duration": 2000000000, '
+            b'"prompt_eval_duration": 500000000, "eval_duration": 1500000000, "eval_count": 12}'
+        ]
+        
+        list(self.client.generate_stream("Hi"))
+        
+        self.assertEqual(self.session.post.call_args.kwargs['json']['keep_alive'], "30m")
+        stats = self.client.last_stats
+        self.assertEqual(stats['load_time'], 2.0)
+        self.assertEqual(stats['prompt_eval_time'], 0.5)
+        self.assertEqual(stats['generation_time'], 1.5)
+        self.assertEqual(stats['generated_tokens'], 12)
+        self.assertIn('time_to_first_token', stats)
+        
+    def test_warm_up(self):
+        """Test that warm-up loads the model without a prompt."""
+        self.session.post.return_value.json.return_value = {'done': True, 'load_duration': 3000000000}
+        
+        self.client.start_warm_up().join()
+        
+        payload = self.session.post.call_args.kwargs['json']
+        self.assertEqual(payload, {'model': 'test-model', 'keep_alive': '30m'})
+        
+    def test_warm_up_failure(self):
+        """Test that an unreachable server does not raise during warm-up."""
+        self.session.post.side_effect = requests.exceptions.ConnectionError("refused")
+        
+        self.assertIsNone(self.client.warm_up())
+        
+    def test_from_config(self):
+        """Test that the client follows the configuration."""
+        os.environ["OLLAMA_BASE_URL"] = "http://custom:8080"
+        os.environ["MODEL_NAME"] = "custom-model"
+        os.environ["TEMPERATURE"] = "0.1"
+        try:
+            client = OllamaClient.from_config(Config(), session=self.session)
+        finally:
+            del os.environ["OLLAMA_BASE_URL"]
+            del os.environ["MODEL_NAME"]
+            del os.environ["TEMPERATURE"]
+            
+        self.assertEqual(client.base_url, "http://custom:8080")
+        self.assertEqual(client.model, "custom-model")
+        self.assertEqual(client.temperature, 0.1)
+        self.assertIs(client.session, self.session)
+
+if __name__ == '__main__':
+    unittest.main()
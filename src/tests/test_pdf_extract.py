@@ -0,0 +1,37 @@
+"""Tests for page-parallel PDF text extraction."""
+import os
+import unittest
+
+import PyPDF2
+
+from src.utils.pdf_extract import iter_pdf_pages
+
+# Bundled sample textbook at the repository root
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "..", "kimura.pdf")
+
+
+@unittest.skipUnless(os.path.exists(SAMPLE_PDF), "sample PDF not available")
+class TestPdfExtract(unittest.TestCase):
+    """Test cases for PDF page extraction."""
+    
+    def test_parallel_extraction_keeps_page_order(self):
+        """Test that pages extracted by several processes come back in order."""
+        serial = list(iter_pdf_pages(SAMPLE_PDF, workers=1))
+        parallel = list(iter_pdf_pages(SAMPLE_PDF, workers=2, pages_per_task=2))
+        
+        self.assertEqual(len(serial), len(PyPDF2.PdfReader(SAMPLE_PDF).pages))
+        self.assertEqual(parallel, serial)
+        
+    def test_progress_callback_reports_every_page(self):
+        """Test that the page count is reported first, then progress once per page."""
+        progress = []
+        list(iter_pdf_pages(SAMPLE_PDF, workers=2, pages_per_task=3,
+                            progress_callback=lambda done, total: progress.append((done, total))))
+        
+        total = progress[0][1]
+        self.assertEqual(total, len(PyPDF2.PdfReader(SAMPLE_PDF).pages))
+        self.assertEqual(progress, [(done, total) for done in range(0, total + 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Tests for the token-budget-aware prompt builder."""
+import unittest
+
+from src.core.prompt_builder import PromptBuilder
+
+
+class WordEncoding:
+    """Deterministic stand-in for a tiktoken encoding: one token per word."""
+    
+    def encode(self, text):
+        return text.split()
+        
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+def _article(pmid, title, abstract_words):
+    """Build an article whose abstract has the given number of words."""
+    return {
+        'id': pmid,
+        'title': title,
+        'abstract': " ".join(f"w{i}" for i in range(abstract_words)),
+        'authors': ['Jane Doe'],
+        'journal': 'Journal',
+        'year': '2024',
+        'url': f'https://pubmed.ncbi.nlm.nih.gov/{pmid}/'
+    }
+
+
+class TestPromptBuilder(unittest.TestCase):
+    """Test cases for PromptBuilder class."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.builder = PromptBuilder(context_tokens=1000, num_predict=100, encoding=WordEncoding())
+        
+    def test_literature_budget_reserves_answers_and_followups(self):
+        """Test that the budget leaves room for every answer and follow-up turn."""
+        budget = self.builder.literature_budget(template="one two three", followup="four five", iterations=3)
+        self.assertEqual(budget, 1000 - 3 - 2 * 2 - 3 * 100)
+        
+    def test_literature_budget_refuses_a_context_without_room_for_papers(self):
+        """Test that too many iterations for the context raise instead of dropping every article."""
+        with self.assertRaisesRegex(ValueError, "fewer iterations"):
+            self.builder.literature_budget(template="one two three", followup="four five", iterations=8)
+        
+    def test_fit_refuses_to_drop_every_article(self):
+        """Test that a budget too small for a single citation raises."""
+        with self.assertRaises(ValueError):
+            self.builder.fit_articles([_article('1', 'Alpha', 10)], budget=5)
+        self.assertEqual(self.builder.fit_articles([], budget=5), [])
+        
+    def test_fit_keeps_everything_within_budget(self):
+        """Test that articles that fit are returned unchanged."""
+        articles = [_article('1', 'Alpha', 10), _article('2', 'Beta', 10)]
+        self.assertEqual(self.builder.fit_articles(articles, budget=500), articles)
+        
+    def test_fit_truncates_long_abstracts_fairly(self):
+        """Test that long abstracts are truncated to a shared budget and short ones kept."""
+        articles = [_article('1', 'Alpha', 200), _article('2', 'Beta', 5), _article('3', 'Gamma', 200)]
+        header = self.builder._header_tokens(articles[0])
+        
+        fitted = self.builder.fit_articles(articles, budget=3 * header + 105)
+        
+        self.assertEqual(fitted[1]['abstract'], articles[1]['abstract'])
+        for article in (fitted[0], fitted[2]):
+            self.assertTrue(article['abstract'].endswith("[...]"))
+            self.assertLessEqual(self.builder.count_tokens(article['abstract']), 50)
+        self.assertEqual(articles[0]['abstract'].count("w"), 200)  # Inputs are not modified
+        
+    def test_fit_drops_least_relevant_articles(self):
+        """Test that articles least related to the query are dropped first."""
+        articles = [_article('1', 'Protein folding', 0), _article('2', 'Neutral theory of evolution', 0)]
+        header = max(self.builder._header_tokens(article) for article in articles)
+        
+        fitted = self.builder.fit_articles(articles, budget=header, query="molecular evolution theory")
+        
+        self.assertEqual([article['id'] for article in fitted], ['2'])
+        
+    def test_fallback_estimate_without_encoding(self):
+        """Test token estimation and truncation without tiktoken."""
+        builder = PromptBuilder(encoding=WordEncoding())
+        builder.encoding = None
+        
+        self.assertEqual(builder.count_tokens("abcdefgh"), 2)
+        self.assertLessEqual(builder.count_tokens(builder.truncate("x" * 400, 10)), 10)
+
+if __name__ == '__main__':
+    unittest.main()
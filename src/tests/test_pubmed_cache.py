@@ -0,0 +1,66 @@
+"""Tests for the on-disk PubMed cache."""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.utils.pubmed_cache import PubMedCache
+
+
+def _article(pmid):
+    """Build a minimal article record."""
+    return {'id': pmid, 'title': f'Article {pmid}', 'authors': []}
+
+
+class TestPubMedCache(unittest.TestCase):
+    """Test cases for PubMedCache class."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = PubMedCache(os.path.join(self.tmp_dir.name, "cache.sqlite3"), ttl=60, max_entries=3)
+        
+    def tearDown(self):
+        """Clean up test environment."""
+        self.cache.close()
+        self.tmp_dir.cleanup()
+        
+    def test_search_roundtrip_normalizes_query(self):
+        """Test that search keys ignore case and extra whitespace."""
+        self.cache.put_search("Single  Cell RNA", {"retmax": 5}, ["1", "2"])
+        
+        self.assertEqual(self.cache.get_search("single cell rna", {"retmax": 5}), ["1", "2"])
+        self.assertIsNone(self.cache.get_search("single cell rna", {"retmax": 10}))
+        
+    def test_articles_roundtrip(self):
+        """Test storing and retrieving article records by PMID."""
+        self.cache.put_articles([_article("1"), _article("2")])
+        
+        found = self.cache.get_articles(["1", "2", "3"])
+        
+        self.assertEqual(set(found), {"1", "2"})
+        self.assertEqual(found["1"]["title"], "Article 1")
+        
+    def test_expired_entries_are_ignored(self):
+        """Test that entries older than the TTL are treated as missing."""
+        with patch('src.utils.pubmed_cache.time.time', return_value=1000.0):
+            self.cache.put_search("query", {}, ["1"])
+            self.cache.put_articles([_article("1")])
+            
+        with patch('src.utils.pubmed_cache.time.time', return_value=1061.0):
+            self.assertIsNone(self.cache.get_search("query", {}))
+            self.assertEqual(self.cache.get_articles(["1"]), {})
+            
+    def test_lru_eviction(self):
+        """Test that the least recently used articles are evicted over the size cap."""
+        for now, pmid in enumerate(["1", "2", "3"]):
+            with patch('src.utils.pubmed_cache.time.time', return_value=1000.0 + now):
+                self.cache.put_articles([_article(pmid)])
+        with patch('src.utils.pubmed_cache.time.time', return_value=1010.0):
+            self.cache.get_articles(["1"])
+        with patch('src.utils.pubmed_cache.time.time', return_value=1020.0):
+            self.cache.put_articles([_article("4")])
+            self.assertEqual(set(self.cache.get_articles(["1", "2", "3", "4"])), {"1", "3", "4"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""Tests for the local PubMed mirror."""
+import gzip
+import os
+import tempfile
+import threading
+import unittest
+
+from src.utils.pubmed_mirror import LocalPubMedSearcher, PubMedMirror
+
+
+def _article_xml(pmid, title, abstract):
+    """Build a single PubmedArticle element."""
+    return f"""
+    <PubmedArticle>
+        <MedlineCitation Status="MEDLINE" Owner="NLM">
+            <PMID Version="1">{pmid}</PMID>
+            <Article>
+                <Journal>
+                    <JournalIssue><PubDate><Year>2020</Year></PubDate></JournalIssue>
+                    <Title>Test Journal</Title>
+                </Journal>
+                <ArticleTitle>{title}</ArticleTitle>
+                <Abstract><AbstractText>{abstract}</AbstractText></Abstract>
+                <AuthorList CompleteYN="Y">
+                    <Author ValidYN="Y"><LastName>Doe</LastName><ForeName>Jane</ForeName></Author>
+                </AuthorList>
+            </Article>
+        </MedlineCitation>
+    </PubmedArticle>"""
+
+
+class TestPubMedMirror(unittest.TestCase):
+    """Test cases for PubMedMirror class."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.mirror = PubMedMirror(os.path.join(self.tmp_dir.name, "mirror.sqlite3"))
+        self._write("pubmed24n0001.xml.gz",
+                    _article_xml(1, "Single cell RNA sequencing", "Transcriptomes of single cells.")
+                    + _article_xml(2, "Protein folding", "Single molecule studies of folding.")
+                    + _article_xml(3, "Neutral theory", "Molecular evolution and drift."))
+        
+    def tearDown(self):
+        """Clean up test environment."""
+        self.mirror.close()
+        self.tmp_dir.cleanup()
+        
+    def _write(self, name, body):
+        """Write a gzipped PubmedArticleSet file."""
+        path = os.path.join(self.tmp_dir.name, name)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(f'<?xml version="1.0"?><PubmedArticleSet>{body}</PubmedArticleSet>')
+        return path
+        
+    def test_ingest_and_search(self):
+        """Test that ingested articles are searchable with the article schema."""
+        self.mirror.ingest([self.tmp_dir.name])
+        
+        results = self.mirror.search("single-cell")
+        
+        self.assertEqual(self.mirror.count(), 3)
+        self.assertEqual(results[0]['id'], '1')  # Title match ranks first
+        self.assertEqual(results[0]['authors'], ['Jane Doe'])
+        self.assertEqual(results[0]['url'], 'https://pubmed.ncbi.nlm.nih.gov/1/')
+        self.assertEqual(self.mirror.search("drift"), self.mirror.search("Drift"))
+        self.assertEqual(self.mirror.search("!!"), [])
+        
+    def test_incremental_update(self):
+        """Test that update files revise, delete and are only applied once."""
+        self.mirror.ingest([self.tmp_dir.name])
+        update = self._write("pubmed24n0002.xml.gz",
+                             _article_xml(2, "Protein misfolding", "Aggregation diseases.")
+                             + "<DeleteCitation><PMID Version=\"1\">3</PMID></DeleteCitation>")
+        
+        self.assertEqual(self.mirror.ingest_file(update), (1, 1))
+        self.assertIsNone(self.mirror.ingest_file(update))
+        
+        self.assertEqual(self.mirror.count(), 2)
+        self.assertEqual([article['id'] for article in self.mirror.search("misfolding")], ['2'])
+        self.assertEqual(self.mirror.search("folding studies"), [])
+        self.assertEqual(self.mirror.search("drift"), [])
+        
+    def test_local_searcher(self):
+        """Test the PubMedSearcher-compatible local backend."""
+        self.mirror.ingest([self.tmp_dir.name])
+        searcher = LocalPubMedSearcher(self.mirror, max_results=1)
+        
+        results = searcher.search("single")
+        
+        self.assertEqual(len(results), 1)
+        self.assertIn('Title: Single cell RNA sequencing', searcher.format_results(results))
+        
+    def test_searches_run_alongside_ingestion(self):
+        """Test that threads can search the shared connection while a file is ingested."""
+        self.mirror.ingest([self.tmp_dir.name])
+        update = self._write("pubmed24n0002.xml.gz", "".join(
+            _article_xml(n, f"Folding study {n}", "Chaperone assisted folding.") for n in range(10, 3010)
+        ))
+        errors = []
+        
+        def search():
+            try:
+                for _ in range(50):
+                    self.assertEqual(self.mirror.search("single cell")[0]['id'], '1')
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=search) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        self.mirror.ingest_file(update)
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(errors, [])
+        self.assertEqual(self.mirror.count(), 3003)
+
+if __name__ == '__main__':
+    unittest.main()
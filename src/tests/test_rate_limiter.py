@@ -0,0 +1,99 @@
+"""Tests for the token-bucket rate limiter."""
+import asyncio
+import threading
+import time
+import unittest
+
+from src.utils.rate_limiter import TokenBucket, get_rate_limiter
+
+
+class FakeClock:
+    """Manually advanced clock for deterministic tests."""
+    
+    def __init__(self):
+        self.now = 0.0
+        
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for TokenBucket class."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.clock = FakeClock()
+        self.bucket = TokenBucket(rate=10.0, clock=self.clock)
+        
+    def test_reservations_are_spaced_by_rate(self):
+        """Test that back-to-back reservations queue at the configured rate."""
+        delays = [self.bucket.reserve() for _ in range(3)]
+        self.assertEqual(delays[0], 0)
+        self.assertAlmostEqual(delays[1], 0.1)
+        self.assertAlmostEqual(delays[2], 0.2)
+        
+    def test_tokens_refill_over_time(self):
+        """Test that idle time refills the bucket up to its capacity."""
+        self.bucket.reserve()
+        self.clock.now = 5.0
+        self.assertEqual(self.bucket.reserve(), 0)
+        self.assertAlmostEqual(self.bucket.reserve(), 0.1)
+        
+    def test_pause_holds_back_callers(self):
+        """Test that a Retry-After pause delays the next reservations."""
+        self.bucket.pause(2.0)
+        self.assertAlmostEqual(self.bucket.reserve(), 2.0)
+        self.assertAlmostEqual(self.bucket.reserve(), 2.1)
+        
+    def test_pause_holds_back_waiting_callers(self):
+        """Test that callers already sleeping in acquire wait for a later pause."""
+        bucket = TokenBucket(rate=10.0)
+        bucket.acquire()
+        waiter = threading.Thread(target=bucket.acquire)
+        
+        start = time.monotonic()
+        waiter.start()
+        time.sleep(0.02)
+        bucket.pause(0.3)
+        waiter.join()
+        
+        self.assertGreaterEqual(time.monotonic() - start, 0.3)
+        
+    def test_invalid_rate(self):
+        """Test that a non-positive rate is rejected."""
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+            
+    def test_concurrent_acquire(self):
+        """Test that concurrent callers together stay within the rate."""
+        bucket = TokenBucket(rate=50.0)
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(10)]
+        
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+            
+        self.assertGreaterEqual(time.monotonic() - start, 9 / 50.0 - 0.01)
+        
+    def test_acquire_async(self):
+        """Test that async callers are spaced by the rate as well."""
+        bucket = TokenBucket(rate=50.0)
+        
+        async def acquire_all():
+            await asyncio.gather(*(bucket.acquire_async() for _ in range(5)))
+            
+        start = time.monotonic()
+        asyncio.run(acquire_all())
+        self.assertGreaterEqual(time.monotonic() - start, 4 / 50.0 - 0.01)
+        
+    def test_registry_is_process_wide(self):
+        """Test that the same name returns the same bucket."""
+        first = get_rate_limiter("test:registry", 5.0)
+        second = get_rate_limiter("test:registry", 10.0)
+        self.assertIs(first, second)
+        self.assertEqual(second.rate, 5.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,10 @@
 """Tests for the Research Assistant module."""
+import logging
+
 import pytest
 from unittest.mock import Mock, patch
 
-from src.core.research_assistant import ResearchAssistant
+from src.core.research_assistant import ResearchAssistant, ResearchDisplay
 
 
 @pytest.fixture
@@ -15,9 +17,9 @@ def mock_pubmed_searcher():
 
 
 @pytest.fixture
-def research_assistant(mock_pubmed_searcher):
+def research_assistant(mock_pubmed_searcher, tmp_path):
     """Create a research assistant instance with mocked dependencies."""
-    return ResearchAssistant()
+    return ResearchAssistant(data_dir=str(tmp_path))
 
 
 def test_research_topic_success(research_assistant, mock_pubmed_searcher):
@@ -35,10 +37,12 @@ def test_research_topic_success(research_assistant, mock_pubmed_searcher):
     ]
     mock_pubmed_searcher.format_results.return_value = "Formatted results"
     
-    # Mock LLM response
-    with patch('requests.post') as mock_post:
-        mock_post.return_value.json.return_value = {'response': 'Test response'}
-        mock_post.return_value.raise_for_status = lambda: None
+    # Mock streamed LLM response
+    with patch('requests.Session.post') as mock_post:
+        response = mock_post.return_value.__enter__.return_value
+        response.iter_lines.return_value = [b'{"message": {"content": "Test "}}',
+                                            b'{"message": {"content": "response"}, "done": true}']
+        response.raise_for_status = lambda: None
         
         result = research_assistant.research_topic("test topic")
         
@@ -65,7 +69,7 @@ def test_research_topic_llm_error(research_assistant, mock_pubmed_searcher):
     mock_pubmed_searcher.search.return_value = [{'title': 'Test'}]
     mock_pubmed_searcher.format_results.return_value = "Formatted results"
     
-    with patch('requests.post') as mock_post:
+    with patch('requests.Session.post') as mock_post:
         mock_post.side_effect = Exception("LLM error")
         
         result = research_assistant.research_topic("test topic")
@@ -87,3 +91,392 @@ def test_format_findings(research_assistant):
     assert "Finding 2" in result
     assert "Analysis 3:" in result
     assert "Finding 3" in result
+
+
+def test_research_topic_saves_streamed_text(research_assistant, mock_pubmed_searcher, tmp_path):
+    """Test that saved findings are exactly the streamed text from a single generation."""
+    mock_pubmed_searcher.search.return_value = []
+    mock_pubmed_searcher.format_results.return_value = "No articles found."
+    
+    with patch('requests.Session.post') as mock_post:
+        response = mock_post.return_value.__enter__.return_value
+        response.iter_lines.return_value = [b'{"message": {"content": "Streamed "}}', b'',
+                                            b'{"message": {"content": "text"}}']
+        response.raise_for_status = lambda: None
+        
+        research_assistant.research_topic("test topic", max_iterations=1)
+        
+    assert mock_post.call_count == 1
+    assert mock_post.call_args.kwargs['stream'] is True
+    assert (tmp_path / "test topic" / "findings_0.txt").read_text() == "Streamed text"
+
+
+def test_followups_extend_the_conversation(research_assistant, mock_pubmed_searcher, tmp_path):
+    """Test that follow-ups reuse the conversation instead of resending the literature."""
+    mock_pubmed_searcher.search.return_value = []
+    mock_pubmed_searcher.format_results.return_value = "LITERATURE BLOCK"
+    
+    conversations = []
+    
+    def fake_chat(messages):
+        conversations.append(list(messages))
+        return iter([f"Answer {len(messages)}"])
+    
+    with patch.object(research_assistant.llm_client, 'chat_stream', side_effect=fake_chat):
+        research_assistant.research_topic("test topic", max_iterations=3)
+        
+    final = conversations[-1]
+    assert [message['role'] for message in final] == ['user', 'assistant', 'user', 'assistant', 'user']
+    assert "LITERATURE BLOCK" in final[0]['content']
+    assert all("LITERATURE BLOCK" not in message['content'] for message in final[1:])
+    assert final[1]['content'] == "Answer 1"
+    assert final[3]['content'] == "Answer 3"
+
+
+def test_research_topics_runs_concurrently(research_assistant, mock_pubmed_searcher, tmp_path):
+    """Test that batch research shares resources and overlaps topics across workers."""
+    import threading
+    
+    mock_pubmed_searcher.search.return_value = []
+    mock_pubmed_searcher.format_results.return_value = "No articles found."
+    
+    # Every generation waits until two topics are in flight at the same time
+    barrier = threading.Barrier(2, timeout=5)
+    
+    def fake_chat(messages):
+        barrier.wait()
+        return iter(["Findings"])
+    
+    completed = []
+    with patch.object(research_assistant.llm_client, 'chat_stream', side_effect=fake_chat):
+        results = research_assistant.research_topics(
+            ["topic b", "topic a", "topic b"], max_workers=2, max_iterations=1,
+            on_complete=lambda topic, findings: completed.append(topic)
+        )
+        
+    assert list(results) == ["topic b", "topic a"]
+    assert all("Findings" in findings for findings in results.values())
+    assert sorted(completed) == ["topic a", "topic b"]
+    assert (tmp_path / "topic a" / "final_findings.txt").exists()
+    assert (tmp_path / "topic b" / "final_findings.txt").exists()
+
+
+def test_headless_mode_skips_rendering(mock_pubmed_searcher, tmp_path):
+    """Test that headless research reports progress through the callback only."""
+    events = []
+    assistant = ResearchAssistant(data_dir=str(tmp_path), headless=True,
+                                  progress_callback=lambda *event: events.append(event))
+    mock_pubmed_searcher.search.return_value = []
+    mock_pubmed_searcher.format_results.return_value = "No articles found."
+    
+    with patch('src.core.research_assistant.Live') as mock_live, \
+         patch.object(assistant.display, 'render') as mock_render, \
+         patch.object(assistant.llm_client, 'chat_stream', return_value=iter(["Findings"])):
+        assistant.research_topic("test topic", max_iterations=1)
+        
+    mock_live.assert_not_called()
+    mock_render.assert_not_called()
+    assert events[0][:2] == ("test topic", "START")
+    assert ("test topic", "ANALYSIS", "Findings") in events
+    assert events[-1][:2] == ("test topic", "COMPLETE")
+
+
+def test_log_progress_logs_status_updates_only(mock_pubmed_searcher, tmp_path, caplog):
+    """Test that headless logging reports every stage but not the streamed text."""
+    assistant = ResearchAssistant(data_dir=str(tmp_path), headless=True, log_progress=True)
+    mock_pubmed_searcher.search.return_value = []
+    mock_pubmed_searcher.format_results.return_value = "No articles found."
+    
+    with caplog.at_level(logging.INFO, logger='src.core.research_assistant'), \
+         patch.object(assistant.llm_client, 'chat_stream', return_value=iter(["Streamed ", "findings"])):
+        assistant.research_topic("test topic", max_iterations=1)
+        
+    messages = [record.getMessage() for record in caplog.records]
+    for stage in ("PUBMED", "FORMAT", "ANALYSIS", "COMPLETE"):
+        assert any(message.startswith(f"[test topic] {stage}: ") for message in messages), stage
+    assert not any("Streamed" in message for message in messages)
+
+
+def test_live_mode_renders_updates(mock_pubmed_searcher, tmp_path):
+    """Test that the interactive mode drives the live display."""
+    assistant = ResearchAssistant(data_dir=str(tmp_path), headless=False)
+    mock_pubmed_searcher.search.return_value = []
+    mock_pubmed_searcher.format_results.return_value = "No articles found."
+    
+    with patch('src.core.research_assistant.Live') as mock_live, \
+         patch.object(assistant.display, 'render') as mock_render, \
+         patch.object(assistant.llm_client, 'chat_stream', return_value=iter(["Findings"])):
+        assistant.research_topic("test topic", max_iterations=1)
+        
+    mock_live.assert_called_once()
+    assert mock_render.called
+
+
+def test_shared_llm_client_is_not_modified(mock_pubmed_searcher, tmp_path):
+    """Test that model overrides are refused for an injected client and applied to a created one."""
+    from src.core.ollama_client import OllamaClient
+    
+    shared = OllamaClient(base_url="http://shared:11434", model="shared-model")
+    with pytest.raises(ValueError):
+        ResearchAssistant(data_dir=str(tmp_path), llm_client=shared, model="other-model")
+    assert shared.model == "shared-model"
+    
+    assistant = ResearchAssistant(data_dir=str(tmp_path), base_url="http://other:11434/", model="other-model")
+    assert assistant.llm_client.base_url == "http://other:11434"
+    assert assistant.llm_client.model == "other-model"
+
+
+def test_headless_defaults_to_terminal_detection(mock_pubmed_searcher, tmp_path):
+    """Test that headless mode is chosen automatically when stdout is not a terminal."""
+    with patch('sys.stdout') as stdout:
+        stdout.isatty.return_value = False
+        assert ResearchAssistant(data_dir=str(tmp_path)).headless is True
+        stdout.isatty.return_value = True
+        assert ResearchAssistant(data_dir=str(tmp_path)).headless is False
+
+
+def test_display_merges_streamed_chunks_into_one_line():
+    """Test that token chunks extend the current stream line instead of adding entries."""
+    display = ResearchDisplay()
+    display.update_display("ANALYSIS", "Starting initial analysis...")
+    for chunk in ["The ", "answer ", "streams."]:
+        display.update_display("ANALYSIS", chunk, append=True)
+    display.update_display("ITERATION", "Starting iteration 1/2")
+    display.update_display("ANALYSIS", "Next ", append=True)
+    
+    assert display.stream_content == [
+        ("ANALYSIS", "Starting initial analysis..."),
+        ("ANALYSIS", "The answer streams."),
+        ("ITERATION", "Starting iteration 1/2"),
+        ("ANALYSIS", "Next "),
+    ]
+
+
+def test_display_renders_at_most_at_refresh_rate():
+    """Test that rendering is skipped when clean or within the refresh interval."""
+    now = [0.0]
+    display = ResearchDisplay(refresh_per_second=4, clock=lambda: now[0])
+    display.create_layout()
+    
+    with patch.object(display, 'generate_stream_panel', wraps=display.generate_stream_panel) as build:
+        display.render()
+        assert build.call_count == 0  # nothing changed yet
+        
+        for i in range(100):
+            display.update_display("ANALYSIS", "x", append=True)
+            display.render()
+        assert build.call_count == 1  # later chunks fall inside the first interval
+        
+        now[0] = 0.3
+        display.render()
+        assert build.call_count == 2
+        
+        display.update_display("ITERATION", "Starting iteration 1/2")
+        display.render(force=True)
+        assert build.call_count == 3
+
+
+def test_stream_log_is_written_as_json_lines(research_assistant, mock_pubmed_searcher, tmp_path):
+    """Test that the stream log holds one record per status message and streamed answer."""
+    from src.utils.stream_log import read_stream_log
+    
+    mock_pubmed_searcher.search.return_value = []
+    mock_pubmed_searcher.format_results.return_value = "No articles found."
+    
+    with patch.object(research_assistant.llm_client, 'chat_stream', return_value=iter(["Streamed ", "text"])):
+        research_assistant.research_topic("test topic", max_iterations=1)
+        
+    records = read_stream_log(str(tmp_path / "test topic" / "research_stream.jsonl"))
+    assert records[0]["stage"] == "START"
+    assert {"stage": "ANALYSIS", "content": "Streamed text"} in [
+        {"stage": record["stage"], "content": record["content"]} for record in records
+    ]
+    assert records[-1]["stage"] == "COMPLETE"
+
+
+def test_runs_are_recorded_in_the_store(research_assistant, mock_pubmed_searcher, tmp_path):
+    """Test that completed and failed runs are recorded in the research store."""
+    mock_pubmed_searcher.search.return_value = [{'id': '123', 'title': 'Paper', 'abstract': 'Text'}]
+    mock_pubmed_searcher.format_results.return_value = "Formatted results"
+    
+    with patch.object(research_assistant.llm_client, 'chat_stream', return_value=iter(["Findings"])):
+        research_assistant.research_topic("test topic", max_iterations=1)
+    mock_pubmed_searcher.search.side_effect = Exception("PubMed error")
+    research_assistant.research_topic("failing topic", max_iterations=1)
+    
+    assert research_assistant.store.topics_citing("123") == ["test topic"]
+    assert research_assistant.store.latest_run("test topic")["status"] == "complete"
+    assert research_assistant.store.latest_run("failing topic")["status"] == "failed"
+
+
+def test_resume_continues_from_the_last_checkpoint(research_assistant, mock_pubmed_searcher, tmp_path):
+    """Test that a run interrupted in iteration 2 resumes without searching or regenerating."""
+    import requests
+    
+    from src.utils.stream_log import read_stream_log
+    
+    mock_pubmed_searcher.search.return_value = [{'id': '1', 'title': 'Paper', 'abstract': 'Text'}]
+    mock_pubmed_searcher.format_results.return_value = "LITERATURE BLOCK"
+    
+    def dying_chat(messages):
+        if len(messages) > 1:
+            raise requests.exceptions.ConnectionError("Ollama died")
+        return iter(["Answer 1"])
+    
+    with patch.object(research_assistant.llm_client, 'chat_stream', side_effect=dying_chat):
+        result = research_assistant.research_topic("test topic", max_iterations=3)
+    assert "Error during research" in result
+    topic_dir = tmp_path / "test topic"
+    assert (topic_dir / "checkpoint" / "findings_0.txt").read_text() == "Answer 1"
+    assert not (topic_dir / "checkpoint" / "findings_1.txt").exists()
+    records = read_stream_log(str(topic_dir / "research_stream.jsonl"))
+    assert not any("Ollama died" in record["content"] for record in records if record["stage"] == "ANALYSIS")
+    assert records[-1]["stage"] == "ERROR" and "Ollama died" in records[-1]["content"]
+    
+    conversations = []
+    
+    def fake_chat(messages):
+        conversations.append(list(messages))
+        return iter([f"Answer {len(messages) // 2 + 1}"])
+    
+    mock_pubmed_searcher.search.reset_mock()
+    with patch.object(research_assistant.llm_client, 'chat_stream', side_effect=fake_chat):
+        result = research_assistant.research_topic("test topic", max_iterations=3, resume=True)
+        
+    mock_pubmed_searcher.search.assert_not_called()
+    assert len(conversations) == 2
+    assert [message['role'] for message in conversations[0]] == ['user', 'assistant', 'user']
+    assert "LITERATURE BLOCK" in conversations[0][0]['content']
+    assert conversations[0][1]['content'] == "Answer 1"
+    assert "Answer 1" in result and "Answer 2" in result and "Answer 3" in result
+    assert not (topic_dir / "checkpoint").exists()
+    assert (topic_dir / "findings_2.txt").read_text() == "Answer 3"
+    
+    # A completed topic is returned from its checkpoint without any work
+    with patch.object(research_assistant.llm_client, 'chat_stream') as chat:
+        assert research_assistant.research_topic("test topic", max_iterations=3, resume=True) == result
+    chat.assert_not_called()
+
+
+def test_fresh_run_discards_checkpoints(research_assistant, mock_pubmed_searcher, tmp_path):
+    """Test that a run without resume starts over and replaces stale results once it completes."""
+    topic_dir = tmp_path / "test topic"
+    (topic_dir / "checkpoint").mkdir(parents=True)
+    (topic_dir / "checkpoint" / "pubmed_results.json").write_text("[]")
+    (topic_dir / "findings_5.txt").write_text("stale")
+    (topic_dir / "update_20240301_120000.txt").write_text("stale update")
+    (topic_dir / "final_findings.txt.tmp").write_text("partial")
+    mock_pubmed_searcher.search.return_value = []
+    mock_pubmed_searcher.format_results.return_value = "No articles found."
+    
+    with patch.object(research_assistant.llm_client, 'chat_stream', return_value=iter(["Fresh"])):
+        research_assistant.research_topic("test topic", max_iterations=1)
+        
+    assert not (topic_dir / "findings_5.txt").exists()
+    assert not (topic_dir / "update_20240301_120000.txt").exists()
+    assert not (topic_dir / "final_findings.txt.tmp").exists()
+    assert not (topic_dir / "checkpoint").exists()
+    assert (topic_dir / "findings_0.txt").read_text() == "Fresh"
+    mock_pubmed_searcher.search.assert_called_once()
+
+
+def test_failed_rerun_keeps_the_previous_results(research_assistant, mock_pubmed_searcher, tmp_path):
+    """Test that the last completed results survive a rerun that fails."""
+    import requests
+    
+    topic_dir = tmp_path / "test topic"
+    _write_previous_run(topic_dir, [{'id': '1', 'title': 'Old'}])
+    (topic_dir / "findings_0.txt").write_text("Previous answer")
+    mock_pubmed_searcher.search.return_value = [{'id': '2', 'title': 'New'}]
+    mock_pubmed_searcher.format_results.return_value = "NEW LITERATURE"
+    
+    with patch.object(research_assistant.llm_client, 'chat_stream',
+                      side_effect=requests.exceptions.ConnectionError("Ollama down")):
+        result = research_assistant.research_topic("test topic", max_iterations=1)
+        
+    assert "Error during research" in result
+    assert (topic_dir / "final_findings.txt").read_text() == "Previous findings"
+    assert (topic_dir / "findings_0.txt").read_text() == "Previous answer"
+    assert "Old" in (topic_dir / "pubmed_results.json").read_text()
+    assert "New" in (topic_dir / "checkpoint" / "pubmed_results.json").read_text()
+    
+    # Resuming continues the failed rerun instead of returning the old results
+    with patch.object(research_assistant.llm_client, 'chat_stream', return_value=iter(["New answer"])):
+        result = research_assistant.research_topic("test topic", max_iterations=1, resume=True)
+    mock_pubmed_searcher.search.assert_called_once()
+    assert "New answer" in result
+    assert (topic_dir / "findings_0.txt").read_text() == "New answer"
+
+
+def _write_previous_run(topic_dir, papers, final="Previous findings", timestamp="2024-03-01 12:00:00.000001"):
+    """Write the files of a completed research run."""
+    import json
+    
+    topic_dir.mkdir()
+    (topic_dir / "metadata.json").write_text(json.dumps({
+        "topic": "test topic", "timestamp": timestamp, "model": "llama",
+        "iterations": 3, "num_papers": len(papers)
+    }))
+    (topic_dir / "pubmed_results.json").write_text(json.dumps(papers))
+    (topic_dir / "final_findings.txt").write_text(final)
+
+
+def test_refresh_without_new_papers_skips_the_llm(research_assistant, mock_pubmed_searcher, tmp_path):
+    """Test that a refresh only searches since the last run and skips analysis when nothing is new."""
+    import json
+    
+    topic_dir = tmp_path / "test topic"
+    _write_previous_run(topic_dir, [{'id': '1', 'title': 'Old'}])
+    mock_pubmed_searcher.search.return_value = [{'id': '1', 'title': 'Old'}]
+    
+    with patch.object(research_assistant.llm_client, 'chat_stream') as chat:
+        result = research_assistant.research_topic("test topic", refresh=True)
+        
+    chat.assert_not_called()
+    assert result == "Previous findings"
+    assert mock_pubmed_searcher.search.call_args.kwargs['mindate'] == "2024/03/01"
+    metadata = json.loads((topic_dir / "metadata.json").read_text())
+    assert metadata["timestamp"] != "2024-03-01 12:00:00.000001"
+    assert metadata["refreshes"][0]["new_papers"] == 0
+
+
+def test_refresh_merges_a_delta_analysis(research_assistant, mock_pubmed_searcher, tmp_path):
+    """Test that new papers are analyzed once against the previous findings and merged."""
+    import json
+    
+    topic_dir = tmp_path / "test topic"
+    _write_previous_run(topic_dir, [{'id': '1', 'title': 'Old'}])
+    mock_pubmed_searcher.search.return_value = [{'id': '1', 'title': 'Old'}, {'id': '2', 'title': 'New'}]
+    mock_pubmed_searcher.format_results.return_value = "NEW LITERATURE"
+    
+    prompts = []
+    
+    def fake_chat(messages):
+        prompts.append(messages[-1]['content'])
+        return iter(["Delta analysis"])
+    
+    with patch.object(research_assistant.llm_client, 'chat_stream', side_effect=fake_chat):
+        result = research_assistant.research_topic("test topic", refresh=True)
+        
+    assert len(prompts) == 1
+    assert "Previous findings" in prompts[0] and "NEW LITERATURE" in prompts[0]
+    assert mock_pubmed_searcher.format_results.call_args.args[0] == [{'id': '2', 'title': 'New'}]
+    assert result.startswith("Previous findings") and "Delta analysis" in result
+    assert (topic_dir / "final_findings.txt").read_text() == result
+    assert [paper['id'] for paper in json.loads((topic_dir / "pubmed_results.json").read_text())] == ['1', '2']
+    assert json.loads((topic_dir / "metadata.json").read_text())["num_papers"] == 2
+    assert research_assistant.store.topics_citing("2") == ["test topic"]
+    assert research_assistant.store.topics_citing("1") == ["test topic"]
+    assert research_assistant.store.latest_run("test topic")["num_papers"] == 2
+
+
+def test_refresh_without_previous_run_researches_from_scratch(research_assistant, mock_pubmed_searcher, tmp_path):
+    """Test that refreshing an unknown topic falls back to a full run."""
+    mock_pubmed_searcher.search.return_value = []
+    mock_pubmed_searcher.format_results.return_value = "No articles found."
+    
+    with patch.object(research_assistant.llm_client, 'chat_stream', return_value=iter(["Findings"])):
+        result = research_assistant.research_topic("test topic", max_iterations=1, refresh=True)
+        
+    assert "Research Findings" in result
+    assert mock_pubmed_searcher.search.call_args.kwargs == {}
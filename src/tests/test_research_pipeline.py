@@ -0,0 +1,118 @@
+"""Tests for the staged research pipeline."""
+import threading
+import unittest
+
+from src.core.research_pipeline import Stage, StagedPipeline, format_report
+
+
+class TestStagedPipeline(unittest.TestCase):
+    """Test cases for StagedPipeline class."""
+    
+    def test_items_pass_through_all_stages_in_order(self):
+        """Test that every item visits each stage and results keep input order."""
+        pipeline = StagedPipeline([
+            Stage("double", lambda item: item.append(item[0] * 2), workers=3),
+            Stage("square", lambda item: item.append(item[1] ** 2))
+        ])
+        
+        completed = []
+        results = pipeline.run([[n] for n in range(10)], on_complete=completed.append)
+        
+        self.assertEqual(results, [[n, n * 2, (n * 2) ** 2] for n in range(10)])
+        self.assertEqual(len(completed), 10)
+        self.assertEqual([stats.items for stats in pipeline.stats], [10, 10])
+    
+    def test_stages_overlap(self):
+        """Test that a later stage works on one item while an earlier stage handles the next."""
+        second_started = threading.Event()
+        
+        def first(item):
+            # The second item waits until the first one is inside the second stage
+            if item["n"] == 1:
+                self.assertTrue(second_started.wait(timeout=5))
+        
+        def second(item):
+            second_started.set()
+        
+        pipeline = StagedPipeline([Stage("first", first), Stage("second", second)])
+        results = pipeline.run([{"n": 0}, {"n": 1}])
+        
+        self.assertEqual([item["n"] for item in results], [0, 1])
+    
+    def test_failed_items_skip_remaining_stages(self):
+        """Test that a failing item is reported and not processed further."""
+        errors = []
+        processed = []
+        
+        def fail_odd(item):
+            if item % 2:
+                raise ValueError(f"bad item {item}")
+        
+        pipeline = StagedPipeline(
+            [Stage("check", fail_odd), Stage("record", processed.append)],
+            on_error=lambda item, error: errors.append((item, str(error)))
+        )
+        results = pipeline.run([0, 1, 2, 3])
+        
+        self.assertEqual(results, [0, 1, 2, 3])
+        self.assertEqual(processed, [0, 2])
+        self.assertEqual(errors, [(1, "bad item 1"), (3, "bad item 3")])
+        self.assertEqual([stats.items for stats in pipeline.stats], [4, 2])
+    
+    def test_failing_error_handler_does_not_stall_the_pipeline(self):
+        """Test that workers keep running when the error handler itself raises."""
+        def fail(item):
+            raise ValueError("stage failed")
+        
+        def broken_handler(item, error):
+            raise RuntimeError("handler failed")
+        
+        pipeline = StagedPipeline([Stage("fail", fail, workers=2), Stage("next", lambda item: None)],
+                                  on_error=broken_handler)
+        runner = threading.Thread(target=pipeline.run, args=([1, 2, 3],))
+        runner.start()
+        runner.join(timeout=5)
+        
+        self.assertFalse(runner.is_alive())
+        
+    def test_queue_bounds_how_far_upstream_runs_ahead(self):
+        """Test that a blocked stage holds back upstream after the queue fills."""
+        release = threading.Event()
+        searched = []
+        
+        def search(item):
+            searched.append(item)
+        
+        def analyze(item):
+            release.wait(timeout=5)
+        
+        pipeline = StagedPipeline(
+            [Stage("search", search), Stage("analyze", analyze)],
+            queue_size=1
+        )
+        runner = threading.Thread(target=pipeline.run, args=(list(range(10)),))
+        runner.start()
+        
+        # One item in analysis, one queued, one blocked on the put, one in search
+        for _ in range(50):
+            threading.Event().wait(0.01)
+        self.assertLessEqual(len(searched), 4)
+        
+        release.set()
+        runner.join(timeout=5)
+        self.assertEqual(searched, list(range(10)))
+    
+    def test_report_lists_every_stage(self):
+        """Test the throughput report format."""
+        pipeline = StagedPipeline([Stage("search", lambda item: None), Stage("analyze", lambda item: None)])
+        pipeline.run([1, 2, 3])
+        
+        report = format_report(pipeline.stats)
+        
+        self.assertIn("items/s", report.splitlines()[0])
+        self.assertTrue(report.splitlines()[1].startswith("search"))
+        self.assertTrue(report.splitlines()[2].startswith("analyze"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""Tests for the research run store."""
+import json
+import os
+import tempfile
+import unittest
+
+from src.core.research_store import ResearchStore
+
+
+def _paper(pmid, title="Title"):
+    """Build article metadata as returned by the PubMed searchers."""
+    return {
+        "id": pmid,
+        "title": title,
+        "abstract": "Abstract",
+        "authors": ["Author A"],
+        "journal": "Journal",
+        "year": "2024",
+        "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
+    }
+
+
+class TestResearchStore(unittest.TestCase):
+    """Test cases for ResearchStore class."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = ResearchStore(os.path.join(self.tmp_dir.name, "research.sqlite3"))
+        
+    def tearDown(self):
+        """Clean up test environment."""
+        self.store.close()
+        self.tmp_dir.cleanup()
+        
+    def test_papers_are_deduplicated_across_runs(self):
+        """Test that a paper used by several topics is stored once and linked to each run."""
+        first = self.store.record_run("topic a", "2024-01-01", "llama", 2, [_paper("1"), _paper("2")],
+                                      ["f0", "f1"], "final a", timings=[{"total_time": 1.5}, {"cached": True}])
+        self.store.record_run("topic b", "2024-01-02", "llama", 1, [_paper("2", "Updated")], ["f0"], "final b")
+        
+        self.assertEqual(self.store._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0], 2)
+        self.assertEqual(self.store.topics_citing("2"), ["topic a", "topic b"])
+        self.assertEqual(self.store.topics_citing("1"), ["topic a"])
+        self.assertEqual(self.store.topics_citing("3"), [])
+        
+        papers = self.store.run_papers(first)
+        self.assertEqual([paper["id"] for paper in papers], ["1", "2"])
+        self.assertEqual(papers[1]["title"], "Updated")
+        self.assertEqual(papers[0]["authors"], ["Author A"])
+        self.assertEqual(self.store.run_findings(first), ["f0", "f1"])
+        
+        timings = self.store._conn.execute(
+            "SELECT iteration, total_time, cached FROM timings WHERE run_id = ? ORDER BY iteration", (first,)
+        ).fetchall()
+        self.assertEqual(timings, [(0, 1.5, 0), (1, None, 1)])
+        
+    def test_recording_the_same_run_again_replaces_it(self):
+        """Test that topic and timestamp identify a run."""
+        self.store.record_run("topic", "2024-01-01", "llama", 1, [_paper("1")], ["old"], "old")
+        run_id = self.store.record_run("topic", "2024-01-01", "llama", 1, [_paper("2")], ["new"], "new")
+        
+        self.assertEqual(self.store.list_topics(), [{"topic": "topic", "runs": 1, "last_run": "2024-01-01"}])
+        self.assertEqual(self.store.run_findings(run_id), ["new"])
+        self.assertEqual(self.store.topics_citing("1"), [])
+        
+    def test_latest_run(self):
+        """Test that the most recent run of a topic is returned."""
+        self.store.record_run("topic", "2024-01-01", "llama", 1, [], ["f"], "first")
+        self.store.record_run("topic", "2024-02-01", "llama", 1, [], ["f"], "second")
+        
+        self.assertEqual(self.store.latest_run("topic")["final_findings"], "second")
+        self.assertIsNone(self.store.latest_run("other"))
+        
+    def test_import_tree(self):
+        """Test importing an existing research_data tree."""
+        data_dir = os.path.join(self.tmp_dir.name, "research_data")
+        topic_dir = os.path.join(data_dir, "topic a")
+        os.makedirs(topic_dir)
+        os.makedirs(os.path.join(data_dir, "no metadata"))
+        with open(os.path.join(topic_dir, "metadata.json"), "w") as f:
+            json.dump({"topic": "topic a", "timestamp": "2024-01-01 10:00:00", "model": "llama",
+                       "iterations": 3, "num_papers": 1}, f)
+        with open(os.path.join(topic_dir, "pubmed_results.json"), "w") as f:
+            json.dump([_paper("42")], f)
+        for n in (0, 1, 10, 2):
+            with open(os.path.join(topic_dir, f"findings_{n}.txt"), "w") as f:
+                f.write(f"finding {n}")
+        with open(os.path.join(topic_dir, "final_findings.txt"), "w") as f:
+            f.write("final")
+            
+        self.assertEqual(self.store.import_tree(data_dir), 1)
+        self.assertEqual(self.store.import_tree(data_dir), 1)
+        
+        run = self.store.latest_run("topic a")
+        self.assertEqual(run["status"], "complete")
+        self.assertEqual(run["final_findings"], "final")
+        self.assertEqual(self.store.run_findings(run["id"]),
+                         ["finding 0", "finding 1", "finding 2", "finding 10"])
+        self.assertEqual(self.store.topics_citing("42"), ["topic a"])
+        self.assertEqual(len(self.store.list_topics()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
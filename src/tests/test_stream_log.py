@@ -0,0 +1,70 @@
+"""Tests for the buffered research stream log."""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.utils.stream_log import StreamLog, read_stream_log
+
+
+class TestStreamLog(unittest.TestCase):
+    """Test cases for StreamLog class."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "research_stream.jsonl")
+        self.now = 0.0
+        self.log = StreamLog(self.path, flush_interval=1.0, clock=lambda: self.now)
+        
+    def tearDown(self):
+        """Clean up test environment."""
+        self.log.close(sync=False)
+        self.tmp_dir.cleanup()
+        
+    def test_records_are_buffered_until_flush(self):
+        """Test that writes stay in memory until flushed."""
+        self.log.write("START", "Beginning research")
+        self.assertEqual(read_stream_log(self.path), [])
+        
+        self.log.flush()
+        records = read_stream_log(self.path)
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["stage"], "START")
+        self.assertEqual(records[0]["content"], "Beginning research")
+        self.assertIn("time", records[0])
+        
+    def test_streamed_chunks_merge_into_one_record(self):
+        """Test that consecutive appended chunks become a single record."""
+        self.log.write("ANALYSIS", "Starting initial analysis...")
+        for chunk in ["Streamed ", "answer ", "text"]:
+            self.log.write("ANALYSIS", chunk, append=True)
+        self.log.write("ITERATION", "Starting iteration 1/2")
+        self.log.close()
+        
+        records = read_stream_log(self.path)
+        self.assertEqual([record["content"] for record in records], [
+            "Starting initial analysis...", "Streamed answer text", "Starting iteration 1/2"
+        ])
+        
+    def test_flushes_on_interval(self):
+        """Test that buffered records are written once the interval has passed."""
+        self.log.write("ANALYSIS", "first ", append=True)
+        self.assertEqual(read_stream_log(self.path), [])
+        
+        self.now = 1.5
+        self.log.write("ANALYSIS", "second", append=True)
+        self.assertEqual(read_stream_log(self.path)[0]["content"], "first second")
+        
+    def test_close_syncs_to_disk(self):
+        """Test that closing forces the log to disk and is idempotent."""
+        self.log.write("COMPLETE", "done")
+        with patch('src.utils.stream_log.os.fsync') as fsync:
+            self.log.close()
+            self.log.close()
+        fsync.assert_called_once()
+        self.assertEqual(read_stream_log(self.path)[0]["stage"], "COMPLETE")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,12 @@
 """Tests for the scientific literature search utility."""
 import unittest
 from unittest.mock import patch, MagicMock
+import os
+import tempfile
 import time
 import requests
-from src.utils.web_search import PubMedSearcher
+from src.utils.pubmed_cache import PubMedCache
+from src.utils.web_search import ArticleStreamParser, PubMedSearcher, iter_articles
 
 class TestPubMedSearcher(unittest.TestCase):
     """Test cases for PubMedSearcher class."""
@@ -224,6 +227,250 @@ class TestPubMedSearcher(unittest.TestCase):
         self.assertEqual(mock_get.call_count, 1)
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]['title'], 'Search Limited')
+
+
+def _efetch_xml(*pmids):
+    """Build a minimal EFetch PubmedArticleSet for the given PMIDs."""
+    articles = "".join(f"""
+        <PubmedArticle>
+            <MedlineCitation Status="MEDLINE" Owner="NLM">
+                <PMID Version="1">{pmid}</PMID>
+                <Article>
+                    <Journal>
+                        <JournalIssue><PubDate><Year>2023</Year></PubDate></JournalIssue>
+                        <Title>Journal {pmid}</Title>
+                    </Journal>
+                    <ArticleTitle>Article {pmid}</ArticleTitle>
+                    <Abstract><AbstractText>Abstract {pmid}</AbstractText></Abstract>
+                    <AuthorList CompleteYN="Y">
+                        <Author ValidYN="Y"><LastName>Smith</LastName><ForeName>John</ForeName></Author>
+                    </AuthorList>
+                </Article>
+            </MedlineCitation>
+        </PubmedArticle>""" for pmid in pmids)
+    return f'<?xml version="1.0"?><PubmedArticleSet>{articles}</PubmedArticleSet>'.encode()
+
+
+class TestPubMedBatchFetch(unittest.TestCase):
+    """Test cases for batched EFetch requests."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.searcher = PubMedSearcher(max_results=5, fetch_batch_size=2)
+        
+    def _fake_request(self, method, url, **kwargs):
+        """Answer ESearch and EFetch calls without network access."""
+        response = MagicMock()
+        if url.endswith("esearch.fcgi"):
+            response.json.return_value = {
+                'esearchresult': {'idlist': ['1', '2', '3', '4', '5']}
+            }
+        else:
+            response.iter_content.return_value = [_efetch_xml(*kwargs['data']['id'].split(","))]
+        return response
+        
+    def test_search_fetches_in_batches(self):
+        """Test that article details are fetched one batch per EFetch call."""
+        with patch.object(self.searcher, '_make_request', side_effect=self._fake_request) as mock_request:
+            results = self.searcher.search("test query")
+            
+        self.assertEqual([article['id'] for article in results], ['1', '2', '3', '4', '5'])
+        self.assertEqual(results[0]['title'], 'Article 1')
+        self.assertEqual(results[0]['authors'], ['John Smith'])
+        self.assertEqual(results[0]['year'], '2023')
+        
+        # One ESearch call plus ceil(5 / 2) EFetch calls
+        self.assertEqual(mock_request.call_count, 4)
+        fetched = [call.kwargs['data']['id'] for call in mock_request.call_args_list[1:]]
+        self.assertEqual(fetched, ['1,2', '3,4', '5'])
+        
+    def test_invalid_batch_size(self):
+        """Test that out-of-range batch sizes are rejected."""
+        with self.assertRaises(ValueError):
+            PubMedSearcher(fetch_batch_size=0)
+
+
+class TestPubMedHistorySearch(unittest.TestCase):
+    """Test cases for paging through the ESearch history server."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.searcher = PubMedSearcher(fetch_batch_size=2)
+        
+    def _fake_request(self, method, url, **kwargs):
+        """Answer history-server ESearch and EFetch calls."""
+        response = MagicMock()
+        if url.endswith("esearch.fcgi"):
+            self.assertEqual(kwargs['params']['usehistory'], 'y')
+            response.json.return_value = {
+                'esearchresult': {'count': '5', 'webenv': 'ENV_1', 'querykey': '1', 'idlist': []}
+            }
+        else:
+            data = kwargs['data']
+            self.assertEqual(data['WebEnv'], 'ENV_1')
+            start = data['retstart'] + 1
+            response.iter_content.return_value = [_efetch_xml(*range(start, start + data['retmax']))]
+        return response
+        
+    def test_search_iter_pages_through_results(self):
+        """Test that all matches are yielded page by page."""
+        with patch.object(self.searcher, '_make_request', side_effect=self._fake_request) as mock_request:
+            results = self.searcher.search_iter("test query")
+            self.assertEqual(mock_request.call_count, 0)  # Lazy until iterated
+            ids = [article['id'] for article in results]
+            
+        self.assertEqual(ids, ['1', '2', '3', '4', '5'])
+        pages = [(call.kwargs['data']['retstart'], call.kwargs['data']['retmax'])
+                 for call in mock_request.call_args_list[1:]]
+        self.assertEqual(pages, [(0, 2), (2, 2), (4, 1)])
+        
+    def test_search_iter_limit(self):
+        """Test that the limit caps the number of fetched articles."""
+        with patch.object(self.searcher, '_make_request', side_effect=self._fake_request) as mock_request:
+            ids = [article['id'] for article in self.searcher.search_iter("test query", limit=3)]
+            
+        self.assertEqual(ids, ['1', '2', '3'])
+        self.assertEqual(mock_request.call_count, 3)
+
+
+class TestPubMedSession(unittest.TestCase):
+    """Test cases for the pooled HTTP session."""
+    
+    def test_requests_use_shared_session_with_timeouts(self):
+        """Test that requests go through the shared session with configured timeouts."""
+        session = MagicMock()
+        searcher = PubMedSearcher(session=session, connect_timeout=2.0, read_timeout=10.0)
+        
+        searcher._make_request("GET", "https://example.org/esearch.fcgi", params={"term": "x"})
+        
+        self.assertIs(searcher.session, session)
+        session.request.assert_called_once_with(
+            "GET", "https://example.org/esearch.fcgi", params={"term": "x"}, timeout=(2.0, 10.0)
+        )
+        
+    def test_default_session_is_pooled(self):
+        """Test that a pooled keep-alive session is created by default."""
+        searcher = PubMedSearcher(pool_size=4)
+        adapter = searcher.session.get_adapter("https://eutils.ncbi.nlm.nih.gov")
+        
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertIn("gzip", searcher.session.headers["Accept-Encoding"])
+
+
+class TestPubMedRateLimit(unittest.TestCase):
+    """Test cases for rate limiting of PubMed requests."""
+    
+    def test_api_key_raises_rate(self):
+        """Test that an API key selects the higher NCBI rate and is sent along."""
+        session = MagicMock()
+        searcher = PubMedSearcher(session=session, api_key="test-key-rate")
+        
+        searcher._make_request("GET", "https://example.org/esearch.fcgi", params={"term": "x"})
+        
+        self.assertEqual(searcher.rate_limiter.rate, 10.0)
+        self.assertEqual(session.request.call_args.kwargs['params'], {"term": "x", "api_key": "test-key-rate"})
+        
+    def test_retry_after_pauses_limiter(self):
+        """Test that a 429 response pauses the shared limiter for Retry-After seconds."""
+        limited = MagicMock(status_code=429, headers={"Retry-After": "2"})
+        success = MagicMock(status_code=200)
+        session = MagicMock()
+        session.request.side_effect = [limited, success]
+        searcher = PubMedSearcher(session=session, api_key="test-key-429")
+        
+        with patch.object(searcher.rate_limiter, 'acquire') as mock_acquire, \
+                patch.object(searcher.rate_limiter, 'pause') as mock_pause:
+            response = searcher._make_request("GET", "https://example.org/esearch.fcgi", params={})
+            
+        self.assertIs(response, success)
+        mock_pause.assert_called_once_with(2.0)
+        self.assertEqual(mock_acquire.call_count, 2)
+
+
+class TestArticleStreamParser(unittest.TestCase):
+    """Test cases for incremental EFetch XML parsing."""
+    
+    def test_articles_from_small_chunks(self):
+        """Test that articles are parsed correctly across arbitrary chunk boundaries."""
+        xml = _efetch_xml(*range(1, 21))
+        chunks = [xml[i:i + 37] for i in range(0, len(xml), 37)]
+        
+        articles = list(iter_articles(chunks))
         
+        self.assertEqual([article['id'] for article in articles], [str(i) for i in range(1, 21)])
+        self.assertEqual(articles[-1]['abstract'], 'Abstract 20')
+        
+    def test_articles_yielded_before_stream_ends(self):
+        """Test that articles are yielded incrementally and then released."""
+        xml = _efetch_xml(1, 2, 3)
+        first_end = xml.index(b"</PubmedArticle>") + len(b"</PubmedArticle>")
+        parser = ArticleStreamParser()
+        
+        first = list(parser.feed(xml[:first_end]))
+        self.assertEqual([article['id'] for article in first], ['1'])
+        self.assertEqual(len(parser._root), 0)
+        
+        rest = list(parser.feed(xml[first_end:])) + list(parser.close())
+        self.assertEqual([article['id'] for article in rest], ['2', '3'])
+
+
+class TestPubMedSearchCache(unittest.TestCase):
+    """Test cases for searching with a local cache."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = PubMedCache(os.path.join(self.tmp_dir.name, "cache.sqlite3"))
+        self.index = ['1', '2', '3', '4', '5']
+        
+    def tearDown(self):
+        """Clean up test environment."""
+        self.cache.close()
+        self.tmp_dir.cleanup()
+        
+    def _fake_request(self, method, url, **kwargs):
+        """Answer ESearch and EFetch calls from the fake index."""
+        response = MagicMock()
+        if url.endswith("esearch.fcgi"):
+            response.json.return_value = {
+                'esearchresult': {'idlist': self.index[:kwargs['params']['retmax']]}
+            }
+        else:
+            response.iter_content.return_value = [_efetch_xml(*kwargs['data']['id'].split(","))]
+        return response
+        
+    def test_repeated_search_uses_cache(self):
+        """Test that repeating a search makes no requests."""
+        searcher = PubMedSearcher(max_results=3, cache=self.cache)
+        with patch.object(searcher, '_make_request', side_effect=self._fake_request) as mock_request:
+            first = searcher.search("test query")
+            second = searcher.search("Test  Query")
+            
+        self.assertEqual(first, second)
+        self.assertEqual(mock_request.call_count, 2)  # One ESearch and one EFetch
+        
+    def test_widened_search_fetches_only_new_articles(self):
+        """Test that widening a search only fetches uncached PMIDs."""
+        with patch.object(PubMedSearcher, '_make_request', side_effect=self._fake_request) as mock_request:
+            PubMedSearcher(max_results=3, cache=self.cache).search("test query")
+            results = PubMedSearcher(max_results=5, cache=self.cache).search("test query")
+            
+        self.assertEqual([article['id'] for article in results], self.index)
+        self.assertEqual(mock_request.call_args_list[-1].kwargs['data']['id'], '4,5')
+        
+    def test_date_bounded_search(self):
+        """Test that date bounds are sent to ESearch and kept apart in the cache."""
+        with patch.object(PubMedSearcher, '_make_request', side_effect=self._fake_request) as mock_request:
+            searcher = PubMedSearcher(max_results=2, cache=self.cache)
+            searcher.search("test query")
+            searcher.search("test query", mindate="2024/01/01", maxdate="2024/02/01")
+            
+        params = mock_request.call_args_list[2].kwargs['params']
+        self.assertEqual(params['datetype'], 'edat')
+        self.assertEqual(params['mindate'], '2024/01/01')
+        self.assertEqual(params['maxdate'], '2024/02/01')
+        self.assertNotIn('mindate', mock_request.call_args_list[0].kwargs['params'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,240 @@
+"""Asynchronous PubMed search for running many queries concurrently."""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+from src.utils.http import parse_retry_after
+from src.utils.rate_limiter import get_rate_limiter
+from src.utils.web_search import (
+    ANONYMOUS_RATE_LIMIT,
+    API_KEY_RATE_LIMIT,
+    MAX_FETCH_BATCH_SIZE,
+    ArticleStreamParser,
+    format_articles,
+)
+
+logger = logging.getLogger(__name__)
+
+class AsyncPubMedSearcher:
+    """Asyncio counterpart of PubMedSearcher built on httpx.
+    
+    Requests share the process-wide NCBI rate limiter with the synchronous
+    searcher, so mixing both never exceeds the allowed request rate.
+    """
+    
+    def __init__(self, max_results: int = 5, retry_count: int = 3, retry_delay: float = 1.0,
+                 fetch_batch_size: int = 200, client: Optional[httpx.AsyncClient] = None,
+                 pool_size: int = 10, connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 api_key: Optional[str] = None, requests_per_second: Optional[float] = None):
+        """Initialize the async PubMed searcher.
+        
+        Args:
+            max_results: Maximum number of results to return per query
+            retry_count: Number of retries for failed requests
+            retry_delay: Initial delay between retries (will use exponential backoff)
+            fetch_batch_size: Number of PMIDs requested per EFetch call
+            client: Shared async HTTP client (a pooled client is created if None)
+            pool_size: Connection pool size for the client created when none is given
+            connect_timeout: Seconds to wait for a connection to NCBI
+            read_timeout: Seconds to wait for response data from NCBI
+            api_key: NCBI API key, raising the allowed request rate
+            requests_per_second: Request rate shared by all searchers using the same
+                key (defaults to the NCBI limit for anonymous or keyed access)
+        """
+        if not 1 <= fetch_batch_size <= MAX_FETCH_BATCH_SIZE:
+            raise ValueError(f"fetch_batch_size must be between 1 and {MAX_FETCH_BATCH_SIZE}")
+            
+        self.base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+        self.max_results = max_results
+        self.retry_count = retry_count
+        self.retry_delay = retry_delay
+        self.fetch_batch_size = fetch_batch_size
+        self.api_key = api_key
+        
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                headers={"Accept-Encoding": "gzip, deflate"}
+            )
+        self.client = client
+        
+        if requests_per_second is None:
+            requests_per_second = API_KEY_RATE_LIMIT if api_key else ANONYMOUS_RATE_LIMIT
+        self.rate_limiter = get_rate_limiter(f"ncbi:{api_key or 'anonymous'}", requests_per_second)
+        
+    async def __aenter__(self) -> "AsyncPubMedSearcher":
+        return self
+        
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+        
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        await self.client.aclose()
+        
+    async def search(self, query: str, mindate: Optional[str] = None,
+                     maxdate: Optional[str] = None) -> List[Dict]:
+        """Search PubMed for scientific articles.
+        
+        Args:
+            query: Search query
+            mindate: Only return articles added to PubMed on or after this
+                date (YYYY/MM/DD, Entrez date)
+            maxdate: Only return articles added on or before this date
+                (defaults to today when mindate is given)
+            
+        Returns:
+            List of article metadata dictionaries in ESearch order
+        """
+        try:
+            search_url = f"{self.base_url}/esearch.fcgi"
+            params = {
+                "db": "pubmed",
+                "term": query,
+                "retmax": self.max_results,
+                "retmode": "json"
+            }
+            if mindate or maxdate:
+                params.update({
+                    "datetype": "edat",
+                    "mindate": mindate or "1800/01/01",
+                    "maxdate": maxdate or datetime.now().strftime("%Y/%m/%d")
+                })
+            
+            response = await self._make_request("GET", search_url, params=params)
+            article_ids = response.json()["esearchresult"]["idlist"]
+            
+            # Fetch all batches concurrently; the rate limiter spaces the calls
+            batches = [
+                article_ids[start:start + self.fetch_batch_size]
+                for start in range(0, len(article_ids), self.fetch_batch_size)
+            ]
+            results = await asyncio.gather(
+                *(self._fetch_articles(batch) for batch in batches),
+                return_exceptions=True
+            )
+            
+            by_id = {}
+            for batch, result in zip(batches, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error fetching article details for PMIDs {', '.join(batch)}: {str(result)}")
+                    continue
+                by_id.update((article["id"], article) for article in result)
+            
+            # Return articles in ESearch order
+            return [by_id[article_id] for article_id in article_ids if article_id in by_id]
+            
+        except Exception as e:
+            logger.error(f"Error during PubMed search: {str(e)}")
+            return []
+            
+    async def search_many(self, queries: List[str], mindate: Optional[str] = None,
+                          maxdate: Optional[str] = None) -> List[List[Dict]]:
+        """Search PubMed for several queries concurrently.
+        
+        Args:
+            queries: Search queries
+            mindate: Entrez date lower bound applied to every query
+            maxdate: Entrez date upper bound applied to every query
+            
+        Returns:
+            Article lists in the same order as the queries
+        """
+        return list(await asyncio.gather(*(self.search(query, mindate, maxdate) for query in queries)))
+        
+    async def _fetch_articles(self, article_ids: List[str]) -> List[Dict]:
+        """Fetch detailed information for a batch of PubMed articles.
+        
+        Args:
+            article_ids: PubMed article IDs fetched with a single EFetch call
+            
+        Returns:
+            List of article metadata dictionaries in the order returned by PubMed
+        """
+        fetch_url = f"{self.base_url}/efetch.fcgi"
+        data = {
+            "db": "pubmed",
+            "id": ",".join(article_ids),
+            "retmode": "xml"
+        }
+        
+        response = await self._make_request("POST", fetch_url, data=data, stream=True)
+        
+        parser = ArticleStreamParser()
+        articles = []
+        try:
+            async for chunk in response.aiter_bytes():
+                articles.extend(parser.feed(chunk))
+            articles.extend(parser.close())
+        finally:
+            await response.aclose()
+        return articles
+        
+    async def _make_request(self, method: str, url: str, stream: bool = False,
+                            **kwargs) -> httpx.Response:
+        """Make a rate-limited HTTP request with retry logic.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            stream: Return before reading the body (the caller must close the response)
+            **kwargs: Additional arguments for httpx
+            
+        Returns:
+            Response object
+            
+        Raises:
+            httpx.HTTPError: If all retries fail
+        """
+        last_error = None
+        delay = self.retry_delay
+        if self.api_key:
+            field = "data" if "data" in kwargs else "params"
+            kwargs[field] = {**kwargs.get(field, {}), "api_key": self.api_key}
+        
+        for attempt in range(self.retry_count):
+            try:
+                await self.rate_limiter.acquire_async()
+                request = self.client.build_request(method, url, **kwargs)
+                response = await self.client.send(request, stream=stream)
+                
+                # Handle rate limiting by holding back every caller sharing the limiter
+                if response.status_code == 429:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"), delay)
+                    logger.warning(f"Rate limited. Waiting {retry_after} seconds...")
+                    self.rate_limiter.pause(retry_after)
+                    await response.aclose()
+                    last_error = httpx.HTTPStatusError(
+                        "429 Too Many Requests", request=response.request, response=response
+                    )
+                    continue
+                    
+                if response.is_error:
+                    await response.aclose()
+                response.raise_for_status()
+                return response
+                
+            except httpx.HTTPError as e:
+                last_error = e
+                logger.warning(f"Request failed (attempt {attempt + 1}/{self.retry_count}): {str(e)}")
+                
+                if attempt < self.retry_count - 1:
+                    await asyncio.sleep(delay)
+                    delay *= 2  # Exponential backoff
+                
+        raise last_error
+        
+    def format_results(self, articles: List[Dict]) -> str:
+        """Format search results for display.
+        
+        Args:
+            articles: List of article metadata dictionaries
+            
+        Returns:
+            Formatted string of search results
+        """
+        return format_articles(articles)
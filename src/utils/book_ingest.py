@@ -0,0 +1,187 @@
+"""Streaming ingestion of books: pages to chunks to embedding batches to inserts."""
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Characters buffered before the splitter runs over the pending text
+DEFAULT_WINDOW_CHARS = 16000
+
+# Batches waiting between two steps
+DEFAULT_QUEUE_SIZE = 4
+
+# Marks the end of a step's output
+_DONE = object()
+
+
+def iter_chunks(pages: Iterable[str], split_text: Callable[[str], List[str]],
+                window_chars: int = DEFAULT_WINDOW_CHARS) -> Iterator[Tuple[str, int]]:
+    """Split a stream of pages into chunks without holding the whole text.
+    
+    Text is buffered until it exceeds the window, then split. All chunks but
+    the last are emitted; the last one may continue on the next page, so the
+    text from its start on begins the next window. Chunk boundaries match a
+    split of the full text up to where the carried chunk begins; after it
+    the splitter may place them differently, but no text is skipped and
+    chunks keep the splitter's size limit.
+    
+    Args:
+        pages: Page texts in reading order (including their separators)
+        split_text: Splitter turning text into chunks
+        window_chars: Characters buffered before splitting (above the chunk size)
+    
+    Yields:
+        Tuples of (chunk, number of pages consumed so far)
+    """
+    buffer = ""
+    consumed = 0
+    for consumed, page in enumerate(pages, 1):
+        buffer += page
+        if len(buffer) < window_chars:
+            continue
+        chunks = split_text(buffer)
+        for chunk in chunks[:-1]:
+            yield chunk, consumed
+        if chunks:
+            # Keep the original text from the last chunk on, separators included
+            start = buffer.rfind(chunks[-1])
+            buffer = buffer[start:] if start >= 0 else chunks[-1]
+        else:
+            buffer = ""
+    
+    for chunk in split_text(buffer) if buffer else []:
+        yield chunk, consumed
+
+
+def iter_batches(chunks: Iterable[Tuple[str, int]], batch_size: int) -> Iterator[Tuple[List[str], int]]:
+    """Group chunks into batches.
+    
+    Args:
+        chunks: Tuples of (chunk, pages consumed) from iter_chunks
+        batch_size: Maximum number of chunks per batch
+    
+    Yields:
+        Tuples of (chunk texts, pages consumed when the batch was complete)
+    """
+    batch = []
+    consumed = 0
+    for chunk, consumed in chunks:
+        batch.append(chunk)
+        if len(batch) >= batch_size:
+            yield batch, consumed
+            batch = []
+    if batch:
+        yield batch, consumed
+
+
+def ingest_stream(pages: Iterable[str], split_text: Callable[[str], List[str]],
+                  embed: Callable[[List[str]], List[List[float]]],
+                  insert: Callable[[List[str], List[Dict], List[List[float]]], None],
+                  source: str, batch_size: int = 64, queue_size: int = DEFAULT_QUEUE_SIZE,
+                  window_chars: int = DEFAULT_WINDOW_CHARS,
+                  progress_callback: Optional[Callable[[int], None]] = None) -> int:
+    """Ingest a book with extraction, embedding and insertion overlapping.
+    
+    One thread extracts and splits pages into batches, a second embeds them
+    and the calling thread inserts them. Queues holding at most queue_size
+    batches connect the steps, so memory use does not depend on the size of
+    the book.
+    
+    Args:
+        pages: Page texts in reading order
+        split_text: Splitter turning text into chunks
+        embed: Embeds a batch of texts
+        insert: Stores (texts, metadatas, vectors) of a batch
+        source: Source recorded in every chunk's metadata
+        batch_size: Chunks embedded and inserted together
+        queue_size: Batches buffered between two steps
+        window_chars: Characters buffered before splitting
+        progress_callback: Called with the pages read after each stored batch
+    
+    Returns:
+        Number of chunks stored
+    
+    Raises:
+        Exception: The first error raised by any step
+    """
+    chunk_queue = queue.Queue(maxsize=queue_size)
+    vector_queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    
+    def put(target: queue.Queue, item) -> bool:
+        """Put an item unless the pipeline is stopping."""
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def get(source_queue: queue.Queue):
+        """Take an item, or _DONE once the pipeline is stopping."""
+        while not stop.is_set():
+            try:
+                return source_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+    
+    def produce():
+        try:
+            first_chunk = 0
+            for texts, consumed in iter_batches(iter_chunks(pages, split_text, window_chars), batch_size):
+                metadatas = [{"source": source, "chunk": first_chunk + i} for i in range(len(texts))]
+                first_chunk += len(texts)
+                if not put(chunk_queue, (texts, metadatas, consumed)):
+                    return
+            put(chunk_queue, _DONE)
+        except Exception as e:
+            put(chunk_queue, e)
+    
+    def embed_batches():
+        while True:
+            item = get(chunk_queue)
+            if item is _DONE or isinstance(item, Exception):
+                put(vector_queue, item)
+                return
+            texts, metadatas, consumed = item
+            try:
+                vectors = embed(texts)
+            except Exception as e:
+                put(vector_queue, e)
+                return
+            if not put(vector_queue, (texts, metadatas, vectors, consumed)):
+                return
+    
+    threads = [
+        threading.Thread(target=produce, name="ingest-split", daemon=True),
+        threading.Thread(target=embed_batches, name="ingest-embed", daemon=True)
+    ]
+    for thread in threads:
+        thread.start()
+    
+    stored = 0
+    try:
+        while True:
+            item = vector_queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            texts, metadatas, vectors, consumed = item
+            insert(texts, metadatas, vectors)
+            stored += len(texts)
+            if progress_callback is not None:
+                progress_callback(consumed)
+    finally:
+        # Unblock the other steps if insertion failed
+        stop.set()
+        for thread in threads:
+            thread.join()
+    
+    logger.info(f"Stored {stored} chunks from {source}")
+    return stored
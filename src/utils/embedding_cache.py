@@ -0,0 +1,230 @@
+"""Persistent cache of text embeddings keyed by model and content hash."""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Rows looked up per SQLite query (below the bound parameter limit)
+LOOKUP_BATCH = 500
+
+
+class EmbeddingCache:
+    """Float16 embedding store with a SQLite index.
+    
+    Vectors of each model are appended as float16 rows to their own file and
+    read back through a memory map. The index maps (model, SHA-256 of the
+    text) to a row. Rows are written before they are indexed, so a crash can
+    at worst leave unindexed bytes at the end of a file, which are reused.
+    """
+    
+    def __init__(self, directory: str):
+        """Open the cache, creating it if missing.
+        
+        Args:
+            directory: Directory holding the index and the vector files
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps: Dict[str, np.memmap] = {}
+        self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS models (
+                name TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                rows INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                row INTEGER NOT NULL,
+                PRIMARY KEY (model, digest)
+            );
+        """)
+    
+    @staticmethod
+    def digest(text: str) -> str:
+        """Hash a text into its cache key.
+        
+        Args:
+            text: Embedded text
+        
+        Returns:
+            Hex SHA-256 digest of the UTF-8 encoded text
+        """
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    
+    def get(self, model: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up cached embeddings.
+        
+        Args:
+            model: Name of the embedding model
+            texts: Texts to look up
+        
+        Returns:
+            Float32 vector for each text, or None where it is not cached
+        """
+        digests = [self.digest(text) for text in texts]
+        with self._lock:
+            info = self._model_info(model)
+            if info is None:
+                return [None] * len(texts)
+            rows = {}
+            unique = list(dict.fromkeys(digests))
+            for start in range(0, len(unique), LOOKUP_BATCH):
+                batch = unique[start:start + LOOKUP_BATCH]
+                rows.update(self._conn.execute(
+                    f"SELECT digest, row FROM embeddings WHERE model = ? AND digest IN ({','.join('?' * len(batch))})",
+                    (model, *batch)
+                ).fetchall())
+            vectors = self._vectors(model, *info)
+            return [
+                np.asarray(vectors[rows[digest]], dtype=np.float32) if digest in rows else None
+                for digest in digests
+            ]
+    
+    def put(self, model: str, texts: List[str], vectors: List[List[float]]) -> None:
+        """Store embeddings, skipping texts that are already cached.
+        
+        Args:
+            model: Name of the embedding model
+            texts: Embedded texts
+            vectors: Embedding of each text
+        """
+        if not texts:
+            return
+        array = np.asarray(vectors, dtype=np.float16)
+        digests = [self.digest(text) for text in texts]
+        with self._lock:
+            info = self._model_info(model)
+            dim = array.shape[1] if info is None else info[0]
+            if array.shape[1] != dim:
+                raise ValueError(f"{model} embeddings have {dim} dimensions, got {array.shape[1]}")
+            rows = 0 if info is None else info[1]
+            
+            known = set()
+            for start in range(0, len(digests), LOOKUP_BATCH):
+                batch = digests[start:start + LOOKUP_BATCH]
+                known.update(digest for digest, in self._conn.execute(
+                    f"SELECT digest FROM embeddings WHERE model = ? AND digest IN ({','.join('?' * len(batch))})",
+                    (model, *batch)
+                ))
+            new = {}
+            for index, digest in enumerate(digests):
+                if digest not in known and digest not in new:
+                    new[digest] = index
+            if not new:
+                return
+            
+            # Append the rows after the indexed ones, dropping any unindexed tail
+            self._maps.pop(model, None)
+            with open(self._vector_path(model), 'ab') as f:
+                f.truncate(rows * dim * 2)
+                f.write(array[list(new.values())].astype('<f2').tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO embeddings (model, digest, row) VALUES (?, ?, ?)",
+                    [(model, digest, rows + offset) for offset, digest in enumerate(new)]
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO models (name, dim, rows) VALUES (?, ?, ?)",
+                    (model, dim, rows + len(new))
+                )
+    
+    def count(self, model: str) -> int:
+        """Count the cached embeddings of a model.
+        
+        Args:
+            model: Name of the embedding model
+        
+        Returns:
+            Number of cached vectors
+        """
+        with self._lock:
+            info = self._model_info(model)
+        return 0 if info is None else info[1]
+    
+    def close(self) -> None:
+        """Release the memory maps and close the index."""
+        with self._lock:
+            self._maps.clear()
+            self._conn.close()
+    
+    def _model_info(self, model: str) -> Optional[tuple]:
+        """Return (dim, rows) of a model; the caller holds the lock."""
+        return self._conn.execute("SELECT dim, rows FROM models WHERE name = ?", (model,)).fetchone()
+    
+    def _vector_path(self, model: str) -> str:
+        """Return the vector file of a model."""
+        return os.path.join(self.directory, re.sub(r'[^A-Za-z0-9._-]+', '_', model) + ".f16")
+    
+    def _vectors(self, model: str, dim: int, rows: int) -> np.memmap:
+        """Map the indexed rows of a model; the caller holds the lock."""
+        vectors = self._maps.get(model)
+        if vectors is None or vectors.shape[0] != rows:
+            vectors = np.memmap(self._vector_path(model), dtype='<f2', mode='r', shape=(rows, dim))
+            self._maps[model] = vectors
+        return vectors
+
+
+class CachedEmbeddings:
+    """Embeddings wrapper that only computes vectors for unseen texts.
+    
+    Implements the embed_documents/embed_query interface of LangChain
+    embeddings, so it can be passed wherever the wrapped model is used.
+    Document vectors are always returned at float16 precision, whether they
+    were cached or just computed, so a book embeds to the same vectors on
+    every load. Queries are not cached.
+    """
+    
+    def __init__(self, embeddings, cache: EmbeddingCache, model_name: str):
+        """Wrap an embedding model.
+        
+        Args:
+            embeddings: Model with embed_documents and embed_query methods
+            cache: Cache to read and store document vectors
+            model_name: Name of the model, part of the cache key
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_name = model_name
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, computing only those missing from the cache.
+        
+        Args:
+            texts: Documents to embed
+        
+        Returns:
+            Embedding of each document
+        """
+        vectors = self.cache.get(self.model_name, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            self.cache.put(self.model_name, missing, self.embeddings.embed_documents(missing))
+            computed = dict(zip(missing, self.cache.get(self.model_name, missing)))
+            vectors = [computed[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+        logger.debug(f"Embedded {len(missing)} of {len(texts)} documents, {len(texts) - len(missing)} cached")
+        return [vector.tolist() for vector in vectors]
+    
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a search query with the wrapped model.
+        
+        Args:
+            text: Query text
+        
+        Returns:
+            Query embedding
+        """
+        return self.embeddings.embed_query(text)
@@ -0,0 +1,50 @@
+"""HTTP session helpers for the research assistant."""
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def create_session(pool_size: int = 10) -> requests.Session:
+    """Create a keep-alive HTTP session with a sized connection pool.
+    
+    Args:
+        pool_size: Maximum number of pooled connections kept open per host
+        
+    Returns:
+        Configured session that can be shared between clients
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive"
+    })
+    return session
+
+
+def parse_retry_after(value: Optional[str], default: float) -> float:
+    """Parse a Retry-After header into seconds.
+    
+    Args:
+        value: Header value, either delay seconds or an HTTP date
+        default: Delay to use when the header is missing or malformed
+        
+    Returns:
+        Non-negative delay in seconds
+    """
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,84 @@
+"""Page-parallel PDF text extraction."""
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import PyPDF2
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Pages extracted per worker task
+DEFAULT_PAGES_PER_TASK = 16
+
+
+def _extract_page_range(task: Tuple[str, int, int]) -> List[str]:
+    """Extract the text of pages [start, end) in a worker process."""
+    pdf_path, start, end = task
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        return [reader.pages[index].extract_text() or "" for index in range(start, end)]
+
+
+def iter_pdf_pages(pdf_path: str, workers: Optional[int] = None,
+                   pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+                   progress_callback: Optional[Callable[[int, int], None]] = None) -> Iterator[str]:
+    """Extract the text of every page of a PDF, in page order.
+    
+    Page ranges are extracted in a process pool. At most two ranges per
+    worker are in flight, so memory use is bounded by the pages waiting to
+    be consumed rather than by the size of the document. Workers are
+    spawned rather than forked, as callers run extraction next to other
+    threads.
+    
+    Args:
+        pdf_path: Path to PDF file
+        workers: Number of worker processes (CPU count if None, 1 extracts in-process)
+        pages_per_task: Number of pages each worker task extracts
+        progress_callback: Called with (pages done, total pages) once the page
+            count is known (0 pages done) and after each page
+    
+    Yields:
+        Text of each page
+    """
+    workers = workers or os.cpu_count() or 1
+    done = 0
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        total = len(reader.pages)
+        if progress_callback is not None:
+            progress_callback(done, total)
+        
+        # Small documents are not worth starting a pool for; reuse the open reader
+        if workers == 1 or total <= pages_per_task:
+            for page in reader.pages:
+                done += 1
+                if progress_callback is not None:
+                    progress_callback(done, total)
+                yield page.extract_text() or ""
+            return
+    
+    ranges = [(pdf_path, start, min(start + pages_per_task, total)) for start in range(0, total, pages_per_task)]
+    logger.info(f"Extracting {total} pages of {pdf_path} with {workers} processes")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        pending = deque()
+        tasks = iter(ranges)
+        for task in tasks:
+            pending.append(executor.submit(_extract_page_range, task))
+            if len(pending) >= 2 * workers:
+                break
+        
+        while pending:
+            texts = pending.popleft().result()
+            next_task = next(tasks, None)
+            if next_task is not None:
+                pending.append(executor.submit(_extract_page_range, next_task))
+            for text in texts:
+                done += 1
+                if progress_callback is not None:
+                    progress_callback(done, total)
+                yield text
+
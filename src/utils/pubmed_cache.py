@@ -0,0 +1,162 @@
+"""On-disk cache for PubMed search results and article records."""
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+class PubMedCache:
+    """SQLite-backed cache with TTL expiry and LRU eviction.
+    
+    Two tables are kept: ESearch ID lists keyed by the normalized query and
+    its parameters, and parsed article records keyed by PMID. Entries older
+    than the TTL are ignored, and each table is trimmed to ``max_entries`` by
+    evicting the least recently used rows.
+    """
+    
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600, max_entries: int = 10000):
+        """Initialize the cache.
+        
+        Args:
+            path: SQLite database file (created if missing)
+            ttl: Seconds after which an entry is considered stale
+            max_entries: Maximum number of rows kept per table
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS searches (
+                key TEXT PRIMARY KEY,
+                ids TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS articles (
+                pmid TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS searches_accessed ON searches (accessed);
+            CREATE INDEX IF NOT EXISTS articles_accessed ON articles (accessed);
+        """)
+        
+    @staticmethod
+    def search_key(query: str, params: Dict) -> str:
+        """Build the cache key for an ESearch call.
+        
+        Args:
+            query: Search query
+            params: Additional ESearch parameters affecting the result
+            
+        Returns:
+            Key that is insensitive to case and whitespace in the query
+        """
+        normalized = " ".join(query.lower().split())
+        return json.dumps({"term": normalized, **params}, sort_keys=True)
+        
+    def get_search(self, query: str, params: Dict) -> Optional[List[str]]:
+        """Look up the PMIDs returned by a previous ESearch call.
+        
+        Args:
+            query: Search query
+            params: Additional ESearch parameters affecting the result
+            
+        Returns:
+            Cached PMID list, or None if missing or expired
+        """
+        key = self.search_key(query, params)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT ids FROM searches WHERE key = ? AND created >= ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE searches SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+        
+    def put_search(self, query: str, params: Dict, ids: List[str]) -> None:
+        """Store the PMIDs returned by an ESearch call.
+        
+        Args:
+            query: Search query
+            params: Additional ESearch parameters affecting the result
+            ids: PMIDs in result order
+        """
+        key = self.search_key(query, params)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO searches (key, ids, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(ids), now, now)
+            )
+            self._evict("searches")
+            
+    def get_articles(self, pmids: Iterable[str]) -> Dict[str, Dict]:
+        """Look up cached article records.
+        
+        Args:
+            pmids: PMIDs to look up
+            
+        Returns:
+            Mapping of PMID to article dictionary for every fresh cache hit
+        """
+        pmids = list(pmids)
+        now = time.time()
+        found = {}
+        with self._lock, self._conn:
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(pmids), 500):
+                batch = pmids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT pmid, data FROM articles WHERE pmid IN ({placeholders}) AND created >= ?",
+                    (*batch, now - self.ttl)
+                ).fetchall()
+                found.update((pmid, json.loads(data)) for pmid, data in rows)
+            self._conn.executemany(
+                "UPDATE articles SET accessed = ? WHERE pmid = ?", [(now, pmid) for pmid in found]
+            )
+        return found
+        
+    def put_articles(self, articles: Iterable[Dict]) -> None:
+        """Store parsed article records.
+        
+        Args:
+            articles: Article dictionaries with an ``id`` field holding the PMID
+        """
+        now = time.time()
+        rows = [
+            (article["id"], json.dumps(article, ensure_ascii=False), now, now)
+            for article in articles if article.get("id")
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO articles (pmid, data, created, accessed) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._evict("articles")
+            
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM searches")
+            self._conn.execute("DELETE FROM articles")
+            
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+            
+    def _evict(self, table: str) -> None:
+        """Drop expired rows and trim a table to the least recently used limit."""
+        self._conn.execute(f"DELETE FROM {table} WHERE created < ?", (time.time() - self.ttl,))
+        self._conn.execute(
+            f"DELETE FROM {table} WHERE rowid IN ("
+            f"SELECT rowid FROM {table} ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
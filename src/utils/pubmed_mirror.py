@@ -0,0 +1,303 @@
+"""Local PubMed mirror built from NLM baseline/update files with offline search."""
+import argparse
+import glob
+import gzip
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.utils.web_search import ArticleStreamParser, STREAM_CHUNK_SIZE, format_articles
+
+logger = logging.getLogger(__name__)
+
+# Articles written per transaction while ingesting
+INGEST_BATCH_SIZE = 1000
+
+class _MirrorStreamParser(ArticleStreamParser):
+    """Stream parser that also collects DeleteCitation PMIDs from update files."""
+    
+    def __init__(self):
+        super().__init__()
+        self.deleted: List[str] = []
+    
+    def _handle_element(self, element: ET.Element) -> Iterator[Dict]:
+        if element.tag == "DeleteCitation":
+            self.deleted.extend(pmid.text for pmid in element.iter("PMID") if pmid.text)
+        yield from super()._handle_element(element)
+
+
+class PubMedMirror:
+    """SQLite store of PubMed records with an FTS5 index over title and abstract.
+    
+    The connection is shared by all threads, so every use of it holds a lock.
+    Ingestion takes the lock per batch, which lets searches run between batches.
+    """
+    
+    def __init__(self, db_path: str):
+        """Initialize the mirror.
+        
+        Args:
+            db_path: SQLite database file (created if missing)
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (
+                pmid INTEGER PRIMARY KEY,
+                title TEXT,
+                abstract TEXT,
+                authors TEXT,
+                journal TEXT,
+                year TEXT
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title, abstract, content='articles', content_rowid='pmid'
+            );
+            CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts (rowid, title, abstract)
+                VALUES (new.pmid, new.title, new.abstract);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, abstract)
+                VALUES ('delete', old.pmid, old.title, old.abstract);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, abstract)
+                VALUES ('delete', old.pmid, old.title, old.abstract);
+                INSERT INTO articles_fts (rowid, title, abstract)
+                VALUES (new.pmid, new.title, new.abstract);
+            END;
+            CREATE TABLE IF NOT EXISTS ingested_files (
+                name TEXT PRIMARY KEY,
+                ingested_at REAL NOT NULL,
+                articles INTEGER NOT NULL,
+                deleted INTEGER NOT NULL
+            );
+        """)
+    
+    def ingest_file(self, path: str, force: bool = False) -> Optional[Tuple[int, int]]:
+        """Load a (gzipped) PubmedArticleSet file into the mirror.
+        
+        The file is streamed and written in batches, so memory use does not
+        depend on file size. Records replace older versions of the same PMID
+        and DeleteCitation entries remove records, which makes daily update
+        files safe to apply in order on top of the baseline.
+        
+        Args:
+            path: Path to a baseline or update file (.xml or .xml.gz)
+            force: Ingest again even if the file was already loaded
+        
+        Returns:
+            Tuple of (articles written, articles deleted), or None if skipped
+        """
+        name = os.path.basename(path)
+        with self._lock:
+            ingested = self._conn.execute("SELECT 1 FROM ingested_files WHERE name = ?", (name,)).fetchone()
+        if ingested and not force:
+            logger.info(f"Skipping already ingested file: {name}")
+            return None
+        
+        parser = _MirrorStreamParser()
+        opener = gzip.open if path.endswith(".gz") else open
+        written = 0
+        batch = []
+        
+        with opener(path, "rb") as f:
+            while True:
+                chunk = f.read(STREAM_CHUNK_SIZE)
+                articles = parser.feed(chunk) if chunk else parser.close()
+                for article in articles:
+                    batch.append(article)
+                    if len(batch) >= INGEST_BATCH_SIZE:
+                        written += self._write_articles(batch)
+                        batch = []
+                if not chunk:
+                    break
+        
+        written += self._write_articles(batch)
+        deleted = self._delete_articles(parser.deleted)
+        
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ingested_files (name, ingested_at, articles, deleted) "
+                "VALUES (?, ?, ?, ?)",
+                (name, time.time(), written, deleted)
+            )
+        logger.info(f"Ingested {name}: {written} articles written, {deleted} deleted")
+        return written, deleted
+    
+    def ingest(self, paths: List[str], force: bool = False) -> None:
+        """Ingest baseline/update files in file name order.
+        
+        Args:
+            paths: Files or directories containing *.xml.gz files
+            force: Ingest files again even if they were already loaded
+        """
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                files.extend(glob.glob(os.path.join(path, "*.xml.gz")))
+            else:
+                files.append(path)
+        
+        # NLM file names sort in release order (pubmedYYnNNNN.xml.gz)
+        for file_path in sorted(files, key=os.path.basename):
+            self.ingest_file(file_path, force=force)
+    
+    def search(self, query: str, limit: int = 5) -> List[Dict]:
+        """Search the mirror with BM25 ranking over title and abstract.
+        
+        Args:
+            query: Free-text search query (all terms must match)
+            limit: Maximum number of results to return
+        
+        Returns:
+            List of article metadata dictionaries, best match first
+        """
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+        match = " ".join(f'"{term}"' for term in terms)
+        
+        # Title matches weigh twice as much as abstract matches
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT a.pmid, a.title, a.abstract, a.authors, a.journal, a.year
+                FROM articles_fts
+                JOIN articles a ON a.pmid = articles_fts.rowid
+                WHERE articles_fts MATCH ?
+                ORDER BY bm25(articles_fts, 2.0, 1.0)
+                LIMIT ?
+            """, (match, limit)).fetchall()
+        
+        return [
+            {
+                "id": str(pmid),
+                "title": title,
+                "abstract": abstract,
+                "authors": json.loads(authors),
+                "journal": journal,
+                "year": year,
+                "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
+            }
+            for pmid, title, abstract, authors, journal, year in rows
+        ]
+    
+    def count(self) -> int:
+        """Get the number of articles in the mirror."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    def _write_articles(self, articles: List[Dict]) -> int:
+        """Insert or update a batch of articles in one transaction."""
+        rows = [
+            (int(article["id"]), article["title"], article["abstract"],
+             json.dumps(article["authors"], ensure_ascii=False), article["journal"], article["year"])
+            for article in articles if article.get("id")
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT INTO articles (pmid, title, abstract, authors, journal, year)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (pmid) DO UPDATE SET
+                    title = excluded.title,
+                    abstract = excluded.abstract,
+                    authors = excluded.authors,
+                    journal = excluded.journal,
+                    year = excluded.year
+            """, rows)
+        return len(rows)
+    
+    def _delete_articles(self, pmids: List[str]) -> int:
+        """Remove deleted citations from the mirror."""
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                "DELETE FROM articles WHERE pmid = ?", [(int(pmid),) for pmid in pmids]
+            )
+        return max(cursor.rowcount, 0)
+
+
+class LocalPubMedSearcher:
+    """PubMedSearcher backend that answers searches from a local mirror."""
+    
+    def __init__(self, mirror: PubMedMirror, max_results: int = 5):
+        """Initialize the local searcher.
+        
+        Args:
+            mirror: Local PubMed mirror to search
+            max_results: Maximum number of results to return
+        """
+        self.mirror = mirror
+        self.max_results = max_results
+    
+    def search(self, query: str, mindate: Optional[str] = None, maxdate: Optional[str] = None) -> List[Dict]:
+        """Search the local mirror for scientific articles.
+        
+        Args:
+            query: Search query
+            mindate: Accepted for compatibility with PubMedSearcher; the mirror
+                keeps no entry dates, so callers filter out known PMIDs instead
+            maxdate: Accepted for compatibility with PubMedSearcher
+        
+        Returns:
+            List of article metadata dictionaries
+        """
+        try:
+            return self.mirror.search(query, limit=self.max_results)
+        except sqlite3.Error as e:
+            logger.error(f"Error during local PubMed search: {str(e)}")
+            return []
+    
+    def format_results(self, articles: List[Dict]) -> str:
+        """Format search results for display.
+        
+        Args:
+            articles: List of article metadata dictionaries
+        
+        Returns:
+            Formatted string of search results
+        """
+        return format_articles(articles)
+
+
+def main():
+    """Command line interface for building and querying the mirror."""
+    parser = argparse.ArgumentParser(description="Local PubMed baseline mirror")
+    parser.add_argument("--db", default="pubmed_mirror.sqlite3", help="Mirror database path")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    ingest_parser = subparsers.add_parser("ingest", help="Load baseline/update XML files")
+    ingest_parser.add_argument("paths", nargs="+", help="*.xml.gz files or directories")
+    ingest_parser.add_argument("--force", action="store_true", help="Re-ingest already loaded files")
+    
+    search_parser = subparsers.add_parser("search", help="Search the mirror")
+    search_parser.add_argument("query", help="Search query")
+    search_parser.add_argument("--limit", type=int, default=5, help="Maximum number of results")
+    
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    
+    mirror = PubMedMirror(args.db)
+    try:
+        if args.command == "ingest":
+            mirror.ingest(args.paths, force=args.force)
+            logger.info(f"Mirror contains {mirror.count()} articles")
+        else:
+            print(format_articles(mirror.search(args.query, limit=args.limit)))
+    finally:
+        mirror.close()
+
+if __name__ == "__main__":
+    main()
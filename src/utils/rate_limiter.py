@@ -0,0 +1,117 @@
+"""Token-bucket rate limiting shared by outgoing API clients."""
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+    
+    Callers reserve a token and wait until it becomes available, so concurrent
+    callers are queued in arrival order and the bucket never exceeds its rate.
+    """
+    
+    def __init__(self, rate: float, capacity: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize the token bucket.
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens that can accumulate (burst size)
+            clock: Monotonic clock returning seconds
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+            
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._pauses = 0
+        self._lock = threading.Lock()
+        
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it.
+        
+        Returns:
+            Delay in seconds (0 if a token is available now)
+        """
+        return self._reserve()[0]
+        
+    def _reserve(self) -> Tuple[float, int]:
+        """Take a token; return the delay and the number of pauses so far."""
+        with self._lock:
+            now = self._clock()
+            if now > self._updated:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                
+            self._tokens -= 1
+            delay = self._updated - now
+            if self._tokens < 0:
+                delay += -self._tokens / self.rate
+            return delay, self._pauses
+            
+    def acquire(self) -> None:
+        """Block until a token is available."""
+        while True:
+            delay, pauses = self._reserve()
+            if delay > 0:
+                time.sleep(delay)
+            # A pause that started while this caller slept voids its reservation
+            if self._pauses == pauses:
+                return
+            
+    async def acquire_async(self) -> None:
+        """Wait for a token without blocking the event loop."""
+        while True:
+            delay, pauses = self._reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self._pauses == pauses:
+                return
+            
+    def pause(self, seconds: float) -> None:
+        """Hold back all callers, e.g. after the server answered with Retry-After.
+        
+        Callers already waiting in acquire() or acquire_async() reserve a
+        new token when they wake, so they are queued behind the pause too.
+        Delays returned by reserve() before the pause are not updated.
+        
+        Args:
+            seconds: Time during which no token will be handed out
+        """
+        with self._lock:
+            until = self._clock() + seconds
+            if until > self._updated:
+                self._updated = until
+                # Waiting callers reserve again, so their outstanding tokens are forgiven
+                self._tokens = 1.0
+                self._pauses += 1
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, rate: float, capacity: float = 1.0) -> TokenBucket:
+    """Get the process-wide token bucket registered under a name.
+    
+    Args:
+        name: Key identifying the rate-limited resource
+        rate: Tokens per second used when the bucket is first created
+        capacity: Burst size used when the bucket is first created
+        
+    Returns:
+        Shared token bucket for the name
+    """
+    with _limiters_lock:
+        limiter: Optional[TokenBucket] = _limiters.get(name)
+        if limiter is None:
+            limiter = TokenBucket(rate, capacity)
+            _limiters[name] = limiter
+        return limiter
@@ -0,0 +1,107 @@
+"""Buffered JSON-lines writer for research stream logs."""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+# Seconds between flushes while text is streaming
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+
+class StreamLog:
+    """Append-only JSON-lines log that is opened once and written in batches.
+    
+    Records are buffered in memory and written when flush() is called,
+    when the flush interval has passed, or when the log is closed.
+    Consecutive streamed chunks of the same stage are merged into a single
+    record, so a long LLM answer costs a handful of writes instead of one
+    per token.
+    """
+    
+    def __init__(self, path: str, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        """Open the log for appending.
+        
+        Args:
+            path: JSON-lines file to append to (created if missing)
+            flush_interval: Maximum seconds buffered records wait before being written
+            clock: Monotonic time source for the flush interval
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self._clock = clock
+        self._file = open(path, 'a', encoding='utf-8')
+        self._buffer: List[Dict] = []
+        self._streaming = False
+        self._last_flush = clock()
+        self._lock = threading.Lock()
+    
+    def write(self, stage: str, content: str, append: bool = False) -> None:
+        """Buffer a log record.
+        
+        Args:
+            stage: Research stage the record belongs to
+            content: Status message or streamed text
+            append: Merge streamed text into the previous streamed record of the same stage
+        """
+        with self._lock:
+            if append and self._streaming and self._buffer and self._buffer[-1]["stage"] == stage:
+                self._buffer[-1]["content"] += content
+            else:
+                self._buffer.append({
+                    "time": datetime.now().isoformat(timespec="milliseconds"),
+                    "stage": stage,
+                    "content": content
+                })
+            self._streaming = append
+            
+            if self._clock() - self._last_flush >= self.flush_interval:
+                self._flush()
+    
+    def flush(self) -> None:
+        """Write buffered records to the operating system."""
+        with self._lock:
+            self._flush()
+    
+    def sync(self) -> None:
+        """Write buffered records and force them to disk."""
+        with self._lock:
+            self._flush()
+            os.fsync(self._file.fileno())
+    
+    def close(self, sync: bool = True) -> None:
+        """Write buffered records and close the file.
+        
+        Args:
+            sync: Force the log to disk before closing
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush()
+            if sync:
+                os.fsync(self._file.fileno())
+            self._file.close()
+    
+    def _flush(self) -> None:
+        """Write the buffer in one call; the caller holds the lock."""
+        if self._buffer:
+            self._file.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in self._buffer))
+            self._file.flush()
+            self._buffer = []
+        self._last_flush = self._clock()
+
+
+def read_stream_log(path: str) -> List[Dict]:
+    """Read the records of a stream log.
+    
+    Args:
+        path: JSON-lines stream log
+    
+    Returns:
+        Records with time, stage and content, in write order
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
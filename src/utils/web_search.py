@@ -1,130 +1,356 @@
 """Web search utilities for the research assistant."""
 import time
+from datetime import datetime
 import logging
 import xml.etree.ElementTree as ET
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 import requests
 
+from src.utils.http import create_session, parse_retry_after
+from src.utils.pubmed_cache import PubMedCache
+from src.utils.rate_limiter import get_rate_limiter
+
 logger = logging.getLogger(__name__)
 
+# NCBI asks for POST requests beyond a few hundred IDs; keep batches below that
+MAX_FETCH_BATCH_SIZE = 500
+
+# E-utilities request limits per second without and with an API key
+ANONYMOUS_RATE_LIMIT = 3.0
+API_KEY_RATE_LIMIT = 10.0
+
+# Bytes read from the network per parser feed when streaming EFetch responses
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def parse_article(article: ET.Element) -> Optional[Dict]:
+    """Extract metadata from a PubmedArticle element.
+    
+    Args:
+        article: PubmedArticle XML element
+        
+    Returns:
+        Article metadata dictionary or None if failed
+    """
+    pmid = article.find(".//MedlineCitation/PMID")
+    article_id = pmid.text if pmid is not None else None
+    
+    try:
+        # Extract article metadata
+        title = article.find(".//ArticleTitle")
+        abstract = article.find(".//Abstract/AbstractText")
+        authors = article.findall(".//Author")
+        journal = article.find(".//Journal/Title")
+        year = article.find(".//PubDate/Year")
+        
+        # Format author names
+        author_names = []
+        for author in authors:
+            last_name = author.find("LastName")
+            fore_name = author.find("ForeName")
+            if last_name is not None and fore_name is not None:
+                author_names.append(f"{fore_name.text} {last_name.text}")
+            
+        return {
+            "id": article_id,
+            "title": title.text if title is not None else "No title available",
+            "abstract": abstract.text if abstract is not None else "No abstract available",
+            "authors": author_names,
+            "journal": journal.text if journal is not None else "Journal not specified",
+            "year": year.text if year is not None else "Year not specified",
+            "url": f"https://pubmed.ncbi.nlm.nih.gov/{article_id}/"
+        }
+        
+    except Exception as e:
+        logger.error(f"Error parsing article {article_id}: {str(e)}")
+        return None
+
+
+def format_articles(articles: List[Dict]) -> str:
+    """Format search results for display.
+    
+    Args:
+        articles: List of article metadata dictionaries
+        
+    Returns:
+        Formatted string of search results
+    """
+    if not articles:
+        return "No articles found."
+        
+    formatted = []
+    for article in articles:
+        formatted.append(f"""Title: {article['title']}
+Authors: {', '.join(article['authors'])}
+Journal: {article['journal']} ({article['year']})
+Abstract: {article['abstract']}
+URL: {article['url']}
+---""")
+        
+    return "\n\n".join(formatted)
+
+
+class ArticleStreamParser:
+    """Incremental parser for PubmedArticleSet XML.
+    
+    Bytes are fed as they arrive from the network and each PubmedArticle is
+    turned into an article dictionary as soon as its end tag is seen. Parsed
+    elements are dropped from the tree, so memory stays bounded by the size
+    of a single article rather than the whole response.
+    """
+    
+    def __init__(self):
+        """Initialize the stream parser."""
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root = None
+        self._depth = 0
+        
+    def feed(self, data: bytes) -> Iterator[Dict]:
+        """Feed raw response bytes to the parser.
+        
+        Args:
+            data: Next chunk of the XML byte stream
+            
+        Yields:
+            Article metadata dictionaries completed by this chunk
+        """
+        self._parser.feed(data)
+        yield from self._read_events()
+        
+    def close(self) -> Iterator[Dict]:
+        """Signal the end of the stream.
+        
+        Yields:
+            Any articles completed by the remaining buffered data
+        """
+        self._parser.close()
+        yield from self._read_events()
+        
+    def _read_events(self) -> Iterator[Dict]:
+        for event, element in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = element
+                self._depth += 1
+                continue
+                
+            self._depth -= 1
+            if self._depth != 1:
+                continue
+                
+            # A direct child of PubmedArticleSet is complete
+            yield from self._handle_element(element)
+            self._root.clear()
+            
+    def _handle_element(self, element: ET.Element) -> Iterator[Dict]:
+        """Turn a completed top-level element into article dictionaries."""
+        if element.tag == "PubmedArticle":
+            article = parse_article(element)
+            if article:
+                yield article
+
+
+def iter_articles(chunks: Iterable[bytes]) -> Iterator[Dict]:
+    """Stream article dictionaries out of PubmedArticleSet XML chunks.
+    
+    Args:
+        chunks: Iterable over the raw XML byte stream
+        
+    Yields:
+        Article metadata dictionaries in document order
+    """
+    parser = ArticleStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
 class PubMedSearcher:
     """PubMed scientific literature search utility."""
     
-    def __init__(self, max_results: int = 5, retry_count: int = 3, retry_delay: float = 1.0):
+    def __init__(self, max_results: int = 5, retry_count: int = 3, retry_delay: float = 1.0,
+                 fetch_batch_size: int = 200, session: Optional[requests.Session] = None,
+                 pool_size: int = 10, connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 api_key: Optional[str] = None, requests_per_second: Optional[float] = None,
+                 cache: Optional[PubMedCache] = None):
         """Initialize PubMed searcher.
         
         Args:
             max_results: Maximum number of results to return
             retry_count: Number of retries for failed requests
             retry_delay: Initial delay between retries (will use exponential backoff)
+            fetch_batch_size: Number of PMIDs requested per EFetch call
+            session: Shared HTTP session (a pooled keep-alive session is created if None)
+            pool_size: Connection pool size for the session created when none is given
+            connect_timeout: Seconds to wait for a connection to NCBI
+            read_timeout: Seconds to wait for response data from NCBI
+            api_key: NCBI API key, raising the allowed request rate
+            requests_per_second: Request rate shared by all searchers using the same
+                key (defaults to the NCBI limit for anonymous or keyed access)
+            cache: Local cache for ESearch results and article records
         """
+        if not 1 <= fetch_batch_size <= MAX_FETCH_BATCH_SIZE:
+            raise ValueError(f"fetch_batch_size must be between 1 and {MAX_FETCH_BATCH_SIZE}")
+            
         self.base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
         self.max_results = max_results
         self.retry_count = retry_count
         self.retry_delay = retry_delay
+        self.fetch_batch_size = fetch_batch_size
+        self.session = session if session is not None else create_session(pool_size)
+        self.timeout = (connect_timeout, read_timeout)
+        self.api_key = api_key
+        self.cache = cache
+        
+        if requests_per_second is None:
+            requests_per_second = API_KEY_RATE_LIMIT if api_key else ANONYMOUS_RATE_LIMIT
+        self.rate_limiter = get_rate_limiter(f"ncbi:{api_key or 'anonymous'}", requests_per_second)
         
-    def search(self, query: str) -> List[Dict]:
+    def search(self, query: str, mindate: Optional[str] = None, maxdate: Optional[str] = None) -> List[Dict]:
         """Search PubMed for scientific articles.
         
         Args:
             query: Search query
+            mindate: Only return articles added to PubMed on or after this
+                date (YYYY/MM/DD, Entrez date)
+            maxdate: Only return articles added on or before this date
+                (defaults to today when mindate is given)
             
         Returns:
             List of article metadata dictionaries
         """
         try:
-            # Search for article IDs
-            search_url = f"{self.base_url}/esearch.fcgi"
-            params = {
-                "db": "pubmed",
-                "term": query,
-                "retmax": self.max_results,
-                "retmode": "json"
-            }
+            search_params = {"retmax": self.max_results}
+            if mindate or maxdate:
+                search_params.update({
+                    "datetype": "edat",
+                    "mindate": mindate or "1800/01/01",
+                    "maxdate": maxdate or datetime.now().strftime("%Y/%m/%d")
+                })
             
-            response = self._make_request("GET", search_url, params=params)
-            data = response.json()
+            # Search for article IDs
+            article_ids = self.cache.get_search(query, search_params) if self.cache else None
+            if article_ids is None:
+                search_url = f"{self.base_url}/esearch.fcgi"
+                params = {
+                    "db": "pubmed",
+                    "term": query,
+                    "retmode": "json",
+                    **search_params
+                }
+                
+                response = self._make_request("GET", search_url, params=params)
+                data = response.json()
+                
+                # Get article IDs
+                article_ids = data["esearchresult"]["idlist"]
+                if self.cache:
+                    self.cache.put_search(query, search_params, article_ids)
             
-            # Get article IDs
-            article_ids = data["esearchresult"]["idlist"]
+            # Only fetch articles that are not cached yet
+            cached = self.cache.get_articles(article_ids) if self.cache else {}
+            missing_ids = [article_id for article_id in article_ids if article_id not in cached]
             
-            # Fetch details for each article
-            articles = []
-            for article_id in article_ids:
+            # Fetch details in batches of IDs
+            fetched = []
+            for start in range(0, len(missing_ids), self.fetch_batch_size):
+                batch = missing_ids[start:start + self.fetch_batch_size]
                 try:
-                    article = self._fetch_article_details(article_id)
-                    if article:
-                        articles.append(article)
+                    fetched.extend(self._fetch_articles(batch))
                 except Exception as e:
-                    logger.error(f"Error fetching article details for PMID {article_id}: {str(e)}")
+                    logger.error(f"Error fetching article details for PMIDs {', '.join(batch)}: {str(e)}")
                     continue
-                
-                # Add delay between requests to avoid rate limiting
-                time.sleep(0.5)
             
-            return articles
+            if self.cache:
+                self.cache.put_articles(fetched)
+            
+            # Return articles in ESearch order
+            by_id = {**cached, **{article["id"]: article for article in fetched}}
+            return [by_id[article_id] for article_id in article_ids if article_id in by_id]
             
         except Exception as e:
             logger.error(f"Error during PubMed search: {str(e)}")
             return []
             
-    def _fetch_article_details(self, article_id: str) -> Optional[Dict]:
-        """Fetch detailed information for a PubMed article.
+    def search_iter(self, query: str, limit: Optional[int] = None) -> Iterator[Dict]:
+        """Lazily search PubMed through the ESearch history server.
+        
+        The matching IDs stay on the NCBI side (WebEnv/query_key) and articles
+        are fetched page by page, so memory use does not grow with the number
+        of matches. Fetched articles are added to the cache when one is set.
         
         Args:
-            article_id: PubMed article ID
+            query: Search query
+            limit: Maximum number of articles to yield (all matches if None)
             
-        Returns:
-            Article metadata dictionary or None if failed
+        Yields:
+            Article metadata dictionaries in PubMed relevance order
         """
-        fetch_url = f"{self.base_url}/efetch.fcgi"
+        search_url = f"{self.base_url}/esearch.fcgi"
         params = {
             "db": "pubmed",
-            "id": article_id,
-            "retmode": "xml"
+            "term": query,
+            "usehistory": "y",
+            "retmax": 0,
+            "retmode": "json"
         }
         
-        response = self._make_request("GET", fetch_url, params=params)
+        response = self._make_request("GET", search_url, params=params)
+        result = response.json()["esearchresult"]
         
-        try:
-            # Parse XML response
-            root = ET.fromstring(response.text)
-            article = root.find(".//PubmedArticle")
-            
-            if article is None:
-                return None
-                
-            # Extract article metadata
-            title = article.find(".//ArticleTitle")
-            abstract = article.find(".//Abstract/AbstractText")
-            authors = article.findall(".//Author")
-            journal = article.find(".//Journal/Title")
-            year = article.find(".//PubDate/Year")
-            
-            # Format author names
-            author_names = []
-            for author in authors:
-                last_name = author.find("LastName")
-                fore_name = author.find("ForeName")
-                if last_name is not None and fore_name is not None:
-                    author_names.append(f"{fore_name.text} {last_name.text}")
-                
-            return {
-                "id": article_id,
-                "title": title.text if title is not None else "No title available",
-                "abstract": abstract.text if abstract is not None else "No abstract available",
-                "authors": author_names,
-                "journal": journal.text if journal is not None else "Journal not specified",
-                "year": year.text if year is not None else "Year not specified",
-                "url": f"https://pubmed.ncbi.nlm.nih.gov/{article_id}/"
+        total = int(result["count"])
+        if limit is not None:
+            total = min(total, limit)
+        
+        for retstart in range(0, total, self.fetch_batch_size):
+            data = {
+                "db": "pubmed",
+                "WebEnv": result["webenv"],
+                "query_key": result["querykey"],
+                "retstart": retstart,
+                "retmax": min(self.fetch_batch_size, total - retstart),
+                "retmode": "xml"
             }
+            page = list(self._efetch(data))
+            if self.cache:
+                self.cache.put_articles(page)
+            yield from page
             
-        except Exception as e:
-            logger.error(f"Error parsing article {article_id}: {str(e)}")
-            return None
+    def _fetch_articles(self, article_ids: List[str]) -> List[Dict]:
+        """Fetch detailed information for a batch of PubMed articles.
+        
+        Args:
+            article_ids: PubMed article IDs fetched with a single EFetch call
+            
+        Returns:
+            List of article metadata dictionaries in the order returned by PubMed
+        """
+        data = {
+            "db": "pubmed",
+            "id": ",".join(article_ids),
+            "retmode": "xml"
+        }
+        return list(self._efetch(data))
+        
+    def _efetch(self, data: Dict) -> Iterator[Dict]:
+        """Run a single EFetch call and parse the returned articles.
+        
+        Args:
+            data: EFetch form parameters (explicit IDs or a history server page)
             
+        Yields:
+            Article metadata dictionaries
+        """
+        fetch_url = f"{self.base_url}/efetch.fcgi"
+        response = self._make_request("POST", fetch_url, data=data, stream=True)
+        
+        try:
+            yield from iter_articles(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+        finally:
+            response.close()
+        
     def _make_request(self, method: str, url: str, **kwargs) -> requests.Response:
-        """Make an HTTP request with retry logic.
+        """Make a rate-limited HTTP request with retry logic.
         
         Args:
             method: HTTP method
@@ -139,22 +365,31 @@ class PubMedSearcher:
         """
         last_error = None
         delay = self.retry_delay
+        kwargs.setdefault("timeout", self.timeout)
+        if self.api_key:
+            field = "data" if "data" in kwargs else "params"
+            kwargs[field] = {**kwargs.get(field, {}), "api_key": self.api_key}
         
         for attempt in range(self.retry_count):
             try:
-                response = requests.request(method, url, **kwargs)
+                self.rate_limiter.acquire()
+                response = self.session.request(method, url, **kwargs)
                 
-                # Handle rate limiting
+                # Handle rate limiting by holding back every caller sharing the limiter
                 if response.status_code == 429:
-                    retry_after = int(response.headers.get("Retry-After", delay))
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"), delay)
                     logger.warning(f"Rate limited. Waiting {retry_after} seconds...")
-                    time.sleep(retry_after)
+                    self.rate_limiter.pause(retry_after)
+                    response.close()
+                    last_error = requests.exceptions.HTTPError("429 Too Many Requests", response=response)
                     continue
                     
                 response.raise_for_status()
                 return response
                 
             except requests.exceptions.RequestException as e:
+                if e.response is not None:
+                    e.response.close()
                 last_error = e
                 logger.warning(f"Request failed (attempt {attempt + 1}/{self.retry_count}): {str(e)}")
                 
@@ -173,16 +408,4 @@ class PubMedSearcher:
         Returns:
             Formatted string of search results
         """
-        if not articles:
-            return "No articles found."
-            
-        formatted = []
-        for article in articles:
-            formatted.append(f"""Title: {article['title']}
-Authors: {', '.join(article['authors'])}
-Journal: {article['journal']} ({article['year']})
-Abstract: {article['abstract']}
-URL: {article['url']}
----""")
-            
-        return "\n\n".join(formatted)
+        return format_articles(articles)